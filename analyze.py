@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# Copyright (c) 2020-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import csv
+import glob
+import logging
+import os
+import sys
+
+sys.path.append("..")
+import rtde.analytics as analytics
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Summarize current, energy, temperature and robot mode "
+        "time over many recordings, one row per file and a total row"
+    )
+    parser.add_argument(
+        "recordings", nargs="+", help="recording files or glob patterns"
+    )
+    parser.add_argument("--output", help="summary table file (standard output)")
+    parser.add_argument("--jobs", type=int, help="worker processes (number of cores)")
+    parser.add_argument(
+        "--cache",
+        default=".analyze_cache.json",
+        help="per-file result cache (.analyze_cache.json)",
+    )
+    parser.add_argument(
+        "--no-cache", help="analyze every file again", action="store_true"
+    )
+    parser.add_argument(
+        "--delimiter", default=",", help="delimiter of CSV recordings (,)"
+    )
+    parser.add_argument(
+        "--total-only", help="only write the total row", action="store_true"
+    )
+    parser.add_argument(
+        "--verbose", help="increase output verbosity", action="store_true"
+    )
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO)
+
+    filenames = []
+    for pattern in args.recordings:
+        matches = sorted(glob.glob(pattern)) or [pattern]
+        filenames.extend(f for f in matches if f not in filenames)
+    missing = [f for f in filenames if not os.path.isfile(f)]
+    if missing:
+        print("Error: Recording '{}' not found.".format(missing[0]))
+        sys.exit(1)
+
+    cache = analytics.ResultCache(None if args.no_cache else args.cache)
+    results = analytics.analyze(
+        filenames, jobs=args.jobs, cache=cache, delimiter=args.delimiter
+    )
+    total = analytics.merge(result for _, result in results)
+
+    rows = [] if args.total_only else list(results)
+    rows.append(("total", total))
+    columns = analytics.summary_columns([total])
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        writer = csv.DictWriter(out, columns, restval="")
+        writer.writeheader()
+        for name, result in rows:
+            writer.writerow(analytics.summary_row(name, result))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+# the guard keeps process pool workers from running the script again
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Columnar output against the row binary layout for one column reads.
+
+Writes --rows samples of the wide recipe in record_configuration.xml with
+CSVBinaryWriter and with ColumnarWriter, then reads the column --column
+from each with the page cache of the files dropped first (where
+posix_fadvise allows), CSVBinaryReader.read_columns() against
+columnar.open_columns().
+"""
+
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import rtde.columnar as columnar
+import rtde.csv_binary_writer as csv_binary_writer
+import rtde.rtde_config as rtde_config
+from rtde import serialize
+from rtde.csv_binary_reader import CSVBinaryReader
+from fake_controller import synthetic_values
+
+RECORD_CONFIG = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "record_configuration.xml"
+)
+
+
+def drop_cache(path):
+    """Evicts the file's pages so the next read comes from disk"""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default=RECORD_CONFIG, help="recipe file")
+    parser.add_argument("--rows", type=int, default=200000, help="rows (200000)")
+    parser.add_argument("--column", default="actual_q_0", help="column to read")
+    args = parser.parse_args()
+
+    # the row reader needs unique column names, keep a field's first listing
+    names, types = [], []
+    for name, data_type in zip(*rtde_config.ConfigFile(args.config).get_recipe("out")):
+        if name not in names:
+            names.append(name)
+            types.append(data_type)
+    row = struct.Struct(">" + "".join(serialize.TYPE_FORMATS[t] for t in types))
+    payloads = [row.pack(*synthetic_values(types, i)) for i in range(args.rows)]
+    print("{} columns, {} bytes per row".format(len(row.format) - 1, row.size))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        binary_file = os.path.join(tmp, "rows.bin")
+        directory = os.path.join(tmp, "columns")
+
+        start = time.perf_counter()
+        with open(binary_file, "wb") as f:
+            writer = csv_binary_writer.CSVBinaryWriter(f, names, types)
+            writer.writeheader()
+            for payload in payloads:
+                writer.writerow(payload)
+        binary_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with columnar.ColumnarWriter(directory, names, types) as writer:
+            writer.writeheader()
+            for payload in payloads:
+                writer.writerow(payload)
+        columnar_write = time.perf_counter() - start
+        print(
+            "write: binary {:.0f} rows/s, columnar {:.0f} rows/s".format(
+                args.rows / binary_write, args.rows / columnar_write
+            )
+        )
+
+        drop_cache(binary_file)
+        start = time.perf_counter()
+        with open(binary_file, "rb") as f:
+            total = CSVBinaryReader(f).read_columns()[args.column].sum()
+        binary_read = time.perf_counter() - start
+
+        for name in os.listdir(directory):
+            drop_cache(os.path.join(directory, name))
+        start = time.perf_counter()
+        column = columnar.open_columns(directory, [args.column])[args.column]
+        opened = time.perf_counter() - start
+        assert np.asarray(column).sum() == total
+        columnar_read = time.perf_counter() - start
+        column_file = os.path.join(directory, args.column + ".npy")
+        print(
+            "read {}: binary {:.1f}ms of {:.1f} MB, columnar {:.1f}ms "
+            "(open {:.2f}ms) of {:.1f} MB".format(
+                args.column,
+                binary_read * 1000,
+                os.path.getsize(binary_file) / 1e6,
+                columnar_read * 1000,
+                opened * 1000,
+                os.path.getsize(column_file) / 1e6,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
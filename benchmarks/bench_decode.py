@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Decode cost of a data package: DataConfig.unpack against DataView.
+
+Builds a synthetic payload for a recipe and reports the time per sample of
+a full unpack and of a lazy view reading only a few fields.
+"""
+
+import argparse
+import os
+import struct
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import rtde.rtde_config as rtde_config
+from rtde import serialize
+from fake_controller import DEFAULT_CONFIG, synthetic_values
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="recipe file")
+    parser.add_argument(
+        "--read",
+        nargs="+",
+        default=["timestamp", "runtime_state", "actual_TCP_force"],
+        help="fields read from the view",
+    )
+    parser.add_argument("--number", type=int, default=20000, help="samples")
+    args = parser.parse_args()
+
+    names, types = rtde_config.ConfigFile(args.config).get_recipe("out")
+    config = serialize.DataConfig.unpack_recipe(
+        struct.pack(">B", 1) + ",".join(types).encode("utf-8")
+    )
+    config.names = names
+    payload = struct.pack(config.fmt, 1, *synthetic_values(types, 1))
+    read = [name for name in args.read if name in names]
+
+    def unpack():
+        state = config.unpack(payload)
+        for name in read:
+            getattr(state, name)
+
+    def view():
+        state = config.view(payload)
+        for name in read:
+            getattr(state, name)
+
+    print("{} fields, reading {}".format(len(names), ", ".join(read)))
+    for name, func in (("DataConfig.unpack", unpack), ("DataView", view)):
+        spent = timeit.timeit(func, number=args.number)
+        print("{:<18s} {:8.2f}us/sample".format(name, spent / args.number * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Latency and cost of following a CSV recording while it is written.
+
+A writer process appends rows at --frequency Hz, flushing each one like
+record.py with --write-behind --flush-rows 1 would, with the time it
+wrote the row in a column. CSVFollower reads them with inotify and with
+polling and reports the delay from write to block and the CPU time per
+row. A final pass follows a file of --rows rows written at once to give
+the parse rate.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import rtde.follow as follow
+from rtde.jitter import percentiles_us
+
+COLUMNS = 14  # a wide enough row, like timestamp with two vectors
+
+
+def write(filename, frequency, seconds):
+    """Appends rows of the write time and COLUMNS - 1 values"""
+    with open(filename, "w") as f:
+        f.write(",".join(["host_time"] + ["v" + str(j) for j in range(1, COLUMNS)]))
+        f.write("\n")
+        f.flush()
+        start = time.monotonic()
+        for i in range(int(frequency * seconds)):
+            delay = start + i / frequency - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            values = ",".join([repr(i * 0.001)] * (COLUMNS - 1))
+            f.write("{!r},{}\n".format(time.monotonic(), values))
+            f.flush()
+
+
+def follow_pass(args, inotify):
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "live.csv")
+        writer = subprocess.Popen(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--write",
+                filename,
+                "--frequency",
+                str(args.frequency),
+                "--seconds",
+                str(args.seconds),
+            ]
+        )
+        while not os.path.exists(filename):
+            time.sleep(0.001)
+        delays = []
+        cpu = time.process_time()
+        with follow.CSVFollower(filename, inotify=inotify) as follower:
+            for block in follower.follow(timeout=1.0):
+                delays.append(time.monotonic() - block["host_time"])
+            rows = follower.rows
+        cpu = time.process_time() - cpu
+        writer.wait()
+    delays = np.concatenate(delays)
+    latency = percentiles_us(delays)
+    print(
+        "{:8s} {} rows, {:.1f}us CPU/row, latency us: {}".format(
+            "inotify" if inotify else "polling",
+            rows,
+            cpu / rows * 1e6,
+            ", ".join("{} {:.0f}".format(k, v) for k, v in latency.items()),
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frequency", type=float, default=500, help="Hz (500)")
+    parser.add_argument("--seconds", type=float, default=5, help="per pass (5)")
+    parser.add_argument("--rows", type=int, default=500000, help="parse rows")
+    parser.add_argument("--write", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.write:
+        write(args.write, args.frequency, args.seconds)
+        return
+
+    for inotify in (True, False):
+        follow_pass(args, inotify)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "full.csv")
+        write(filename, 1e12, args.rows / 1e12)
+        start = time.perf_counter()
+        with follow.CSVFollower(filename) as follower:
+            for _ in follower.follow(timeout=0):
+                pass
+        spent = time.perf_counter() - start
+        print(
+            "parse {} rows: {:.0f} rows/s, {:.1f} MB/s".format(
+                follower.rows,
+                follower.rows / spent,
+                os.path.getsize(filename) / 1e6 / spent,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Start up cost: import time of the scripts and cold start to first packet.
+
+Runs record.py --help under python -X importtime and lists the slowest
+imports, times the top level imports of main.py the same way (the GUI is
+not started), then runs record.py --samples 1 against a FakeController
+and reports the wall time from process start until it exits.
+"""
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from fake_controller import DEFAULT_CONFIG, FakeController
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def import_times(argv):
+    """Runs python -X importtime and returns (cumulative us, module) pairs"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime"] + argv,
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        # only the top level entries, nested imports are in their cumulative time
+        if module.startswith(" ") and not module.startswith("  "):
+            times.append((int(cumulative), module.strip()))
+    return times
+
+
+def main_imports():
+    """The top level import statements of main.py, the GUI is not started"""
+    with open(os.path.join(ROOT, "main.py")) as f:
+        tree = ast.parse(f.read())
+    lines = []
+    for node in tree.body:
+        names = ", ".join(alias.name for alias in getattr(node, "names", []))
+        if isinstance(node, ast.Import):
+            lines.append("import " + names)
+        elif isinstance(node, ast.ImportFrom):
+            lines.append("from {} import {}".format(node.module, names))
+    return "\n".join(lines)
+
+
+def report(title, times, top):
+    total = sum(t for t, _ in times)
+    print("{}: {:.1f}ms".format(title, total / 1000.0))
+    for cumulative, module in sorted(times, reverse=True)[:top]:
+        print("  {:8.1f}ms  {}".format(cumulative / 1000.0, module))
+
+
+def cold_start(config, runs):
+    """Median seconds for record.py to connect, receive one sample and exit"""
+    controller = FakeController(config=config).start()
+    spent = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "out.csv")
+            for _ in range(runs):
+                start = time.perf_counter()
+                subprocess.check_call(
+                    [
+                        sys.executable,
+                        "record.py",
+                        "--host",
+                        controller.host,
+                        "--port",
+                        str(controller.port),
+                        "--config",
+                        config,
+                        "--output",
+                        output,
+                        "--samples",
+                        "1",
+                    ],
+                    cwd=ROOT,
+                    stdout=subprocess.DEVNULL,
+                )
+                spent.append(time.perf_counter() - start)
+    finally:
+        controller.stop()
+    return sorted(spent)[len(spent) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--config", default=DEFAULT_CONFIG, help="recipe file for the cold start"
+    )
+    parser.add_argument("--top", type=int, default=10, help="modules to list (10)")
+    parser.add_argument("--runs", type=int, default=5, help="cold start runs (5)")
+    parser.add_argument(
+        "--target-ms",
+        type=float,
+        default=300,
+        help="fail if the cold start takes longer (300, 0 = no target)",
+    )
+    args = parser.parse_args()
+    config = os.path.abspath(args.config)
+
+    report("record.py --help imports", import_times(["record.py", "--help"]), args.top)
+    report("main.py imports", import_times(["-c", main_imports()]), args.top)
+
+    spent = cold_start(config, args.runs) * 1000.0
+    print(
+        "cold start to first packet: {:.1f}ms (median of {})".format(spent, args.runs)
+    )
+    if args.target_ms and spent > args.target_ms:
+        sys.exit("cold start above target of {:.0f}ms".format(args.target_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Loop period jitter of receive() with and without rtde.jitter.LowJitter.
+
+A stand-in controller runs in its own process, so collections in this one
+do not delay the packages. The loop holds a large live heap and keeps the
+last samples in a ring of lists, the kind of state an analysis or display
+loop has, which makes the collector run full collections now and then.
+Each pass receives --samples samples and prints the JitterMeter summary.
+"""
+
+import argparse
+import collections
+import gc
+import os
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import rtde.jitter as jitter
+import rtde.rtde as rtde
+import rtde.rtde_config as rtde_config
+from fake_controller import DEFAULT_CONFIG
+
+FAKE_CONTROLLER = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "fake_controller.py"
+)
+
+
+def connect(args):
+    names, types = rtde_config.ConfigFile(args.config).get_recipe("out")
+    deadline = time.monotonic() + 5
+    while True:
+        con = rtde.RTDE("127.0.0.1", args.port)
+        try:
+            con.connect()
+            break
+        except (rtde.RTDEException, OSError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+    if not con.send_output_setup(names, types, frequency=args.frequency):
+        sys.exit("Unable to configure output")
+    if not con.send_start():
+        sys.exit("Unable to start synchronization")
+    return con
+
+
+def capture(con, args, low_jitter):
+    # the first receive returns whatever queued up before the pass
+    con.receive()
+    meter = jitter.JitterMeter(args.frequency)
+    recent = collections.deque(maxlen=args.keep)
+    for _ in range(args.samples):
+        state = con.receive()
+        meter.add(state.timestamp)
+        recent.append([state.timestamp, list(state.actual_q)])
+        if low_jitter is not None:
+            low_jitter.idle()
+    return meter.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=30020, help="port (30020)")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="recipe file")
+    parser.add_argument("--frequency", type=float, default=500, help="Hz (500)")
+    parser.add_argument("--samples", type=int, default=5000, help="per pass (5000)")
+    parser.add_argument(
+        "--heap", type=int, default=1000000, help="live objects held (1000000)"
+    )
+    parser.add_argument("--keep", type=int, default=2000, help="samples kept (2000)")
+    args = parser.parse_args()
+
+    controller = subprocess.Popen(
+        [sys.executable, FAKE_CONTROLLER, "--port", str(args.port)],
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        heap = [[i] for i in range(args.heap)]
+        con = connect(args)
+        for name in ("default", "low jitter"):
+            if name == "default":
+                before = [s["collections"] for s in gc.get_stats()]
+                summary = capture(con, args, None)
+            else:
+                with jitter.LowJitter() as low_jitter:
+                    before = [s["collections"] for s in gc.get_stats()]
+                    summary = capture(con, args, low_jitter)
+            after = [s["collections"] for s in gc.get_stats()]
+            print(name)
+            for line in jitter.format_summary(summary):
+                print("  " + line)
+            print(
+                "  collections per generation: "
+                + ", ".join(str(a - b) for a, b in zip(after, before))
+            )
+        con.send_pause()
+        con.disconnect()
+        del heap
+    finally:
+        controller.terminate()
+        controller.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""CPU cost per package of raw capture against decoding into CSV.
+
+A stand-in controller in its own process streams the "out" recipe at a
+high rate. One pass receives with receive_buffered() and writes CSV rows,
+what record.py does by default, the other reads with read_raw() into a
+RawCaptureWriter, what record.py --raw does. Both write to memory and
+report the process CPU time per package and the share of one core.
+"""
+
+import argparse
+import io
+import os
+import struct
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import rtde.csv_writer as csv_writer
+import rtde.raw_capture as raw_capture
+import rtde.rtde as rtde
+import rtde.rtde_config as rtde_config
+from rtde import serialize
+from fake_controller import DEFAULT_CONFIG
+
+FAKE_CONTROLLER = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "fake_controller.py"
+)
+
+
+def connect(args, names, types):
+    deadline = time.monotonic() + 5
+    while True:
+        con = rtde.RTDE("127.0.0.1", args.port)
+        try:
+            con.connect()
+            break
+        except (rtde.RTDEException, OSError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+    if not con.send_output_setup(names, types, frequency=args.frequency):
+        sys.exit("Unable to configure output")
+    if not con.send_start():
+        sys.exit("Unable to start synchronization")
+    return con
+
+
+def decode_pass(con, names, types, seconds):
+    writer = csv_writer.CSVWriter(io.StringIO(), names, types)
+    packages = 0
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        state = con.receive_buffered()
+        if state is None:
+            con.has_data(0.01)
+            continue
+        writer.writerow(state)
+        packages += 1
+    return packages
+
+
+def raw_pass(con, package_size, seconds):
+    capture = raw_capture.RawCaptureWriter(io.BytesIO())
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        data = con.read_raw()
+        if data:
+            capture.write(data)
+    capture.close()
+    return capture.bytes // package_size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=30021, help="port (30021)")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="recipe file")
+    parser.add_argument("--frequency", type=float, default=5000, help="Hz (5000)")
+    parser.add_argument("--seconds", type=float, default=3, help="per pass (3)")
+    args = parser.parse_args()
+
+    names, types = rtde_config.ConfigFile(args.config).get_recipe("out")
+    # header, recipe id and fields
+    fields = "".join(serialize.TYPE_FORMATS[t] for t in types)
+    package_size = 4 + struct.calcsize(">" + fields)
+    controller = subprocess.Popen(
+        [sys.executable, FAKE_CONTROLLER, "--port", str(args.port)],
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        for name in ("decode + csv", "raw"):
+            con = connect(args, names, types)
+            start = time.process_time()
+            if name == "raw":
+                packages = raw_pass(con, package_size, args.seconds)
+            else:
+                packages = decode_pass(con, names, types, args.seconds)
+            spent = time.process_time() - start
+            con.send_pause()
+            con.disconnect()
+            print(
+                "{:14s} {:7d} packages, {:6.1f}us CPU/package, {:5.1%} of a core".format(
+                    name, packages, spent / packages * 1e6, spent / args.seconds
+                )
+            )
+    finally:
+        controller.terminate()
+        controller.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Cost of RTDE.receive() when the client falls behind the controller.
+
+The client sleeps for a given lag before every receive(), so the stand-in
+controller has queued lag * frequency packages by the time it is called.
+Reports the time spent in receive() and the packages skipped per call.
+Without --host a local fake_controller is started in this process.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import rtde.rtde as rtde
+import rtde.rtde_config as rtde_config
+from fake_controller import DEFAULT_CONFIG, FakeController
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", help="controller to use instead of a stand-in")
+    parser.add_argument("--port", type=int, default=30004, help="port number (30004)")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="recipe file")
+    parser.add_argument("--frequency", type=float, default=500, help="Hz (500)")
+    parser.add_argument("--count", type=int, default=50, help="receives per lag")
+    parser.add_argument(
+        "--lags",
+        type=float,
+        nargs="+",
+        default=[0, 0.01, 0.05, 0.2],
+        help="client lag before each receive in seconds",
+    )
+    parser.add_argument(
+        "--socket-mode",
+        default=rtde.SocketMode.HIGH_THROUGHPUT,
+        help="RTDE socket mode (high_throughput)",
+    )
+    args = parser.parse_args()
+
+    controller = None
+    if args.host is None:
+        controller = FakeController(config=args.config).start()
+        args.host, args.port = controller.host, controller.port
+
+    names, types = rtde_config.ConfigFile(args.config).get_recipe("out")
+    con = rtde.RTDE(args.host, args.port, mode=args.socket_mode)
+    con.connect()
+    if not con.send_output_setup(names, types, frequency=args.frequency):
+        sys.exit("Unable to configure output")
+    if not con.send_start():
+        sys.exit("Unable to start synchronization")
+
+    print("{} fields at {} Hz".format(len(names), args.frequency))
+    for lag in args.lags:
+        con.receive()
+        skipped = con.skipped_package_count
+        spent = 0.0
+        for _ in range(args.count):
+            time.sleep(lag)
+            t0 = time.perf_counter()
+            con.receive()
+            spent += time.perf_counter() - t0
+        print(
+            "lag {:6.3f}s  receive {:8.1f}us  skipped {:6.1f}/call".format(
+                lag,
+                spent / args.count * 1e6,
+                (con.skipped_package_count - skipped) / float(args.count),
+            )
+        )
+
+    con.send_pause()
+    con.disconnect()
+    if controller is not None:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
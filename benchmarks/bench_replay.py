@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+
+"""Replay throughput: a recording played as fast as possible into CSVWriter.
+
+Loops the recording through ReplayRTDE at speed 0 and writes every sample
+to an in-memory CSVWriter, the same path record.py --replay takes.
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import rtde.csv_writer as csv_writer
+import rtde.replay as replay
+
+ROBOT_DATA = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "robot_data.csv"
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", default=ROBOT_DATA, help="recording to replay")
+    parser.add_argument(
+        "--fields",
+        nargs="+",
+        default=["timestamp", "actual_q", "actual_current"],
+        help="fields of the output recipe",
+    )
+    parser.add_argument("--samples", type=int, default=50000, help="samples")
+    args = parser.parse_args()
+
+    con = replay.ReplayRTDE(args.input, speed=0, loop=True)
+    con.connect()
+    if not con.send_output_setup(args.fields):
+        sys.exit("fields not in recording: " + args.input)
+    con.send_start()
+    config = con.output_configs[0]
+    writer = csv_writer.CSVWriter(io.StringIO(), config.names, config.types)
+    writer.writeheader()
+
+    start = time.perf_counter()
+    for _ in range(args.samples):
+        writer.writerow(con.receive())
+    spent = time.perf_counter() - start
+    print(
+        "{} samples in {:.3f}s, {:.0f} samples/s, {:.2f}us/sample".format(
+            args.samples, spent, args.samples / spent, spent / args.samples * 1e6
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
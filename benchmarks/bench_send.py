@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Send latency of the RTDE input path against a stand-in controller.
+
+Compares send(DataObject), send_values() with a list or NumPy array and
+send_batch() with two recipes, and the pack cost of DataConfig.pack (the
+old allocating path) against InputPacker. Without --host a local
+fake_controller is started in this process.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import rtde.rtde as rtde
+from rtde import serialize
+from fake_controller import FakeController
+
+POINTS = (50, 90, 99, 99.9)
+
+
+def percentiles(samples, points=POINTS):
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return [ordered[min(last, int(len(ordered) * p / 100.0))] for p in points]
+
+
+def report(name, samples):
+    columns = [
+        "p{:g} {:8.2f}us".format(p, v * 1e6)
+        for p, v in zip(POINTS, percentiles(samples))
+    ]
+    print("{:<24s} {}".format(name, "  ".join(columns)))
+
+
+def run(count, rate, step):
+    period = 1.0 / rate if rate > 0 else 0.0
+    samples = []
+    deadline = time.perf_counter()
+    for k in range(count):
+        t0 = time.perf_counter()
+        step(k)
+        samples.append(time.perf_counter() - t0)
+        if period:
+            deadline += period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", help="controller to use instead of a stand-in")
+    parser.add_argument("--port", type=int, default=30004, help="port number (30004)")
+    parser.add_argument("--count", type=int, default=5000, help="packages per case")
+    parser.add_argument(
+        "--rate", type=float, default=500, help="send rate in Hz, 0 for no pacing"
+    )
+    parser.add_argument(
+        "--registers", type=int, default=6, help="double registers per recipe"
+    )
+    args = parser.parse_args()
+
+    controller = None
+    if args.host is None:
+        controller = FakeController().start()
+        args.host, args.port = controller.host, controller.port
+
+    con = rtde.RTDE(args.host, args.port)
+    con.connect()
+    doubles = ["input_double_register_%d" % i for i in range(args.registers)]
+    ints = ["input_int_register_%d" % i for i in range(args.registers)]
+    setp = con.send_input_setup(doubles, ["DOUBLE"] * len(doubles))
+    watchdog = con.send_input_setup(ints, ["INT32"] * len(ints))
+    if not con.send_start():
+        sys.exit("Unable to start synchronization")
+
+    values = [0.1 * i for i in range(args.registers)]
+    counters = list(range(args.registers))
+
+    def send_object(k):
+        for name, value in zip(doubles, values):
+            setp.__dict__[name] = value + k
+        con.send(setp)
+
+    def send_list(k):
+        values[0] = k * 0.001
+        con.send_values(setp.recipe_id, values)
+
+    batch = [(setp.recipe_id, values), (watchdog.recipe_id, counters)]
+
+    def send_batch(k):
+        counters[0] = k
+        con.send_batch(batch)
+
+    print("{} packages per case at {} Hz".format(args.count, args.rate or "max"))
+    report("send(DataObject)", run(args.count, args.rate, send_object))
+    report("send_values(list)", run(args.count, args.rate, send_list))
+    try:
+        import numpy as np
+
+        array = np.array(values)
+
+        def send_array(k):
+            array[0] = k * 0.001
+            con.send_values(setp.recipe_id, array)
+
+        report("send_values(ndarray)", run(args.count, args.rate, send_array))
+    except ImportError:
+        print("NumPy not available, skipping send_values(ndarray)")
+    report("send_batch(2 recipes)", run(args.count, args.rate, send_batch))
+
+    config = serialize.DataConfig.unpack_recipe(
+        bytes([setp.recipe_id]) + ",".join(["DOUBLE"] * len(doubles)).encode()
+    )
+    config.names = doubles
+    packer = serialize.InputPacker(config, rtde.Command.RTDE_DATA_PACKAGE)
+    report("DataConfig.pack", run(args.count, 0, lambda k: config.pack(setp)))
+    report("InputPacker.pack", run(args.count, 0, lambda k: packer.pack(values)))
+
+    con.send_pause()
+    con.disconnect()
+    if controller is not None:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Publisher to subscriber latency of the shared memory ring.
+
+A writer appends records whose timestamp field holds time.perf_counter(),
+subscriber processes spin on the ring and report how long after the write
+they saw each record. Spinning readers need a core each, with fewer cores
+the numbers show scheduling delays rather than the ring.
+"""
+
+import argparse
+import multiprocessing
+import os
+import struct
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import rtde.rtde_config as rtde_config
+from rtde.shm_ring import RingOverrunException, ShmRingReader, ShmRingWriter
+from bench_send import report
+from fake_controller import DEFAULT_CONFIG, synthetic_values
+
+
+def subscribe(name, count, results):
+    ring = ShmRingReader(name)
+    latencies = []
+    overruns = 0
+    seq = 0
+    while seq < count:
+        if not ring.wait(seq, timeout=5.0):
+            break
+        seen = time.perf_counter()
+        try:
+            view = ring.view(seq)
+            timestamp = view.timestamp
+            if ring.valid(seq):
+                latencies.append(seen - timestamp)
+            del view
+        except RingOverrunException:
+            overruns += 1
+        seq += 1
+    results.put((latencies, overruns))
+    ring.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="recipe file")
+    parser.add_argument("--count", type=int, default=5000, help="records")
+    parser.add_argument("--rate", type=float, default=500, help="write rate in Hz")
+    parser.add_argument("--readers", type=int, default=1, help="subscribers")
+    args = parser.parse_args()
+
+    names, types = rtde_config.ConfigFile(args.config).get_recipe("out")
+    if "timestamp" not in names:
+        sys.exit("The recipe needs a timestamp field")
+    ring = ShmRingWriter("rtde_bench_%d" % os.getpid(), names, types)
+    record = struct.Struct(ring.config.fmt[:1] + ring.config.fmt[2:])
+    values = synthetic_values(types, 1)
+    index = names.index("timestamp")
+    offset = sum(len(synthetic_values([t], 0)) for t in types[:index])
+
+    results = multiprocessing.Queue()
+    readers = [
+        multiprocessing.Process(target=subscribe, args=(ring.name, args.count, results))
+        for _ in range(args.readers)
+    ]
+    for reader in readers:
+        reader.start()
+    time.sleep(0.5)
+
+    period = 1.0 / args.rate
+    deadline = time.perf_counter()
+    for _ in range(args.count):
+        values[offset] = time.perf_counter()
+        ring.write(record.pack(*values))
+        deadline += period
+        delay = deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    print("{} fields, {} records at {} Hz".format(len(names), args.count, args.rate))
+    for i in range(args.readers):
+        latencies, overruns = results.get()
+        report("reader %d" % i, latencies)
+        if overruns:
+            print("  overruns: %d" % overruns)
+    for reader in readers:
+        reader.join()
+    ring.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""SQLite insert rate and query latency on a synthetic capture.
+
+Builds --rows samples of timestamp, actual_current, actual_TCP_force,
+robot_mode, safety_status and runtime_state at 500 Hz, exports them with
+SQLiteWriter.writerows() as export_sqlite.py does, times the index
+creation, the live path (writerow() with binary payloads, as record.py
+--sqlite) on a part of them and the median latency of a few queries.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import rtde.sqlite_writer as sqlite_writer
+from rtde import serialize
+
+NAMES = [
+    "timestamp",
+    "actual_current",
+    "actual_TCP_force",
+    "robot_mode",
+    "safety_status",
+    "runtime_state",
+]
+TYPES = ["DOUBLE", "VECTOR6D", "VECTOR6D", "INT32", "INT32", "UINT32"]
+QUERIES = [
+    (
+        "faults with force",
+        "SELECT count(*) FROM samples "
+        "WHERE safety_status != 1 AND actual_TCP_force_2 > 50",
+    ),
+    (
+        "one second",
+        "SELECT * FROM samples WHERE timestamp BETWEEN 1000 AND 1001",
+    ),
+    ("by robot mode", "SELECT robot_mode, count(*) FROM samples GROUP BY robot_mode"),
+    ("not running", "SELECT count(*) FROM samples WHERE runtime_state != 2"),
+]
+
+
+def synthetic(rows):
+    """Big endian rows in the payload layout of NAMES and TYPES"""
+    columns = [c for c, _ in serialize.flat_columns(NAMES, TYPES)]
+    formats = [">f8"] * 13 + [">i4", ">i4", ">u4"]
+    data = np.zeros(rows, dtype=list(zip(columns, formats)))
+    rng = np.random.default_rng(1)
+    data["timestamp"] = np.arange(rows) / 500.0
+    for j in range(6):
+        data["actual_current_" + str(j)] = rng.normal(0, 2, rows)
+        data["actual_TCP_force_" + str(j)] = rng.normal(0, 20, rows)
+    # mostly running normally with rare stretches of something else
+    rare = rng.random(rows) < 0.001
+    data["robot_mode"] = np.where(rare, 5, 7)
+    data["safety_status"] = np.where(rng.random(rows) < 0.001, 3, 1)
+    data["runtime_state"] = np.where(rare, 1, 2)
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000000, help="rows (2000000)")
+    parser.add_argument(
+        "--live-rows", type=int, default=200000, help="rows for writerow (200000)"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="query runs (5)")
+    args = parser.parse_args()
+
+    data = synthetic(args.rows)
+    rows = data.tolist()
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "export.db")
+        writer = sqlite_writer.SQLiteWriter(
+            filename, NAMES, TYPES, batch_rows=50000, defer_indexes=True
+        )
+        writer.writeheader()
+        start = time.perf_counter()
+        writer.writerows(rows)
+        inserted = time.perf_counter()
+        writer.close()
+        indexed = time.perf_counter()
+        print(
+            "export {} rows: {:.0f} rows/s, indexes {:.2f}s, {:.0f} MB".format(
+                args.rows,
+                args.rows / (inserted - start),
+                indexed - inserted,
+                os.path.getsize(filename) / 1e6,
+            )
+        )
+
+        live = sqlite_writer.SQLiteWriter(
+            os.path.join(tmp, "live.db"), NAMES, TYPES, flush_interval=1.0
+        )
+        live.writeheader()
+        payloads = [row.tobytes() for row in data[: args.live_rows]]
+        start = time.perf_counter()
+        for payload in payloads:
+            live.writerow(payload)
+        live.close()
+        spent = time.perf_counter() - start
+        print(
+            "live {} rows: {:.0f} rows/s, {:.1f}us/row".format(
+                len(payloads), len(payloads) / spent, spent / len(payloads) * 1e6
+            )
+        )
+
+        import sqlite3
+
+        db = sqlite3.connect(filename)
+        for name, query in QUERIES:
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = db.execute(query).fetchall()
+                times.append(time.perf_counter() - start)
+            print(
+                "{:18s} {:8.2f}ms  {} rows".format(
+                    name, sorted(times)[len(times) // 2] * 1000, len(result)
+                )
+            )
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
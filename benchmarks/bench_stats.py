@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+
+"""Per-sample cost of StreamingStats on a full recipe.
+
+Feeds synthetic samples of the recipe to StreamingStats both as data
+objects (add) and as binary payloads (add_payload) and reports the time
+per sample, including the block folds.
+"""
+
+import argparse
+import os
+import struct
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import rtde.rtde_config as rtde_config
+import rtde.stats as rtde_stats
+from rtde import serialize
+from fake_controller import DEFAULT_CONFIG, synthetic_values
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="recipe file")
+    parser.add_argument("--number", type=int, default=50000, help="samples")
+    parser.add_argument("--block-size", type=int, default=256, help="block size")
+    args = parser.parse_args()
+
+    names, types = rtde_config.ConfigFile(args.config).get_recipe("out")
+    config = serialize.DataConfig.unpack_recipe(
+        struct.pack(">B", 1) + ",".join(types).encode("utf-8")
+    )
+    config.names = names
+    package = struct.pack(config.fmt, 1, *synthetic_values(types, 1))
+    state = config.unpack(package)
+    payload = package[1:]
+
+    print(
+        "{} fields, {} columns".format(
+            len(names), len(rtde_stats.StreamingStats(names, types).columns)
+        )
+    )
+    for name, method, sample in (
+        ("add", "add", state),
+        ("add_payload", "add_payload", payload),
+    ):
+        stats = rtde_stats.StreamingStats(names, types, block_size=args.block_size)
+        add = getattr(stats, method)
+        spent = timeit.timeit(lambda: add(sample), number=args.number)
+        print("{:<12s} {:8.2f}us/sample".format(name, spent / args.number * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Stand-in RTDE controller for benchmarks and offline development.
+
+Speaks the server side of the RTDE protocol (version 2) well enough for
+rtde.RTDE: output and input setup, start/pause, text messages and a
+synthetic data stream at the requested frequencies. Field types are taken
+from a recipe configuration file.
+"""
+
+import argparse
+import logging
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from rtde.rtde import Command
+from rtde import serialize
+
+_log = logging.getLogger("fake_controller")
+
+DEFAULT_CONFIG = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "record_configuration.xml"
+)
+CONTROLLER_VERSION = (5, 11, 0, 0)
+
+# input fields are not part of the recipe files, match them by prefix
+INPUT_TYPES = [
+    ("input_bit_register_", "BOOL"),
+    ("input_int_register_", "INT32"),
+    ("input_double_register_", "DOUBLE"),
+    ("standard_digital_output", "UINT8"),
+    ("configurable_digital_output", "UINT8"),
+    ("speed_slider_mask", "UINT32"),
+    ("speed_slider_fraction", "DOUBLE"),
+    ("standard_analog_output_", "DOUBLE"),
+]
+
+
+def load_field_types(filename):
+    """Returns a dict of field name to type for every field in the file."""
+    types = {}
+    for field in ET.parse(filename).getroot().iter("field"):
+        types[field.get("name")] = field.get("type")
+    return types
+
+
+def pack_package(command, payload=b""):
+    return struct.pack(">HB", 3 + len(payload), command) + payload
+
+
+def synthetic_values(types, sample):
+    """Flat list of values for one sample of a recipe."""
+    values = []
+    for t in types:
+        size = serialize.get_item_size(t)
+        if t.endswith("D") or t == "DOUBLE":
+            value = sample * 0.002
+        elif t == "BOOL":
+            value = bool(sample & 1)
+        elif t == "UINT8":
+            value = sample & 0xFF
+        else:
+            value = sample & 0x7FFFFFFF
+        values.extend([value] * size)
+    return values
+
+
+class _Recipe(object):
+    def __init__(self, recipe_id, names, types, frequency):
+        self.id = recipe_id
+        self.names = names
+        self.types = types
+        self.frequency = frequency
+        config = serialize.DataConfig.unpack_recipe(
+            struct.pack(">B", recipe_id) + ",".join(types).encode("utf-8")
+        )
+        self.struct = struct.Struct(config.fmt)
+
+    def package(self, sample):
+        values = synthetic_values(self.types, sample)
+        # the timestamp field is driven by the sample counter
+        if "timestamp" in self.names:
+            index = sum(
+                serialize.get_item_size(t)
+                for t in self.types[: self.names.index("timestamp")]
+            )
+            values[index] = sample / float(self.frequency)
+        return pack_package(
+            Command.RTDE_DATA_PACKAGE, self.struct.pack(self.id, *values)
+        )
+
+
+class _Session(object):
+    def __init__(self, controller, sock):
+        self.controller = controller
+        self.sock = sock
+        self.outputs = []
+        self.inputs = {}
+        self.input_count = 0
+        self.input_times = []
+        self.started = threading.Event()
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def send(self, data):
+        with self.lock:
+            self.sock.sendall(data)
+
+    def reply(self, command, payload=b""):
+        self.send(pack_package(command, payload))
+
+    def setup_recipe(self, names):
+        return [self.controller.field_type(n) for n in names]
+
+    def on_package(self, command, payload):
+        if command == Command.RTDE_REQUEST_PROTOCOL_VERSION:
+            self.reply(command, b"\x01")
+        elif command == Command.RTDE_GET_URCONTROL_VERSION:
+            self.reply(command, struct.pack(">IIII", *CONTROLLER_VERSION))
+        elif command == Command.RTDE_CONTROL_PACKAGE_SETUP_OUTPUTS:
+            frequency = struct.unpack_from(">d", payload)[0]
+            names = payload[8:].decode("utf-8").split(",")
+            types = self.setup_recipe(names)
+            recipe_id = len(self.outputs) + 1
+            if "NOT_FOUND" not in types:
+                self.outputs.append(_Recipe(recipe_id, names, types, frequency))
+            self.reply(command, struct.pack(">B", recipe_id) + ",".join(types).encode())
+        elif command == Command.RTDE_CONTROL_PACKAGE_SETUP_INPUTS:
+            names = payload.decode("utf-8").split(",")
+            types = self.setup_recipe(names)
+            recipe_id = len(self.inputs) + 1
+            self.inputs[recipe_id] = types
+            self.reply(command, struct.pack(">B", recipe_id) + ",".join(types).encode())
+        elif command == Command.RTDE_CONTROL_PACKAGE_START:
+            self.reply(command, b"\x01")
+            self.started.set()
+        elif command == Command.RTDE_CONTROL_PACKAGE_PAUSE:
+            self.started.clear()
+            self.reply(command, b"\x01")
+        elif command == Command.RTDE_DATA_PACKAGE:
+            self.input_count += 1
+            if self.controller.record_input_times:
+                self.input_times.append(time.perf_counter())
+        elif command == Command.RTDE_TEXT_MESSAGE:
+            pass
+        else:
+            _log.warning("Unknown package command: %d", command)
+
+    def stream(self):
+        samples = {}
+        start = None
+        while not self.closed:
+            if not self.started.wait(0.1):
+                start = None
+                continue
+            if not self.outputs:
+                time.sleep(0.001)
+                continue
+            now = time.perf_counter()
+            if start is None:
+                start = now
+                samples = dict((r.id, 0) for r in self.outputs)
+            data = []
+            next_due = None
+            for recipe in self.outputs:
+                due = start + samples[recipe.id] / recipe.frequency
+                while due <= now:
+                    data.append(recipe.package(samples[recipe.id]))
+                    samples[recipe.id] += 1
+                    due = start + samples[recipe.id] / recipe.frequency
+                next_due = due if next_due is None else min(next_due, due)
+            if data:
+                try:
+                    self.send(b"".join(data))
+                except socket.error:
+                    return
+            delay = next_due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def run(self):
+        streamer = threading.Thread(target=self.stream)
+        streamer.daemon = True
+        streamer.start()
+        buf = b""
+        try:
+            while True:
+                more = self.sock.recv(65536)
+                if not more:
+                    break
+                buf += more
+                while len(buf) >= 3:
+                    header = serialize.ControlHeader.unpack(buf)
+                    if len(buf) < header.size:
+                        break
+                    payload, buf = buf[3 : header.size], buf[header.size :]
+                    self.on_package(header.command, payload)
+        except socket.error:
+            pass
+        finally:
+            self.closed = True
+            self.sock.close()
+
+
+class FakeController(object):
+    """Serves RTDE clients on a local port from a background thread."""
+
+    def __init__(self, host="127.0.0.1", port=0, config=DEFAULT_CONFIG):
+        self.field_types = load_field_types(config)
+        self.record_input_times = False
+        self.sessions = []
+        self.__server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.__server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.__server.bind((host, port))
+        self.__server.listen(8)
+        self.host, self.port = self.__server.getsockname()
+        self.__thread = None
+
+    def field_type(self, name):
+        if name in self.field_types:
+            return self.field_types[name]
+        for prefix, t in INPUT_TYPES:
+            if name.startswith(prefix):
+                return t
+        return "NOT_FOUND"
+
+    def start(self):
+        self.__thread = threading.Thread(target=self.serve_forever)
+        self.__thread.daemon = True
+        self.__thread.start()
+        return self
+
+    def serve_forever(self):
+        while True:
+            try:
+                sock, _ = self.__server.accept()
+            except socket.error:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            session = _Session(self, sock)
+            self.sessions.append(session)
+            thread = threading.Thread(target=session.run)
+            thread.daemon = True
+            thread.start()
+
+    def stop(self):
+        self.__server.close()
+        for session in self.sessions:
+            session.closed = True
+            try:
+                session.sock.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind")
+    parser.add_argument("--port", type=int, default=30004, help="port (30004)")
+    parser.add_argument(
+        "--config", default=DEFAULT_CONFIG, help="recipe file with field types"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    controller = FakeController(args.host, args.port, args.config)
+    _log.info("Serving RTDE on %s:%d", controller.host, controller.port)
+    try:
+        controller.serve_forever()
+    except KeyboardInterrupt:
+        controller.stop()
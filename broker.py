@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# Copyright (c) 2020-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.append("..")
+import rtde.rtde as rtde
+import rtde.rtde_config as rtde_config
+from rtde.broker import RTDEBroker
+
+# parameters
+parser = argparse.ArgumentParser(
+    description="Serve subsets of one RTDE controller connection to local clients"
+)
+parser.add_argument(
+    "--host", default="192.168.56.101", help="name of host to connect to (localhost)"
+)
+parser.add_argument("--port", type=int, default=30004, help="port number (30004)")
+parser.add_argument(
+    "--frequency",
+    type=int,
+    default=500,
+    help="upstream frequency in Herz, clients get integer fractions of it (500)",
+)
+parser.add_argument(
+    "--config",
+    default="record_configuration.xml",
+    help="recipe with every field clients may request (record_configuration.xml)",
+)
+parser.add_argument(
+    "--listen-host", default="127.0.0.1", help="address to serve on (127.0.0.1)"
+)
+parser.add_argument(
+    "--listen-port", type=int, default=30004, help="port to serve on (30004)"
+)
+parser.add_argument("--unix", help="also serve on this Unix domain socket path")
+parser.add_argument(
+    "--client-queue",
+    type=int,
+    default=500,
+    help="disconnect clients more than this many samples behind (500)",
+)
+parser.add_argument("--verbose", help="increase output verbosity", action="store_true")
+args = parser.parse_args()
+
+if args.verbose:
+    logging.basicConfig(level=logging.INFO)
+
+if not os.path.exists(args.config):
+    print(f"Error: Configuration file '{args.config}' not found.")
+    sys.exit(1)
+
+conf = rtde_config.ConfigFile(args.config)
+output_names, output_types = conf.get_recipe("out")
+
+con = rtde.RTDE(args.host, args.port)
+con.connect()
+
+# setup the union recipe upstream
+if not con.send_output_setup(output_names, output_types, frequency=args.frequency):
+    logging.error("Unable to configure output")
+    sys.exit()
+
+broker = RTDEBroker(
+    con, output_names, output_types, args.frequency, queue_size=args.client_queue
+)
+host, port = broker.listen_tcp(args.listen_host, args.listen_port)
+sys.stdout.write("Serving RTDE on {}:{}\n".format(host, port))
+if args.unix:
+    broker.listen_unix(args.unix)
+    sys.stdout.write("Serving RTDE on {}\n".format(args.unix))
+
+try:
+    broker.serve_forever()
+except KeyboardInterrupt:
+    pass
+except rtde.RTDEException:
+    pass
+finally:
+    broker.stop()
+    con.disconnect()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# Copyright (c) 2020-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.append("..")
+import rtde.convert as convert
+import rtde.rtde_config as rtde_config
+from rtde.csv_binary_reader import is_binary_recording
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert a recording between CSV text and the binary layout "
+        "written by record.py --binary, the direction follows the input"
+    )
+    parser.add_argument("input", help="recording to convert")
+    parser.add_argument("output", help="converted file")
+    parser.add_argument(
+        "--config",
+        help="data configuration file giving the column types of a CSV input "
+        "(all DOUBLE)",
+    )
+    parser.add_argument("--recipe", default="out", help="recipe key in --config (out)")
+    parser.add_argument("--delimiter", default=",", help="CSV delimiter (,)")
+    parser.add_argument("--jobs", type=int, help="worker processes (number of cores)")
+    parser.add_argument(
+        "--chunk-size", type=int, default=16, help="megabytes per chunk (16)"
+    )
+    parser.add_argument(
+        "--verbose", help="increase output verbosity", action="store_true"
+    )
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO)
+
+    if not os.path.exists(args.input):
+        print(f"Error: Recording '{args.input}' not found.")
+        sys.exit(1)
+
+    start = time.monotonic()
+    chunk_size = args.chunk_size * 1024 * 1024
+    if is_binary_recording(args.input):
+        convert.binary_to_csv(
+            args.input, args.output, args.delimiter, args.jobs, chunk_size
+        )
+    else:
+        types = None
+        if args.config:
+            conf = rtde_config.ConfigFile(args.config)
+            names, recipe_types = conf.get_recipe(args.recipe)
+            with open(args.input) as f:
+                columns = f.readline().rstrip("\r\n").split(args.delimiter)
+            types = convert.column_types(
+                columns, names, recipe_types, conf.get_recipe_policies(args.recipe)
+            )
+        try:
+            convert.csv_to_binary(
+                args.input, args.output, types, args.delimiter, args.jobs, chunk_size
+            )
+        except ValueError as e:
+            os.remove(args.output)
+            print(f"Error: {e}")
+            sys.exit(1)
+    spent = time.monotonic() - start
+    size = os.path.getsize(args.input)
+    logging.info(
+        "Converted %.1f MB in %.2fs, %.1f MB/s", size / 1e6, spent, size / 1e6 / spent
+    )
+
+
+# the guard keeps process pool workers from running the script again
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# Copyright (c) 2020-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import logging
+import os
+import struct
+import sys
+
+sys.path.append("..")
+import rtde.raw_capture as raw_capture
+from rtde import serialize
+
+HOST_TIME = struct.Struct(">Q")
+# rows of a recipe collected before they are appended to its .npy file
+NPY_CHUNK_ROWS = 65536
+
+
+def output_filename(output, key, first):
+    if first:
+        return output
+    root, ext = os.path.splitext(output)
+    return root + "_" + key + ext
+
+
+class _Output(object):
+    """Rows of one recipe key, in the requested format"""
+
+    def __init__(self, filename, recipe, fmt, host_time):
+        self.filename = filename
+        self.format = fmt
+        self.host_time = host_time
+        self.rows = 0
+        names, types = list(recipe["names"]), list(recipe["types"])
+        if host_time:
+            names.append("host_time_ns")
+            types.append("UINT64")
+        self.names, self.types = names, types
+        if fmt == "npy":
+            import numpy as np
+            import rtde.columnar as columnar
+
+            self.__source = np.dtype(
+                [
+                    (n, ">" + f)
+                    for n, f in serialize.flat_columns(self.names, self.types)
+                ]
+            )
+            self.__file = columnar.NpyFile(filename, self.__source.newbyteorder("="))
+            self.__data = bytearray()
+            self.__pending = 0
+            return
+        if fmt == "binary":
+            import rtde.csv_binary_writer as csv_binary_writer
+
+            self.__file = open(filename, "wb")
+            self.__writer = csv_binary_writer.CSVBinaryWriter(self.__file, names, types)
+        else:
+            import rtde.csv_writer as csv_writer
+
+            self.__file = open(filename, "w", newline="")
+            self.__writer = csv_writer.CSVWriter(self.__file, names, types)
+        self.__writer.writeheader()
+
+    def add(self, recipe, payload, host_ns):
+        self.rows += 1
+        if self.format == "csv":
+            state = recipe["config"].unpack(payload)
+            if self.host_time:
+                state.host_time_ns = host_ns or 0
+            self.__writer.writerow(state)
+            return
+        row = bytes(payload[1:])
+        if self.host_time:
+            row += HOST_TIME.pack(host_ns or 0)
+        if self.format == "npy":
+            self.__data += row
+            self.__pending += 1
+            if self.__pending >= NPY_CHUNK_ROWS:
+                self.__append()
+        else:
+            self.__writer.writerow(row)
+
+    def __append(self):
+        import numpy as np
+
+        self.__file.append(np.frombuffer(self.__data, dtype=self.__source))
+        self.__data = bytearray()
+        self.__pending = 0
+
+    def close(self):
+        if self.format == "npy" and self.__pending:
+            self.__append()
+        self.__file.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Decode a capture written by record.py --raw, one output per "
+        "recipe as record.py names them"
+    )
+    parser.add_argument("capture", help="raw capture to decode")
+    parser.add_argument("output", help="decoded file of the first recipe")
+    parser.add_argument(
+        "--format",
+        choices=["csv", "binary", "npy"],
+        default="csv",
+        help="CSV text, the record.py --binary layout or a NumPy array (csv)",
+    )
+    parser.add_argument(
+        "--host-time",
+        help="add a host_time_ns column from the capture's time marks",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--messages", help="print the text messages of the capture", action="store_true"
+    )
+    parser.add_argument(
+        "--verbose", help="increase output verbosity", action="store_true"
+    )
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO)
+
+    if not os.path.exists(args.capture):
+        print(f"Error: Capture '{args.capture}' not found.")
+        sys.exit(1)
+
+    outputs = {}
+    with open(args.capture, "rb") as f:
+        try:
+            reader = raw_capture.RawCaptureReader(f)
+        except ValueError as e:
+            print(f"Error: {e}: '{args.capture}'.")
+            sys.exit(1)
+        try:
+            for recipe, payload, host_ns in reader.packages():
+                key = recipe["key"]
+                output = outputs.get(key)
+                if output is None:
+                    # named by the recipe order of the capture, like record.py
+                    first = key == reader.keys[0]
+                    filename = output_filename(args.output, key, first)
+                    output = _Output(filename, recipe, args.format, args.host_time)
+                    outputs[key] = output
+                output.add(recipe, payload, host_ns)
+        finally:
+            for output in outputs.values():
+                output.close()
+
+    for key, output in outputs.items():
+        print("{}: {} rows to {}".format(key, output.rows, output.filename))
+    logging.info(
+        "%d marks, %d restarts, other packages %s",
+        reader.marks,
+        reader.restarts,
+        dict(reader.commands),
+    )
+    if args.messages:
+        for message in reader.messages:
+            print(serialize.Message.unpack(message).message)
+
+
+if __name__ == "__main__":
+    main()
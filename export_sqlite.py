@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# Copyright (c) 2020-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import csv
+import logging
+import os
+import sys
+import time
+
+sys.path.append("..")
+import rtde.convert as convert
+import rtde.rtde_config as rtde_config
+import rtde.sqlite_writer as sqlite_writer
+from rtde.csv_binary_reader import CSVBinaryReader, is_binary_recording
+
+
+def csv_rows(reader):
+    # empty cells are samples a downsampling policy skipped
+    for row in reader:
+        yield [value if value != "" else None for value in row]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export a recording, CSV text or binary, to a table of an "
+        "SQLite database, rows are appended if the table exists"
+    )
+    parser.add_argument("input", help="recording to export")
+    parser.add_argument("output", help="SQLite database")
+    parser.add_argument("--table", default="samples", help="table name (samples)")
+    parser.add_argument(
+        "--config",
+        help="data configuration file giving the column types of a CSV input "
+        "(all REAL)",
+    )
+    parser.add_argument("--recipe", default="out", help="recipe key in --config (out)")
+    parser.add_argument("--delimiter", default=",", help="CSV delimiter (,)")
+    parser.add_argument(
+        "--batch",
+        type=int,
+        default=50000,
+        help="rows per transaction (50000)",
+    )
+    parser.add_argument(
+        "--verbose", help="increase output verbosity", action="store_true"
+    )
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO)
+
+    if not os.path.exists(args.input):
+        print(f"Error: Recording '{args.input}' not found.")
+        sys.exit(1)
+
+    start = time.monotonic()
+    binary = is_binary_recording(args.input)
+    with open(args.input, "rb") if binary else open(args.input, newline="") as f:
+        if binary:
+            reader = CSVBinaryReader(f)
+            names, types, rows = reader.names, reader.types, reader.read_rows()
+        else:
+            reader = csv.reader(f, delimiter=args.delimiter)
+            names = next(reader)
+            types = ["DOUBLE"] * len(names)
+            if args.config:
+                recipe_names, recipe_types = rtde_config.ConfigFile(
+                    args.config
+                ).get_recipe(args.recipe)
+                types = convert.column_types(names, recipe_names, recipe_types)
+            rows = csv_rows(reader)
+        with sqlite_writer.SQLiteWriter(
+            args.output,
+            names,
+            types,
+            table=args.table,
+            batch_rows=args.batch,
+            defer_indexes=True,
+        ) as writer:
+            writer.writeheader()
+            writer.writerows(rows)
+    spent = time.monotonic() - start
+    logging.info(
+        "Exported %d rows in %.2fs, %.0f rows/s",
+        writer.rows,
+        spent,
+        writer.rows / spent,
+    )
+
+
+if __name__ == "__main__":
+    main()
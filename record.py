@@ -23,14 +23,17 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import argparse
+import contextlib
 import logging
+import operator
+import os
+import struct
 import sys
+import time
 
 sys.path.append("..")
 import rtde.rtde as rtde
 import rtde.rtde_config as rtde_config
-import rtde.csv_writer as csv_writer
-import rtde.csv_binary_writer as csv_binary_writer
 
 # parameters
 parser = argparse.ArgumentParser()
@@ -51,8 +54,7 @@ parser.add_argument(
 )
 parser.add_argument(
     "--output",
-    default="robot_data.csv",
-    help="data output file to write to (robot_data.csv)",
+    help="data output file to write to (robot_data.csv, robot_data.db with --sqlite)",
 )
 parser.add_argument("--verbose", help="increase output verbosity", action="store_true")
 parser.add_argument(
@@ -63,13 +65,254 @@ parser.add_argument(
 parser.add_argument(
     "--binary", help="save the data in binary format", action="store_true"
 )
+parser.add_argument(
+    "--socket-mode",
+    choices=[rtde.SocketMode.LOW_LATENCY, rtde.SocketMode.HIGH_THROUGHPUT],
+    default=rtde.SocketMode.LOW_LATENCY,
+    help="small reads for latency or large reads for throughput (low_latency)",
+)
+parser.add_argument(
+    "--recv-size", type=int, help="bytes per socket read (mode default)"
+)
+parser.add_argument("--rcvbuf", type=int, help="socket SO_RCVBUF (mode default)")
+parser.add_argument(
+    "--busy-poll", help="spin on the socket instead of blocking", action="store_true"
+)
+parser.add_argument(
+    "--queue-packets",
+    type=int,
+    help="bound the --buffered receive queue to N packages (unbounded)",
+)
+parser.add_argument(
+    "--queue-bytes",
+    type=int,
+    default=16 * 1024 * 1024,
+    help="bound the --buffered receive queue to N bytes (16 MB)",
+)
+parser.add_argument(
+    "--overflow",
+    choices=[
+        rtde.OverflowPolicy.BLOCK,
+        rtde.OverflowPolicy.DROP_OLDEST,
+        rtde.OverflowPolicy.DROP_NEWEST,
+    ],
+    default=rtde.OverflowPolicy.BLOCK,
+    help="what a full receive queue does (block)",
+)
+parser.add_argument(
+    "--reconnect",
+    help="reconnect when the connection is lost and keep recording",
+    action="store_true",
+)
+parser.add_argument(
+    "--reconnect-attempts",
+    type=int,
+    default=0,
+    help="give up after N failed attempts, 0 retries forever (0)",
+)
+parser.add_argument(
+    "--reconnect-max-delay",
+    type=float,
+    default=10.0,
+    help="longest wait between reconnect attempts in seconds (10.0)",
+)
+parser.add_argument(
+    "--reconnect-timeouts",
+    type=int,
+    default=5,
+    help="reconnect after N receive timeouts of one second in a row (5)",
+)
+parser.add_argument(
+    "--replay", metavar="FILE", help="read the data from a recording instead of a robot"
+)
+parser.add_argument(
+    "--replay-speed",
+    type=float,
+    default=1.0,
+    help="replay speed factor, 0 replays as fast as possible (1.0)",
+)
+parser.add_argument(
+    "--stats",
+    metavar="FILE",
+    help="write running statistics of the first recipe as JSON lines to FILE",
+)
+parser.add_argument(
+    "--stats-interval",
+    type=float,
+    default=10.0,
+    help="seconds covered by each statistics line (10.0)",
+)
+parser.add_argument(
+    "--stats-fields", nargs="+", help="fields to keep statistics of (all)"
+)
+parser.add_argument(
+    "--stats-only", help="only write statistics, no samples", action="store_true"
+)
+parser.add_argument(
+    "--write-behind",
+    help="write files from a background thread through double buffers",
+    action="store_true",
+)
+parser.add_argument(
+    "--write-buffer",
+    type=int,
+    default=4096,
+    help="kilobytes per write behind buffer (4096)",
+)
+parser.add_argument(
+    "--flush-rows", type=int, help="hand the buffer over every N rows (when full)"
+)
+parser.add_argument(
+    "--flush-ms",
+    type=float,
+    help="hand rows over at most T ms after they arrive (when full)",
+)
+parser.add_argument(
+    "--fsync-s",
+    type=float,
+    help="write and fsync rows at most T seconds after they arrive (never)",
+)
+parser.add_argument(
+    "--trigger",
+    action="append",
+    metavar="EXPR",
+    help="only record the first recipe around samples where EXPR is true, "
+    "e.g. 'robot_mode != prev.robot_mode' (repeatable)",
+)
+parser.add_argument(
+    "--pre-trigger",
+    type=float,
+    default=2.0,
+    help="seconds recorded before a trigger (2.0)",
+)
+parser.add_argument(
+    "--post-trigger",
+    type=float,
+    default=2.0,
+    help="seconds recorded after a trigger (2.0)",
+)
+parser.add_argument(
+    "--profile",
+    metavar="DIR",
+    help="profile the receive loop and write the artifacts to DIR",
+)
+parser.add_argument(
+    "--profile-mode",
+    choices=["sample", "cprofile"],
+    default="sample",
+    help="stack sampling or a full cProfile trace (sample)",
+)
+parser.add_argument(
+    "--profile-interval",
+    type=float,
+    default=5.0,
+    help="milliseconds between stack samples (5.0)",
+)
+parser.add_argument(
+    "--trace-frames",
+    type=int,
+    default=0,
+    help="trace allocations with tracemalloc keeping N frames each, slows "
+    "every allocation down (0, off)",
+)
+parser.add_argument(
+    "--low-jitter",
+    help="freeze and defer garbage collection while recording",
+    action="store_true",
+)
+parser.add_argument(
+    "--gc-mode",
+    choices=["defer", "off"],
+    default="defer",
+    help="with --low-jitter, collect young objects between samples or never (defer)",
+)
+parser.add_argument(
+    "--cpus",
+    type=int,
+    nargs="+",
+    help="with --low-jitter, pin the receive loop to these CPUs",
+)
+parser.add_argument(
+    "--fifo",
+    type=int,
+    default=0,
+    metavar="PRIORITY",
+    help="with --low-jitter, run the receive loop with SCHED_FIFO at PRIORITY",
+)
+parser.add_argument(
+    "--jitter",
+    help="measure and report the loop period jitter of the first recipe",
+    action="store_true",
+)
+parser.add_argument(
+    "--host-time",
+    help="add a host_time_ns column, time.monotonic_ns() at the socket read",
+    action="store_true",
+)
+parser.add_argument(
+    "--clock",
+    help="estimate controller clock offset, drift and sample latency",
+    action="store_true",
+)
+parser.add_argument(
+    "--raw",
+    help="append the received byte stream undecoded to the output, see decode_raw.py",
+    action="store_true",
+)
+parser.add_argument(
+    "--raw-block",
+    type=int,
+    default=1024,
+    help="with --raw, kilobytes collected per write (1024)",
+)
+parser.add_argument(
+    "--raw-mark-ms",
+    type=float,
+    default=10.0,
+    help="with --raw, milliseconds between host time marks, 0 for every read (10)",
+)
+parser.add_argument(
+    "--duration", type=float, default=0, help="seconds to record (0 = no limit)"
+)
+parser.add_argument(
+    "--sqlite",
+    help="write SQLite databases instead of CSV files, see export_sqlite.py",
+    action="store_true",
+)
+parser.add_argument(
+    "--columnar",
+    help="write directories with one .npy file per column instead of CSV files",
+    action="store_true",
+)
 args = parser.parse_args()
+if args.output is None:
+    args.output = "robot_data.db" if args.sqlite else "robot_data.csv"
+
+if args.stats_only and not args.stats:
+    parser.error("--stats-only requires --stats")
+if args.raw and (
+    args.stats or args.trigger or args.jitter or args.clock or args.host_time
+):
+    parser.error(
+        "--raw does not decode, it cannot be combined with --stats, --trigger, "
+        "--jitter, --clock or --host-time"
+    )
+for option in ("sqlite", "columnar"):
+    if getattr(args, option) and (
+        args.binary or args.raw or args.write_behind or args.sqlite and args.columnar
+    ):
+        parser.error(
+            "--{} cannot be combined with --binary, --raw, --write-behind or "
+            "another output format".format(option)
+        )
+if args.raw and args.samples:
+    parser.error("--raw counts no samples, use --duration")
+if args.raw and args.replay:
+    parser.error("--raw captures the controller stream, a replay has none")
 
 if args.verbose:
     logging.basicConfig(level=logging.INFO)
 
-import os
-
 if not os.path.exists(args.config):
     print(f"Error: Configuration file '{args.config}' not found.")
     sys.exit(1)
@@ -78,69 +321,528 @@ if not os.path.exists(args.config):
 
 conf = rtde_config.ConfigFile(args.config)
 
+# "out" and every "out_*" recipe are set up with their own frequency and file
+recipe_keys = conf.get_recipe_keys("out")
+if not recipe_keys:
+    print(f"Error: No output recipe found in '{args.config}'.")
+    sys.exit(1)
+
+
+def output_filename(key):
+    if key == recipe_keys[0]:
+        return args.output
+    root, ext = os.path.splitext(args.output)
+    return root + "_" + key + ext
+
+
+write_behind_files = []
+
+
+def open_output(filename, binary=False):
+    if not args.write_behind:
+        if args.binary or binary:
+            return open(filename, "wb")
+        return open(filename, "w", newline="")
+    import rtde.write_behind as write_behind
+
+    csvfile = write_behind.WriteBehindFile(
+        open(filename, "wb"),
+        buffer_size=args.write_buffer * 1024,
+        flush_rows=args.flush_rows,
+        flush_interval=args.flush_ms / 1000.0 if args.flush_ms else None,
+        fsync_interval=args.fsync_s,
+    )
+    write_behind_files.append(csvfile)
+    return csvfile
+
+
+def open_writer(filename, output_names, output_types, policies=None):
+    if args.host_time:
+        output_names = output_names + ["host_time_ns"]
+        output_types = output_types + ["UINT64"]
+        if policies is not None:
+            policies = list(policies) + [None]
+    # only the writer in use is imported, it keeps start up short
+    if args.sqlite:
+        import rtde.sqlite_writer as sqlite_writer
 
-output_names, output_types = conf.get_recipe("out")
+        # replaced like a CSV file, rows are committed at most a second after
+        # they came so the database can be queried while recording
+        writer = sqlite_writer.SQLiteWriter(
+            filename, output_names, output_types, flush_interval=1.0, replace=True
+        )
+        writer.writeheader()
+        return writer, writer
+    if args.columnar:
+        import rtde.columnar as columnar
 
+        writer = columnar.ColumnarWriter(
+            filename, output_names, output_types, flush_interval=1.0
+        )
+        writer.writeheader()
+        return writer, writer
+    csvfile = open_output(filename)
+    if args.binary:
+        import rtde.csv_binary_writer as csv_binary_writer
+
+        writer = csv_binary_writer.CSVBinaryWriter(csvfile, output_names, output_types)
+    else:
+        import rtde.csv_writer as csv_writer
+
+        writer = csv_writer.CSVWriter(
+            csvfile, output_names, output_types, policies=policies
+        )
+    writer.writeheader()
+    return csvfile, writer
 
-con = rtde.RTDE(args.host, args.port)
+
+if args.replay:
+    import rtde.replay as replay
+
+    con = replay.ReplayRTDE(args.replay, speed=args.replay_speed)
+else:
+    con = rtde.RTDE(
+        args.host,
+        args.port,
+        mode=args.socket_mode,
+        recv_size=args.recv_size,
+        rcvbuf=args.rcvbuf,
+        busy_poll=args.busy_poll,
+        queue_packets=args.queue_packets,
+        queue_bytes=args.queue_bytes,
+        overflow=args.overflow,
+    )
 con.connect()
 
 # get controller version
 con.get_controller_version()
 
 # setup recipes
-if not con.send_output_setup(output_names, output_types, frequency=args.frequency):
-    logging.error("Unable to configure output")
-    sys.exit()
+recipes = []
+for key in recipe_keys:
+    output_names, output_types = conf.get_recipe(key)
+    frequency = conf.get_recipe_frequency(key, args.frequency)
+    if not con.send_output_setup(output_names, output_types, frequency=frequency):
+        logging.error("Unable to configure output recipe " + key)
+        sys.exit()
+    policies = conf.get_recipe_policies(key)
+    if (args.binary or args.sqlite or args.columnar) and any(policies):
+        logging.warning("Field policies of recipe %s only apply to CSV output", key)
+    recipes.append((key, output_names, output_types, policies))
 
 # start data synchronization
 if not con.send_start():
     logging.error("Unable to start synchronization")
     sys.exit()
 
-writeModes = "wb" if args.binary else "w"
-with open(args.output, writeModes,newline='') as csvfile:
-    writer = None
 
-    if args.binary:
-        writer = csv_binary_writer.CSVBinaryWriter(csvfile, output_names, output_types)
+
+def write_progress(i):
+    """Writes the progress line, i counts samples of the first recipe"""
+    sys.stdout.write("\r")
+    if args.samples > 0:
+        sys.stdout.write("{:.2%} done.".format(float(i) / float(args.samples)))
     else:
-        writer = csv_writer.CSVWriter(csvfile, output_names, output_types)
+        sys.stdout.write("{:3d} samples.".format(i))
+    sys.stdout.flush()
 
-    writer.writeheader()
 
+def write_summary(out, stats, start):
+    """Writes one statistics line and starts the next interval"""
+    import json
+
+    fields = stats.summary()
+    summary = {"start": start, "end": time.time(), "samples": stats.count}
+    summary["fields"] = fields
+    out.write(json.dumps(summary, separators=(",", ":")) + "\n")
+    out.flush()
+    stats.reset()
+
+
+def sample_timestamp(state):
+    """Controller timestamp of a sample of the first recipe, None if unknown"""
+    if binary:
+        state = primary_config.view(primary_prefix + state)
+    return getattr(state, "timestamp", None)
+
+
+def timestamp_reader():
+    """Function returning the controller timestamp of a first recipe sample,
+    binary payloads are read in place instead of through a view"""
+    if not binary:
+        return operator.attrgetter("timestamp")
+    offset, unpacker, _ = primary_config.get_fields()["timestamp"]
+    offset -= 1  # the payload has no recipe id
+    return lambda state: unpacker.unpack_from(state, offset)[0]
+
+
+HOST_TIME = struct.Struct(">Q")
+
+
+def add_host_time(state, ns):
+    """The sample with the host_time_ns column open_writer adds"""
+    if binary:
+        return state + HOST_TIME.pack(ns)
+    state.host_time_ns = ns
+    return state
+
+
+def reconnect_session(error):
+    """Reconnects and returns the gap record, None if reconnecting failed"""
+    sys.stdout.write("\rConnection lost: {}, reconnecting\n".format(error))
+    lost_at = time.time()
+    start = time.monotonic()
+    if not con.reconnect(
+        attempts=args.reconnect_attempts or None, max_delay=args.reconnect_max_delay
+    ):
+        logging.error("Unable to reconnect")
+        return None
+    return {
+        "lost_at": lost_at,
+        "resumed_at": time.time(),
+        "reconnect_s": time.monotonic() - start,
+    }
+
+
+def write_gap(out, gap, last, first):
+    """Completes the gap record with the samples on either side, writes it
+    and returns the number of lost samples (None if unknown)"""
+    import json
+
+    before = sample_timestamp(last) if last is not None else None
+    after = sample_timestamp(first)
+    lost = None
+    # the controller clock restarts with the controller, then it is unknown
+    if before is not None and after is not None and after > before:
+        lost = max(int(round((after - before) * frequency)) - 1, 0)
+    gap.update(last_timestamp=before, next_timestamp=after, lost_samples=lost)
+    out.write(json.dumps(gap) + "\n")
+    out.flush()
+    sys.stdout.write(
+        "\rReconnected in {:.2f}s, {} samples lost\n".format(
+            gap["reconnect_s"], "unknown" if lost is None else lost
+        )
+    )
+    return lost
+
+
+def raw_recipes():
+    """The output recipes as RawCaptureWriter.write_recipes takes them"""
+    return [
+        {
+            "id": config.id,
+            "key": key,
+            "names": config.names,
+            "types": config.types,
+            "frequency": conf.get_recipe_frequency(key, args.frequency),
+        }
+        for config, (key, _, _, _) in zip(con.output_configs, recipes)
+    ]
+
+
+def map_recipes():
+    """Writers by recipe id, ids can change when reconnecting"""
+    global writers, primary_id, primary_config, primary_prefix
+    writers = {
+        config.id: writer
+        for config, writer in zip(con.output_configs, recipe_writers)
+        if writer is not None
+    }
+    # progress, --samples, statistics, triggers and gaps use the first recipe
+    primary_config = con.output_configs[0]
+    primary_id = primary_config.id
+    primary_prefix = bytes([primary_id])
+
+
+# statistics are fed binary payloads whenever no text CSV is written
+binary = args.binary or args.stats_only or args.sqlite or args.columnar
+with contextlib.ExitStack() as stack:
+    recipe_writers = []
+    for key, output_names, output_types, policies in recipes:
+        if args.stats_only or args.trigger or args.raw:
+            recipe_writers.append(None)
+            continue
+        csvfile, writer = open_writer(
+            output_filename(key), output_names, output_types, policies
+        )
+        stack.enter_context(csvfile)
+        recipe_writers.append(writer)
+
+    map_recipes()
+    frequency = conf.get_recipe_frequency(recipe_keys[0], args.frequency)
+
+    triggers = None
+    if args.trigger and not args.stats_only:
+        import rtde.trigger as rtde_trigger
+
+        _, output_names, output_types, policies = recipes[0]
+
+        def open_event(index, trigger):
+            root, ext = os.path.splitext(args.output)
+            filename = "{}_event{:03d}{}".format(root, index, ext)
+            sys.stdout.write("\rEvent {}: {}\n".format(index, trigger.expression))
+            return open_writer(filename, output_names, output_types, policies)
+
+        try:
+            triggers = rtde_trigger.TriggerRecorder(
+                [rtde_trigger.Trigger(e, output_names) for e in args.trigger],
+                int(round(args.pre_trigger * frequency)),
+                int(round(args.post_trigger * frequency)),
+                open_event,
+            )
+        except ValueError as e:
+            logging.error(str(e))
+            con.send_pause()
+            con.disconnect()
+            sys.exit(1)
+        stack.callback(triggers.close)
+
+    stats = None
+    if args.stats:
+        import rtde.stats as rtde_stats
+
+        _, output_names, output_types, _ = recipes[0]
+        stats = rtde_stats.StreamingStats(
+            output_names, output_types, fields=args.stats_fields
+        )
+        stats_add = stats.add_payload if binary else stats.add
+        stats_file = stack.enter_context(open(args.stats, "w"))
+        stats_start = time.time()
+        next_summary = time.monotonic() + args.stats_interval
+
+    raw = None
+    if args.raw:
+        import rtde.raw_capture as raw_capture
+
+        raw = raw_capture.RawCaptureWriter(
+            stack.enter_context(open_output(args.output, binary=True)),
+            block_size=args.raw_block * 1024,
+            mark_interval=args.raw_mark_ms / 1000.0,
+        )
+        stack.callback(raw.close)
+        raw.write_recipes(raw_recipes())
+
+    gaps = None
+    # a raw capture has no samples to find the gap with, its marks show it
+    if args.reconnect and not args.raw:
+        gaps = stack.enter_context(open(args.output + ".gaps", "w"))
+    pending_gap = None
+    last_sample = None
+    reconnects = 0
+    lost_samples = 0
+
+    if args.profile:
+        import rtde.profiling as profiling
+
+        metadata = {
+            "argv": sys.argv,
+            "source": args.replay or "{}:{}".format(args.host, args.port),
+            "controller_version": con.controller_version,
+            "recipes": [
+                {
+                    "key": key,
+                    "frequency": conf.get_recipe_frequency(key, args.frequency),
+                    "names": output_names,
+                    "types": output_types,
+                }
+                for key, output_names, output_types, _ in recipes
+            ],
+        }
+        stack.enter_context(
+            profiling.Profiler(
+                args.profile,
+                metadata,
+                mode=args.profile_mode,
+                interval=args.profile_interval / 1000.0,
+                trace_frames=args.trace_frames,
+            )
+        )
+
+    read_timestamp = None
+    if args.jitter or args.clock:
+        if "timestamp" not in recipes[0][1]:
+            logging.error(
+                "--jitter and --clock need the timestamp field in recipe %s",
+                recipes[0][0],
+            )
+            sys.exit(1)
+        read_timestamp = timestamp_reader()
+
+    meter = None
+    if args.jitter:
+        import rtde.jitter as jitter
+
+        meter = jitter.JitterMeter(frequency)
+
+    clock = None
+    if args.clock:
+        import rtde.clock as rtde_clock
+
+        clock = rtde_clock.ClockEstimator()
+
+    low_jitter = None
+    if args.low_jitter:
+        import rtde.jitter as jitter
+
+        low_jitter = stack.enter_context(
+            jitter.LowJitter(args.gc_mode, cpus=args.cpus, fifo_priority=args.fifo)
+        )
+
+    end = time.monotonic() + args.duration if args.duration else None
+    # a link that died silently only shows as receive timeouts
+    timeouts = 0
     i = 1
     keep_running = True
     while keep_running:
-
-        if i % args.frequency == 0:
-            if args.samples > 0:
-                sys.stdout.write("\r")
-                sys.stdout.write("{:.2%} done.".format(float(i) / float(args.samples)))
-                sys.stdout.flush()
-            else:
-                sys.stdout.write("\r")
-                sys.stdout.write("{:3d} samples.".format(i))
-                sys.stdout.flush()
         if args.samples > 0 and i >= args.samples:
             keep_running = False
+        if end is not None and time.monotonic() >= end:
+            keep_running = False
         try:
+            if args.reconnect and timeouts >= args.reconnect_timeouts:
+                timeouts = 0
+                raise rtde.RTDEException(
+                    "no data received in {} receive timeouts".format(
+                        args.reconnect_timeouts
+                    )
+                )
+            if raw is not None:
+                data = con.read_raw()
+                if data:
+                    raw.write(data)
+                    timeouts = 0
+                else:
+                    timeouts += 1
+                continue
             if args.buffered:
-                state = con.receive_buffered(args.binary)
+                state = con.receive_buffered(binary)
+                if state is None and not con.is_connected():
+                    # the queue emptied after the controller closed the link
+                    raise rtde.RTDEException("connection lost")
+                if state is None and not con.has_data(rtde.DEFAULT_TIMEOUT):
+                    timeouts += 1
             else:
-                state = con.receive(args.binary)
+                state = con.receive(binary)
+                if state is None:
+                    timeouts += 1
             if state is not None:
-                writer.writerow(state)
-                i += 1
+                timeouts = 0
+                recipe_id = con.last_recipe_id
+                row = state
+                if args.host_time:
+                    row = add_host_time(state, con.last_receive_ns)
+                if read_timestamp is not None and recipe_id == primary_id:
+                    timestamp = read_timestamp(state)
+                    if meter is not None:
+                        meter.add(timestamp)
+                    if clock is not None:
+                        clock.add(timestamp, con.last_receive_ns / 1e9)
+                if recipe_id in writers:
+                    writers[recipe_id].writerow(row)
+                if recipe_id == primary_id:
+                    i += 1
+                    # counted on the first recipe, other recipes do not repeat it
+                    if i % args.frequency == 0:
+                        write_progress(i)
+                    if triggers is not None:
+                        if binary:
+                            view = primary_config.view(primary_prefix + state)
+                            triggers.feed(row, view)
+                        else:
+                            triggers.feed(row, row)
+                    if stats is not None:
+                        stats_add(state)
+                        if time.monotonic() >= next_summary:
+                            write_summary(stats_file, stats, stats_start)
+                            stats_start = time.time()
+                            next_summary += args.stats_interval
+                    if gaps is not None:
+                        if pending_gap is not None:
+                            lost = write_gap(gaps, pending_gap, last_sample, state)
+                            lost_samples += lost or 0
+                            pending_gap = None
+                        last_sample = state
+                    if low_jitter is not None:
+                        low_jitter.idle()
 
         except KeyboardInterrupt:
             keep_running = False
-        except rtde.RTDEException:
+        except (rtde.RTDEException, OSError) as e:
             con.disconnect()
-            sys.exit()
+            if args.replay:
+                keep_running = False  # end of the recording
+            elif not args.reconnect:
+                if isinstance(e, OSError):
+                    raise
+                sys.exit()
+            else:
+                if pending_gap is None:
+                    pending_gap = reconnect_session(e)
+                else:  # lost again before a sample arrived, keep the first gap
+                    gap = reconnect_session(e)
+                    if gap is not None:
+                        pending_gap["reconnect_s"] += gap["reconnect_s"]
+                        pending_gap["resumed_at"] = gap["resumed_at"]
+                    else:
+                        pending_gap = None
+                keep_running = pending_gap is not None
+                if keep_running:
+                    reconnects += 1
+                    map_recipes()
+                    if raw is not None:
+                        raw.write_recipes(raw_recipes())
 
+    if stats is not None:
+        stats.flush()
+        if stats.count:
+            write_summary(stats_file, stats, stats_start)
 
 sys.stdout.write("\rComplete!            \n")
+if meter is not None:
+    for line in jitter.format_summary(meter.summary()):
+        sys.stdout.write("Jitter: " + line + "\n")
+if clock is not None:
+    for line in rtde_clock.format_summary(clock.summary()):
+        sys.stdout.write("Clock: " + line + "\n")
+if args.reconnect and reconnects:
+    logging.info("%d reconnects, %d samples lost", reconnects, lost_samples)
+
+stats = con.socket_stats
+if stats["syscalls_per_package"] is not None:
+    logging.info(
+        "%d data packages, %d recv, %d send, %d poll calls, %.2f syscalls/package",
+        stats["data_packages"],
+        stats["recv_calls"],
+        stats["send_calls"],
+        stats["poll_calls"],
+        stats["syscalls_per_package"],
+    )
+
+if args.buffered:
+    queue = con.queue_stats
+    logging.info(
+        "receive queue peak %d packages, %d bytes, %d overflows, %d dropped",
+        queue["peak_packets"],
+        queue["peak_bytes"],
+        queue["overflows"],
+        queue["dropped"],
+    )
+
+for csvfile in write_behind_files:
+    stall, flush = csvfile.stall_latency, csvfile.flush_latency
+    logging.info(
+        "%s: %d flushes, mean %.0fus, max %.0fus, %d stalls, max %.0fus",
+        csvfile.name,
+        flush.count,
+        flush.summary()["mean_us"],
+        flush.max * 1e6,
+        stall.count,
+        stall.max * 1e6,
+    )
+    logging.info("%s: flush latency %s", csvfile.name, flush.summary()["buckets"])
+    if stall.count:
+        logging.info("%s: stall latency %s", csvfile.name, stall.summary()["buckets"])
 
-con.send_pause()
+if con.is_connected():
+    con.send_pause()
 con.disconnect()
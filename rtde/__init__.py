@@ -22,4 +22,27 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 from .rtde import *
-from .rtde_config import *
+
+# rtde_config needs xml.etree, it is only imported when one of its names is used
+_LAZY_NAMES = {
+    "ConfigFile": "rtde_config",
+    "Recipe": "rtde_config",
+    "rtde_config": "rtde_config",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_NAMES.get(name)
+    if module is None:
+        raise AttributeError("module 'rtde' has no attribute " + repr(name))
+    import importlib
+
+    value = importlib.import_module("." + module, __name__)
+    if name != module:
+        value = getattr(value, name)
+    globals()[name] = value
+    return value
+
+
+# "from rtde import *" also exports the lazy names, importing rtde_config
+__all__ = [name for name in globals() if not name.startswith("_")] + list(_LAZY_NAMES)
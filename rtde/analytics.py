@@ -0,0 +1,287 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Per-recording aggregates for shift reports, computed in parallel.
+
+analyze_file() reduces one recording to a small dict of mergeable
+aggregates (counts, sums, extremes), merge() combines any number of them
+and summary_row() turns one into a flat table row. analyze() fans the
+files out over a process pool and keeps per-file results in a ResultCache
+so a re-run only reads new or modified recordings.
+"""
+
+import concurrent.futures
+import json
+import logging
+import math
+import operator
+import os
+
+import numpy as np
+
+from rtde.csv_binary_reader import CSVBinaryReader, is_binary_recording
+from rtde.csv_reader import CSVReader
+from rtde.rtde import LOGNAME
+
+_log = logging.getLogger(LOGNAME)
+
+JOINTS = 6
+TIMESTAMP = "timestamp"
+CURRENT = "actual_current"
+VOLTAGE = "actual_joint_voltage"
+TEMPERATURE = "joint_temperatures"
+ROBOT_MODE = "robot_mode"
+
+# bump when the layout or the meaning of the per-file results changes
+CACHE_VERSION = 2
+
+
+def load_columns(filename, delimiter=","):
+    """Dict of column name to numpy array for a CSV or binary recording.
+    Fields recorded with a downsampling policy hold their last value, they
+    are NaN before the first one."""
+    if is_binary_recording(filename):
+        with open(filename, "rb") as f:
+            return CSVBinaryReader(f).read_columns()
+    with open(filename) as f:
+        reader = CSVReader(f, delimiter=delimiter, dense=True)
+    return {name: getattr(reader, name) for name in reader.get_header()}
+
+
+def _joint_columns(columns, name):
+    names = [name + "_" + str(i) for i in range(JOINTS)]
+    if not all(n in columns for n in names):
+        return None
+    return np.column_stack([columns[n] for n in names]).astype(np.float64)
+
+
+def _sample_periods(columns, samples):
+    """Seconds each sample stands for, the last one gets the median period"""
+    if TIMESTAMP not in columns or samples < 2:
+        return None
+    periods = np.diff(columns[TIMESTAMP].astype(np.float64))
+    return np.append(periods, np.median(periods))
+
+
+def analyze_file(filename, delimiter=","):
+    """Reduces one recording to mergeable aggregates"""
+    columns = load_columns(filename, delimiter)
+    samples = len(next(iter(columns.values()))) if columns else 0
+    result = {"files": 1, "samples": samples}
+    if samples == 0:
+        return result
+    dt = _sample_periods(columns, samples)
+    if dt is not None:
+        result["duration"] = float(dt.sum())
+
+    current = _joint_columns(columns, CURRENT)
+    if current is not None and not np.isnan(current).all():
+        # leading rows are NaN if the field has a downsampling policy
+        valid = ~np.isnan(current).any(axis=1)
+        result["current"] = {
+            "count": int(valid.sum()),
+            "sum": current[valid].sum(axis=0).tolist(),
+            "sumsq": np.square(current[valid]).sum(axis=0).tolist(),
+            "min": current[valid].min(axis=0).tolist(),
+            "max": current[valid].max(axis=0).tolist(),
+        }
+        voltage = _joint_columns(columns, VOLTAGE)
+        if voltage is not None and dt is not None:
+            power = current * voltage
+            result["energy"] = np.nansum(power * dt[:, None], axis=0).tolist()
+
+    temperature = _joint_columns(columns, TEMPERATURE)
+    if temperature is not None and not np.isnan(temperature).all():
+        result["temperature_max"] = np.nanmax(temperature, axis=0).tolist()
+
+    if ROBOT_MODE in columns and dt is not None:
+        valid = ~np.isnan(columns[ROBOT_MODE])
+        modes = columns[ROBOT_MODE][valid].astype(np.int64)
+        values, inverse = np.unique(modes, return_inverse=True)
+        seconds = np.bincount(inverse, weights=dt[valid])
+        result["robot_mode"] = {
+            str(v): float(s) for v, s in zip(values.tolist(), seconds)
+        }
+    return result
+
+
+def _merge_lists(a, b, func):
+    return [func(x, y) for x, y in zip(a, b)]
+
+
+def merge(results):
+    """Combines per-file aggregates into one"""
+    total = {"files": 0, "samples": 0}
+    for result in results:
+        total["files"] += result["files"]
+        total["samples"] += result["samples"]
+        if "duration" in result:
+            total["duration"] = total.get("duration", 0.0) + result["duration"]
+        if "current" in result:
+            current = result["current"]
+            if "current" not in total:
+                total["current"] = dict(current)
+            else:
+                merged = total["current"]
+                merged["count"] += current["count"]
+                for key in ("sum", "sumsq"):
+                    merged[key] = _merge_lists(merged[key], current[key], operator.add)
+                merged["min"] = _merge_lists(merged["min"], current["min"], min)
+                merged["max"] = _merge_lists(merged["max"], current["max"], max)
+        if "energy" in result:
+            energy = total.get("energy", [0.0] * JOINTS)
+            total["energy"] = _merge_lists(energy, result["energy"], operator.add)
+        if "temperature_max" in result:
+            peak = total.get("temperature_max", result["temperature_max"])
+            total["temperature_max"] = _merge_lists(
+                peak, result["temperature_max"], max
+            )
+        if "robot_mode" in result:
+            modes = total.setdefault("robot_mode", {})
+            for mode, seconds in result["robot_mode"].items():
+                modes[mode] = modes.get(mode, 0.0) + seconds
+    return total
+
+
+def summary_columns(results):
+    """Column names of summary_row for a set of results"""
+    columns = ["name", "files", "samples", "duration"]
+    for metric in ("current_min", "current_max", "current_mean", "current_rms"):
+        columns += [metric + "_" + str(i) for i in range(JOINTS)]
+    columns += ["energy_" + str(i) for i in range(JOINTS)]
+    columns += ["temperature_max_" + str(i) for i in range(JOINTS)]
+    modes = set()
+    for result in results:
+        modes.update(result.get("robot_mode", {}))
+    columns += ["robot_mode_" + m + "_s" for m in sorted(modes, key=int)]
+    return columns
+
+
+def summary_row(name, result):
+    """Flat dict of the values in one summary table row"""
+    row = {
+        "name": name,
+        "files": result["files"],
+        "samples": result["samples"],
+        "duration": result.get("duration"),
+    }
+    current = result.get("current")
+    if current is not None:
+        count = current["count"]
+        for i in range(JOINTS):
+            row["current_min_" + str(i)] = current["min"][i]
+            row["current_max_" + str(i)] = current["max"][i]
+            row["current_mean_" + str(i)] = current["sum"][i] / count
+            row["current_rms_" + str(i)] = math.sqrt(current["sumsq"][i] / count)
+    for i, value in enumerate(result.get("energy", [])):
+        row["energy_" + str(i)] = value
+    for i, value in enumerate(result.get("temperature_max", [])):
+        row["temperature_max_" + str(i)] = value
+    for mode, seconds in result.get("robot_mode", {}).items():
+        row["robot_mode_" + mode + "_s"] = seconds
+    return row
+
+
+class ResultCache(object):
+    """Per-file results in a JSON file, keyed by path, size and mtime"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.__entries = {}
+        self.__dirty = False
+        if filename is not None and os.path.exists(filename):
+            try:
+                with open(filename) as f:
+                    data = json.load(f)
+            except ValueError:
+                _log.warning("Ignoring unreadable cache: " + filename)
+            else:
+                if data.get("version") == CACHE_VERSION:
+                    self.__entries = data["files"]
+
+    @staticmethod
+    def __key(filename):
+        stat = os.stat(filename)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def get(self, filename):
+        entry = self.__entries.get(os.path.abspath(filename))
+        if entry is None or entry["key"] != self.__key(filename):
+            return None
+        return entry["result"]
+
+    def put(self, filename, result):
+        self.__entries[os.path.abspath(filename)] = {
+            "key": self.__key(filename),
+            "result": result,
+        }
+        self.__dirty = True
+
+    def save(self):
+        if self.filename is None or not self.__dirty:
+            return
+        tmp = self.filename + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": CACHE_VERSION, "files": self.__entries}, f)
+        os.replace(tmp, self.filename)
+        self.__dirty = False
+
+
+def analyze(filenames, jobs=None, cache=None, delimiter=","):
+    """Per-file aggregates of all recordings, in the order given.
+
+    Files missing from the cache are analyzed on a pool of jobs processes
+    (one per core by default), largest first so the pool drains evenly.
+    """
+    if cache is None:
+        cache = ResultCache(None)
+    results = {}
+    pending = []
+    for filename in filenames:
+        result = cache.get(filename)
+        if result is None:
+            pending.append(filename)
+        else:
+            results[filename] = result
+    _log.info("%d cached, %d to analyze", len(results), len(pending))
+    pending.sort(key=os.path.getsize, reverse=True)
+
+    def store(filename, result):
+        results[filename] = result
+        cache.put(filename, result)
+
+    try:
+        if jobs == 1 or len(pending) < 2:
+            for filename in pending:
+                store(filename, analyze_file(filename, delimiter))
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = {
+                    executor.submit(analyze_file, filename, delimiter): filename
+                    for filename in pending
+                }
+                for future in concurrent.futures.as_completed(futures):
+                    store(futures[future], future.result())
+    finally:
+        cache.save()
+    return [(filename, results[filename]) for filename in filenames]
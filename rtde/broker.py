@@ -0,0 +1,347 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Local RTDE broker: one upstream controller connection, many local clients.
+
+The broker sets up a single output recipe upstream with the union of the
+fields any client may ask for and accepts local clients over TCP or a Unix
+domain socket. Clients speak the RTDE protocol as implemented by rtde.RTDE.
+Each output setup is answered with a recipe of its own and served at the
+upstream frequency divided by an integer, and every upstream sample is
+re-packed into per-client data packages by copying byte ranges of the
+payload, without decoding it. Input recipes are not brokered.
+
+The upstream loop never waits on a client: packages are queued per client
+and written by a sender thread of its own, a client that falls more than
+queue_size samples behind is disconnected.
+"""
+
+import collections
+import logging
+import os
+import socket
+import struct
+import threading
+
+from rtde import serialize
+from rtde.rtde import (
+    DEFAULT_TIMEOUT,
+    PACKAGE_HEADER,
+    RTDE_PROTOCOL_VERSION_1,
+    RTDE_PROTOCOL_VERSION_2,
+    Command,
+    LOGNAME,
+    RTDEException,
+)
+
+_log = logging.getLogger(LOGNAME)
+
+
+class _ClientRecipe(object):
+    __slots__ = ["id", "divider", "counter", "header", "ranges"]
+
+    def __init__(self, recipe_id, divider, ranges):
+        self.id = recipe_id
+        self.divider = divider
+        self.counter = 0
+        self.ranges = ranges
+        size = PACKAGE_HEADER.size + 1 + sum(end - start for start, end in ranges)
+        self.header = struct.pack(">HBB", size, Command.RTDE_DATA_PACKAGE, recipe_id)
+
+    def package(self, payload):
+        parts = [self.header]
+        parts.extend(payload[start:end] for start, end in self.ranges)
+        return b"".join(parts)
+
+
+class _BrokerClient(object):
+    def __init__(self, broker, sock, address, queue_size):
+        self.broker = broker
+        self.sock = sock
+        self.address = address
+        self.queue_size = queue_size
+        self.recipes = []
+        self.started = False
+        self.closed = False
+        self.__queue = collections.deque()
+        self.__samples = 0  # queued data packages, replies are not counted
+        self.__condition = threading.Condition()
+
+    def send(self, data, sample=False):
+        """Queues data for the sender thread, False if the client is
+        queue_size samples behind"""
+        with self.__condition:
+            if sample:
+                if self.__samples >= self.queue_size:
+                    return False
+                self.__samples += 1
+            self.__queue.append((data, sample))
+            self.__condition.notify()
+        return True
+
+    def close(self):
+        with self.__condition:
+            self.closed = True
+            self.__condition.notify()
+
+    def run_sender(self):
+        try:
+            while True:
+                with self.__condition:
+                    while not self.__queue and not self.closed:
+                        self.__condition.wait()
+                    if self.closed:
+                        return
+                    items = list(self.__queue)
+                    self.__queue.clear()
+                    self.__samples = 0
+                self.sock.sendall(b"".join(data for data, _ in items))
+        except socket.error as e:
+            _log.warning("Dropping client %s: %s", self.address, e)
+        finally:
+            self.broker.remove(self)
+
+    def reply(self, command, payload=b""):
+        size = PACKAGE_HEADER.size + len(payload)
+        self.send(PACKAGE_HEADER.pack(size, command) + payload)
+
+    def on_sample(self, payload):
+        """Queues the packages of an upstream sample, False if the client
+        is too far behind"""
+        packages = []
+        for recipe in self.recipes:
+            if recipe.counter == 0:
+                packages.append(recipe.package(payload))
+            recipe.counter = (recipe.counter + 1) % recipe.divider
+        if packages:
+            return self.send(b"".join(packages), sample=True)
+        return True
+
+    def __setup_outputs(self, payload):
+        frequency = struct.unpack_from(">d", payload)[0]
+        names = payload[8:].decode("utf-8").split(",")
+        types, ranges = self.broker.lookup(names)
+        recipe_id = len(self.recipes) + 1
+        reply = struct.pack(">B", recipe_id) + ",".join(types).encode("utf-8")
+        if ranges is None:
+            _log.warning("%s: unknown output fields requested", self.address)
+        else:
+            divider = self.broker.divider(frequency)
+            self.recipes.append(_ClientRecipe(recipe_id, divider, ranges))
+            _log.info(
+                "%s: output recipe %d, %d fields every %d samples",
+                self.address,
+                recipe_id,
+                len(names),
+                divider,
+            )
+        self.reply(Command.RTDE_CONTROL_PACKAGE_SETUP_OUTPUTS, reply)
+
+    def on_packet(self, command, payload):
+        if command == Command.RTDE_REQUEST_PROTOCOL_VERSION:
+            version = struct.unpack_from(">H", payload)[0]
+            supported = version in (RTDE_PROTOCOL_VERSION_1, RTDE_PROTOCOL_VERSION_2)
+            self.reply(command, struct.pack(">B", supported))
+        elif command == Command.RTDE_GET_URCONTROL_VERSION:
+            self.reply(command, struct.pack(">IIII", *self.broker.controller_version))
+        elif command == Command.RTDE_CONTROL_PACKAGE_SETUP_OUTPUTS:
+            self.__setup_outputs(payload)
+        elif command == Command.RTDE_CONTROL_PACKAGE_SETUP_INPUTS:
+            names = payload.decode("utf-8").split(",")
+            _log.warning("%s: input recipes are not brokered", self.address)
+            types = ",".join(["NOT_FOUND"] * len(names)).encode("utf-8")
+            self.reply(command, b"\x00" + types)
+        elif command == Command.RTDE_CONTROL_PACKAGE_START:
+            for recipe in self.recipes:
+                recipe.counter = 0
+            self.started = True
+            self.reply(command, b"\x01")
+        elif command == Command.RTDE_CONTROL_PACKAGE_PAUSE:
+            self.started = False
+            self.reply(command, b"\x01")
+        elif command == Command.RTDE_TEXT_MESSAGE:
+            pass
+        elif command == Command.RTDE_DATA_PACKAGE:
+            pass  # no input recipes
+        else:
+            _log.error("%s: unknown package command: %d", self.address, command)
+
+    def run(self):
+        buf = b""
+        try:
+            while not self.closed:
+                try:
+                    more = self.sock.recv(4096)
+                except socket.timeout:
+                    continue
+                if not more:
+                    break
+                buf += more
+                while len(buf) >= PACKAGE_HEADER.size:
+                    size, command = PACKAGE_HEADER.unpack_from(buf)
+                    if len(buf) < size:
+                        break
+                    payload, buf = buf[PACKAGE_HEADER.size : size], buf[size:]
+                    self.on_packet(command, payload)
+        except socket.error as e:
+            _log.info("%s: %s", self.address, e)
+        finally:
+            self.broker.remove(self)
+
+
+class RTDEBroker(object):
+    """Serves local RTDE clients from one started upstream connection.
+
+    con must have a single output recipe set up with names and types at
+    frequency, serve_forever() starts it and dispatches samples. A client
+    more than queue_size samples behind is disconnected.
+    """
+
+    def __init__(self, con, names, types, frequency, queue_size=500):
+        self.__con = con
+        self.frequency = frequency
+        self.queue_size = queue_size
+        self.controller_version = tuple(v or 0 for v in con.get_controller_version())
+        config = con.output_configs[0]
+        self.__types = dict(zip(names, types))
+        # field offsets in a binary payload, which has no recipe id
+        self.__fields = dict(
+            (name, (offset - 1, offset - 1 + unpacker.size))
+            for name, (offset, unpacker, _) in config.get_fields().items()
+        )
+        self.__clients = []
+        self.__servers = []
+        self.__lock = threading.Lock()
+        self.__running = False
+
+    def lookup(self, names):
+        """Types of the requested fields and the merged byte ranges to copy,
+        ranges is None if a field is not available upstream."""
+        types = [self.__types.get(name, "NOT_FOUND") for name in names]
+        if "NOT_FOUND" in types:
+            return types, None
+        ranges = []
+        for name in names:
+            start, end = self.__fields[name]
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        return types, ranges
+
+    def divider(self, frequency):
+        if frequency <= 0 or frequency >= self.frequency:
+            return 1
+        divider = int(round(self.frequency / frequency))
+        if abs(self.frequency / divider - frequency) > 1e-6:
+            _log.warning(
+                "%g Hz requested, serving %g Hz", frequency, self.frequency / divider
+            )
+        return divider
+
+    def listen_tcp(self, host="127.0.0.1", port=30004):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((host, port))
+        return self.__listen(server)
+
+    def listen_unix(self, path):
+        if os.path.exists(path):
+            os.unlink(path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        return self.__listen(server)
+
+    def __listen(self, server):
+        server.listen(16)
+        self.__servers.append(server)
+        thread = threading.Thread(target=self.__accept, args=(server,))
+        thread.daemon = True
+        thread.start()
+        return server.getsockname()
+
+    def __accept(self, server):
+        while True:
+            try:
+                sock, address = server.accept()
+            except socket.error:
+                return
+            if server.family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.settimeout(DEFAULT_TIMEOUT)
+            client = _BrokerClient(self, sock, address or "unix", self.queue_size)
+            with self.__lock:
+                self.__clients.append(client)
+            _log.info("Client connected: %s", client.address)
+            for target in (client.run, client.run_sender):
+                thread = threading.Thread(target=target)
+                thread.daemon = True
+                thread.start()
+
+    def remove(self, client):
+        with self.__lock:
+            if client in self.__clients:
+                self.__clients.remove(client)
+                _log.info("Client disconnected: %s", client.address)
+        client.close()
+        client.sock.close()
+
+    @property
+    def clients(self):
+        with self.__lock:
+            return list(self.__clients)
+
+    def serve_forever(self):
+        """Starts the upstream synchronization and dispatches samples until
+        stop() is called or the upstream connection is lost."""
+        con = self.__con
+        if not con.send_start():
+            raise RTDEException("Unable to start upstream synchronization")
+        self.__running = True
+        try:
+            while self.__running:
+                payload = con.receive_buffered(binary=True)
+                if payload is None:
+                    con.has_data(DEFAULT_TIMEOUT)
+                    continue
+                for client in self.clients:
+                    if not client.started:
+                        continue
+                    if not client.on_sample(payload):
+                        _log.warning(
+                            "Dropping client %s: more than %d samples behind",
+                            client.address,
+                            client.queue_size,
+                        )
+                        self.remove(client)
+        finally:
+            self.__running = False
+            if con.is_connected():
+                con.send_pause()
+
+    def stop(self):
+        self.__running = False
+        for server in self.__servers:
+            server.close()
+        for client in self.clients:
+            self.remove(client)
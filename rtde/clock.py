@@ -0,0 +1,152 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import array
+import collections
+
+from rtde.jitter import percentiles_us
+
+
+class ClockEstimator(object):
+    """Online offset and drift between the controller and the host clock.
+
+    add() takes the controller timestamp of a sample and the host time in
+    seconds it was read at, e.g. RTDE.last_receive_ns / 1e9. host - timestamp
+    is the clock offset plus the delay of the sample. The least delayed
+    sample of every window seconds of controller time is kept for the last
+    windows windows and a least squares line through them gives the drift
+    (its slope) and the offset. The latency add() returns is measured from
+    that line, so it leaves out the minimum one way delay, which timing one
+    direction cannot tell apart from the offset. It is kept for the last
+    capacity samples in a preallocated array. A controller timestamp going
+    back (a restart) starts the estimate over, see reset().
+    """
+
+    def __init__(self, window=1.0, windows=60, capacity=1 << 16):
+        self.window = window
+        self.capacity = capacity
+        self.__minima = collections.deque(maxlen=windows)
+        self.__latency = array.array("d", bytes(8 * capacity))
+        self.count = 0
+        self.restarts = 0
+        self.reset()
+
+    def reset(self):
+        """Starts the estimate over, the latency history is kept"""
+        self.__minima.clear()
+        self.__last = None
+        self.__window_start = None
+        self.__window_min = None
+        # the fitted line is offset + drift * (timestamp - center)
+        self.__center = 0.0
+        self.__offset = None
+        self.__drift = 0.0
+
+    def add(self, timestamp, host):
+        """Adds a sample and returns its latency in seconds"""
+        if self.__last is not None and timestamp < self.__last:
+            self.restarts += 1
+            self.reset()
+        self.__last = timestamp
+        difference = host - timestamp
+        if self.__window_start is None:
+            self.__window_start = timestamp
+        elif timestamp - self.__window_start >= self.window:
+            self.__minima.append(self.__window_min)
+            self.__fit()
+            self.__window_start = timestamp
+            self.__window_min = None
+        if self.__window_min is None or difference < self.__window_min[1]:
+            self.__window_min = (timestamp, difference)
+        if self.__offset is None:  # no window completed yet
+            latency = difference - self.__window_min[1]
+        else:
+            latency = difference - self.offset(timestamp)
+        self.__latency[self.count % self.capacity] = latency
+        self.count += 1
+        return latency
+
+    def __fit(self):
+        n = len(self.__minima)
+        center = sum(t for t, _ in self.__minima) / n
+        mean = sum(d for _, d in self.__minima) / n
+        spread = sum((t - center) ** 2 for t, _ in self.__minima)
+        drift = 0.0
+        if spread > 0:
+            drift = sum((t - center) * (d - mean) for t, d in self.__minima) / spread
+        self.__center, self.__offset, self.__drift = center, mean, drift
+
+    @property
+    def drift(self):
+        """Host seconds gained per controller second, 0 before two windows"""
+        return self.__drift
+
+    def offset(self, timestamp):
+        """host - controller time at the controller timestamp, None before the
+        first window completed"""
+        if self.__offset is None:
+            return None
+        return self.__offset + self.__drift * (timestamp - self.__center)
+
+    def to_host(self, timestamp):
+        """Host time of a controller timestamp, for correlating samples with
+        other host side data"""
+        offset = self.offset(timestamp)
+        return None if offset is None else timestamp + offset
+
+    def summary(self):
+        import numpy as np
+
+        latency = np.frombuffer(self.__latency, dtype=np.float64)
+        latency = latency[: min(self.count, self.capacity)]
+        return {
+            "samples": self.count,
+            "restarts": self.restarts,
+            "windows": len(self.__minima),
+            "offset_s": self.offset(self.__last) if self.__last is not None else None,
+            "drift_ppm": self.__drift * 1e6,
+            "latency_us": percentiles_us(latency),
+        }
+
+
+def format_summary(summary):
+    """Console lines of a ClockEstimator summary"""
+    lines = [
+        "{} samples, {} windows, {} restarts".format(
+            summary["samples"], summary["windows"], summary["restarts"]
+        )
+    ]
+    if summary["offset_s"] is not None:
+        lines.append(
+            "offset {:.6f}s, drift {:+.1f}ppm".format(
+                summary["offset_s"], summary["drift_ppm"]
+            )
+        )
+    if summary["latency_us"] is not None:
+        lines.append(
+            "latency_us: "
+            + ", ".join(
+                "{} {:.0f}".format(k, v) for k, v in summary["latency_us"].items()
+            )
+        )
+    return lines
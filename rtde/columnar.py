@@ -0,0 +1,273 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+import struct
+import threading
+
+import numpy as np
+
+from rtde import serialize
+from rtde.write_behind import FlushTimer
+
+MANIFEST = "manifest.json"
+DEFAULT_CHUNK_ROWS = 65536
+
+
+def _npy_text(dtype, rows):
+    return "{{'descr': {!r}, 'fortran_order': False, 'shape': ({},), }}".format(
+        np.lib.format.dtype_to_descr(dtype), rows
+    )
+
+
+def _npy_header_size(dtype):
+    """Size of a .npy header that fits any row count, a multiple of 64"""
+    # magic, version 1.0 and the header length come first, it ends with \n
+    size = 10 + len(_npy_text(dtype, 10**20)) + 1
+    return (size + 63) // 64 * 64
+
+
+def _npy_header(dtype, rows, size):
+    header = _npy_text(dtype, rows)
+    padding = size - 10 - len(header) - 1
+    return (
+        b"\x93NUMPY\x01\x00"
+        + struct.pack("<H", size - 10)
+        + header.encode("latin1")
+        + b" " * padding
+        + b"\n"
+    )
+
+
+class NpyFile(object):
+    """A .npy file of a 1-d array, plain or structured, that rows are
+    appended to. The file is preallocated and grown by doubling, and its
+    header is padded so it can be rewritten in place with the row count on
+    every append. close() cuts the file to its size."""
+
+    def __init__(self, filename, dtype, capacity=DEFAULT_CHUNK_ROWS):
+        self.filename = filename
+        self.dtype = np.dtype(dtype)
+        self.rows = 0
+        self.header_size = _npy_header_size(self.dtype)
+        self.__capacity = capacity
+        self.__file = open(filename, "w+b")
+        self.__file.write(_npy_header(self.dtype, 0, self.header_size))
+        self.__allocate()
+
+    def __allocate(self):
+        size = self.header_size + self.__capacity * self.dtype.itemsize
+        self.__file.truncate(size)
+        if hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(self.__file.fileno(), 0, size)
+            except OSError:
+                pass  # not supported by the file system, truncate is enough
+
+    def append(self, data):
+        """Writes an array of rows after the others, converted to dtype"""
+        rows = self.rows + len(data)
+        if rows > self.__capacity:
+            self.__capacity = max(rows, 2 * self.__capacity)
+            self.__allocate()
+        f = self.__file
+        f.seek(self.header_size + self.rows * self.dtype.itemsize)
+        f.write(data.astype(self.dtype).tobytes())
+        f.seek(0)
+        f.write(_npy_header(self.dtype, rows, self.header_size))
+        f.flush()
+        self.rows = rows
+
+    def close(self):
+        if self.__file is None:
+            return
+        try:
+            self.__file.truncate(self.header_size + self.rows * self.dtype.itemsize)
+        finally:
+            self.__file.close()
+            self.__file = None
+
+
+class ColumnarWriter(object):
+    """Writes samples to a directory with one .npy file per column.
+
+    writerow() takes data objects like CSVWriter or binary payloads like
+    CSVBinaryWriter. Rows are collected and written every chunk_rows rows,
+    and with flush_interval at most that many seconds after they were
+    written, also when no further rows come. Column files are preallocated
+    and grown by doubling, their headers rewritten with the row count on
+    every flush. manifest.json lists the recipe, the columns and the rows
+    written, it is replaced atomically after the columns, so a reader never
+    sees rows that are not on disk. On close the files are cut to their
+    size and the manifest marked complete. See NpyFile for the column files
+    and open_columns() for reading.
+    """
+
+    def __init__(
+        self,
+        directory,
+        names,
+        types,
+        chunk_rows=DEFAULT_CHUNK_ROWS,
+        flush_interval=None,
+        capacity=DEFAULT_CHUNK_ROWS,
+    ):
+        if len(names) != len(types):
+            raise ValueError("List sizes are not identical.")
+        self.name = directory
+        self.chunk_rows = chunk_rows
+        self.flush_interval = flush_interval
+        self.rows = 0
+        self.__names = names
+        self.__types = types
+        self.__columns = serialize.flat_columns(names, types)
+        self.__payload = struct.Struct(">" + "".join(f for _, f in self.__columns))
+        self.__source = np.dtype([(c, ">" + f) for c, f in self.__columns])
+        self.__capacity = capacity
+        self.__pending = bytearray()
+        self.__pending_rows = 0
+        self.__files = []
+        self.__lock = threading.Lock()
+        self.__timer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def writeheader(self):
+        """Creates the directory, the column files and the manifest"""
+        os.makedirs(self.name, exist_ok=True)
+        for column, _ in self.__columns:
+            self.__files.append(
+                NpyFile(
+                    os.path.join(self.name, column + ".npy"),
+                    self.__source[column].newbyteorder("="),
+                    self.__capacity,
+                )
+            )
+        self.__write_manifest(False)
+        if self.flush_interval is not None:
+            self.__timer = FlushTimer(
+                self.__lock, self.__flush, self.flush_interval, self.name
+            )
+
+    def writerow(self, data_object):
+        if isinstance(data_object, (bytes, bytearray, memoryview)):
+            row = data_object
+        else:
+            values = []
+            for name, data_type in zip(self.__names, self.__types):
+                value = getattr(data_object, name)
+                if serialize.get_item_size(data_type) > 1:
+                    values.extend(value)
+                else:
+                    values.append(value)
+            row = self.__payload.pack(*values)
+        if self.__timer is None:  # no other thread, no lock to take
+            self.__add(row)
+            return
+        with self.__lock:
+            if self.__timer.error is not None:
+                raise self.__timer.error
+            self.__timer.start()
+            self.__add(row)
+
+    def __add(self, row):
+        self.__pending += row
+        self.__pending_rows += 1
+        if self.__pending_rows >= self.chunk_rows:
+            self.__flush()
+
+    def flush(self):
+        with self.__lock:
+            self.__flush()
+
+    def __flush(self):
+        """Appends the pending rows to the columns, called with the lock held"""
+        if self.__timer is not None:
+            self.__timer.stop()
+        if not self.__pending_rows:
+            return
+        data = np.frombuffer(self.__pending, dtype=self.__source)
+        for f, (column, _) in zip(self.__files, self.__columns):
+            f.append(data[column])
+        self.rows += len(data)
+        self.__pending = bytearray()
+        self.__pending_rows = 0
+        self.__write_manifest(False)
+
+    def __write_manifest(self, complete):
+        manifest = {
+            "names": self.__names,
+            "types": self.__types,
+            "columns": [
+                {"name": column, "dtype": f.dtype.str}
+                for (column, _), f in zip(self.__columns, self.__files)
+            ],
+            "rows": self.rows,
+            "complete": complete,
+        }
+        path = os.path.join(self.name, MANIFEST)
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(path + ".tmp", path)
+
+    def close(self):
+        if not self.__files:
+            return
+        try:
+            self.flush()
+            for f in self.__files:
+                f.close()
+            self.__write_manifest(True)
+        finally:
+            if self.__timer is not None:
+                self.__timer.close()
+                self.__timer = None
+            for f in self.__files:
+                f.close()
+            self.__files = []
+
+
+def read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST)) as f:
+        return json.load(f)
+
+
+def open_columns(directory, columns=None):
+    """Dict of column name to a read-only np.memmap of the rows in the
+    manifest, all columns by default. Only the pages of the columns used
+    are read. Works on directories still being written."""
+    manifest = read_manifest(directory)
+    rows = manifest["rows"]
+    names = [c["name"] for c in manifest["columns"]]
+    result = {}
+    for column in names if columns is None else columns:
+        if column not in names:
+            raise KeyError(column)
+        data = np.load(os.path.join(directory, column + ".npy"), mmap_mode="r")
+        result[column] = data[:rows]
+    return result
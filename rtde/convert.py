@@ -0,0 +1,209 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Conversion between CSVWriter text and CSVBinaryWriter recordings.
+
+The input is split into row-aligned chunks which a process pool converts
+in parallel. Each worker reads its own chunk from the input file, results
+are written in input order, and at most a few chunks per worker are in
+flight, so memory stays bounded however large the recording is.
+"""
+
+import collections
+import concurrent.futures
+import csv
+import io
+import logging
+import os
+import struct
+
+from rtde import serialize
+from rtde.csv_binary_reader import CSVBinaryReader
+from rtde.csv_binary_writer import CSVBinaryWriter
+from rtde.csv_writer import CSVWriter
+from rtde.rtde import LOGNAME
+
+_log = logging.getLogger(LOGNAME)
+
+CHUNK_SIZE = 16 * 1024 * 1024
+
+# numpy types of the scalar column types of a binary recording
+NUMPY_TYPES = {
+    "DOUBLE": "f8",
+    "INT32": "i4",
+    "UINT32": "u4",
+    "UINT64": "u8",
+    "UINT8": "u1",
+    "BOOL": "?",
+}
+
+
+def column_types(columns, names, types, policies=None):
+    """Scalar type of each CSV column given the recipe that recorded it,
+    DOUBLE for columns the recipe does not list. Integer fields with a
+    downsampling policy (see rtde.decimation) are DOUBLE as well, so the
+    cells they left empty can be NaN."""
+    lookup = {}
+    for name, data_type, policy in zip(names, types, policies or [None] * len(names)):
+        size = serialize.get_item_size(data_type)
+        scalar = data_type
+        if size > 1:
+            scalar = "DOUBLE"
+            if data_type.endswith("UINT32"):
+                scalar = "UINT32"
+            elif data_type.endswith("INT32"):
+                scalar = "INT32"
+        if policy is not None and scalar != "DOUBLE":
+            _log.warning("%s has a policy, it is converted as DOUBLE", name)
+            scalar = "DOUBLE"
+        if size == 1:
+            lookup[name] = scalar
+            continue
+        for i in range(size):
+            lookup[name + "_" + str(i)] = scalar
+    return [lookup.get(column, "DOUBLE") for column in columns]
+
+
+def _run_ordered(func, tasks, out, jobs):
+    """Runs func(*task) for every task on a process pool and writes the
+    results to out in task order"""
+    if jobs == 1:
+        for task in tasks:
+            out.write(func(*task))
+        return
+    limit = 2 * (jobs or os.cpu_count() or 1)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = collections.deque()
+        for task in tasks:
+            pending.append(executor.submit(func, *task))
+            if len(pending) >= limit:
+                out.write(pending.popleft().result())
+        while pending:
+            out.write(pending.popleft().result())
+
+
+def _line_chunks(filename, start, chunk_size):
+    """(begin, end) byte ranges of about chunk_size ending at line ends"""
+    size = os.path.getsize(filename)
+    with open(filename, "rb") as f:
+        begin = start
+        while begin < size:
+            f.seek(min(begin + chunk_size, size))
+            f.readline()
+            end = f.tell()
+            yield begin, end
+            begin = end
+
+
+def _parse_cells(lines, delimiter, columns, types, dtype):
+    """Slow path for rows numpy.loadtxt rejects: empty cells, which field
+    policies leave (see rtde.decimation), and True/False booleans. Empty
+    cells are NaN, they have no value in the other types."""
+    import numpy as np
+
+    cells = np.array([line.split(delimiter) for line in lines if line])
+    if cells.ndim != 2 or cells.shape[1] != len(types):
+        raise ValueError("Rows do not have {} columns".format(len(types)))
+    rows = np.empty(len(cells), dtype=dtype)
+    for i, data_type in enumerate(types):
+        column = cells[:, i]
+        key = "f" + str(i)
+        if data_type == "DOUBLE":
+            rows[key] = np.where(column == "", "nan", column).astype(np.float64)
+            continue
+        if (column == "").any():
+            raise ValueError(
+                "Empty cells in {} column {}, give the policy of the field in "
+                "the recipe to convert it as DOUBLE".format(data_type, columns[i])
+            )
+        if data_type == "BOOL":
+            rows[key] = (column == "True") | (column == "1")
+        else:
+            rows[key] = column.astype(NUMPY_TYPES[data_type])
+    return rows
+
+
+def _csv_chunk(filename, begin, end, delimiter, columns, types):
+    import numpy as np
+
+    with open(filename, "rb") as f:
+        f.seek(begin)
+        data = f.read(end - begin)
+    fields = [("f" + str(i), NUMPY_TYPES[t]) for i, t in enumerate(types)]
+    try:
+        rows = np.loadtxt(
+            io.BytesIO(data), delimiter=delimiter, dtype=np.dtype(fields), ndmin=1
+        )
+    except ValueError:
+        lines = data.decode("utf-8").splitlines()
+        rows = _parse_cells(lines, delimiter, columns, types, np.dtype(fields))
+    big_endian = np.dtype([(name, ">" + t) for name, t in fields])
+    return rows.astype(big_endian).tobytes()
+
+
+def csv_to_binary(
+    source, destination, types=None, delimiter=",", jobs=None, chunk_size=CHUNK_SIZE
+):
+    """Converts a CSVWriter recording to the binary layout. types are the
+    scalar types of the columns, see column_types, all DOUBLE by default.
+    Raises ValueError for empty cells in a column that is not DOUBLE."""
+    with open(source, "rb") as f:
+        header = f.readline()
+        start = f.tell()
+    columns = header.decode("utf-8").rstrip("\r\n").split(delimiter)
+    if types is None:
+        types = ["DOUBLE"] * len(columns)
+    if len(types) != len(columns):
+        raise ValueError("List sizes are not identical.")
+    with open(destination, "wb") as out:
+        CSVBinaryWriter(out, columns, types).writeheader()
+        tasks = (
+            (source, begin, end, delimiter, columns, types)
+            for begin, end in _line_chunks(source, start, chunk_size)
+        )
+        _run_ordered(_csv_chunk, tasks, out, jobs)
+
+
+def _binary_chunk(filename, start, count, delimiter):
+    with open(filename, "rb") as f:
+        reader = CSVBinaryReader(f)
+        text = io.StringIO()
+        csv.writer(text, delimiter=delimiter).writerows(reader.read_rows(start, count))
+    return text.getvalue().encode("utf-8")
+
+
+def binary_to_csv(source, destination, delimiter=",", jobs=None, chunk_size=CHUNK_SIZE):
+    """Converts a CSVBinaryWriter recording to CSVWriter text"""
+    with open(source, "rb") as f:
+        reader = CSVBinaryReader(f)
+        names, types = reader.names, reader.types
+        samples = reader.get_samples()
+        chunk_rows = max(chunk_size // reader.row_struct.size, 1)
+    with open(destination, "w", newline="") as out:
+        CSVWriter(out, names, types, delimiter).writeheader()
+        out.flush()
+        tasks = (
+            (source, start, chunk_rows, delimiter)
+            for start in range(0, samples, chunk_rows)
+        )
+        _run_ordered(_binary_chunk, tasks, out.buffer, jobs)
@@ -0,0 +1,120 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import struct
+
+from rtde import serialize
+
+
+def is_binary_recording(filename):
+    """True if the file looks like a CSVBinaryWriter recording, i.e. its
+    second line lists column types."""
+    with open(filename, "rb") as f:
+        f.readline()
+        types = f.readline().rstrip(b"\n").split(b" ")
+    try:
+        return all(t.decode("utf-8") in serialize.TYPE_FORMATS for t in types)
+    except UnicodeDecodeError:
+        return False
+
+
+class CSVBinaryReader(object):
+    """Reads recordings written by CSVBinaryWriter.
+
+    The file starts with a line of column names and a line of column types,
+    followed by fixed-size rows in the RTDE payload layout (big endian).
+    """
+
+    def __init__(self, file, delimiter=" "):
+        self.__file = file
+        self.__filename = file.name
+        self.names = file.readline().decode("utf-8").rstrip("\n").split(delimiter)
+        self.types = file.readline().decode("utf-8").rstrip("\n").split(delimiter)
+        if len(self.names) != len(self.types):
+            raise ValueError("List sizes are not identical.")
+        self.row_struct = struct.Struct(
+            ">" + "".join(serialize.TYPE_FORMATS[t] for t in self.types)
+        )
+        self.data_offset = file.tell()
+        file.seek(0, 2)
+        self.__samples = (file.tell() - self.data_offset) // self.row_struct.size
+        file.seek(self.data_offset)
+
+    def read_rows(self, start=0, count=None, chunk_rows=4096):
+        """Yields rows as tuples of column values, reading in chunks."""
+        size = self.row_struct.size
+        end = self.__samples if count is None else min(self.__samples, start + count)
+        self.__file.seek(self.data_offset + start * size)
+        row = start
+        while row < end:
+            rows = min(chunk_rows, end - row)
+            data = self.__file.read(rows * size)
+            rows = len(data) // size
+            if rows == 0:
+                return
+            for values in self.row_struct.iter_unpack(data[: rows * size]):
+                yield values
+            row += rows
+
+    def read_columns(self, start=0, count=None):
+        """Reads rows into a dict of column name to numpy array, all of them
+        by default."""
+        import numpy as np
+
+        dtype = np.dtype(
+            [
+                (name, ">" + serialize.TYPE_FORMATS[data_type])
+                for name, data_type in zip(self.names, self.types)
+            ]
+        )
+        start = min(max(start, 0), self.__samples)
+        end = self.__samples if count is None else min(self.__samples, start + count)
+        self.__file.seek(self.data_offset + start * dtype.itemsize)
+        data = np.frombuffer(
+            self.__file.read((end - start) * dtype.itemsize), dtype=dtype
+        )
+        return {name: data[name] for name in self.names}
+
+    def find_row(self, value, column="timestamp"):
+        """Index of the first row whose column is >= value, by binary search
+        over the file. The column must be sorted, as timestamps are."""
+        index = self.names.index(column)
+        offset = struct.calcsize(
+            ">" + "".join(serialize.TYPE_FORMATS[t] for t in self.types[:index])
+        )
+        field = struct.Struct(">" + serialize.TYPE_FORMATS[self.types[index]])
+        lo, hi = 0, self.__samples
+        while lo < hi:
+            mid = (lo + hi) // 2
+            self.__file.seek(self.data_offset + mid * self.row_struct.size + offset)
+            if field.unpack(self.__file.read(field.size))[0] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def get_samples(self):
+        return self.__samples
+
+    def get_name(self):
+        return self.__filename
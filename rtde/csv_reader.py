@@ -22,7 +22,6 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import csv
-import numpy as np
 import logging
 
 from .rtde import LOGNAME
@@ -34,15 +33,62 @@ runtime_state = "runtime_state"
 runtime_state_running = "2"
 
 
+def parse_column(values, dense=False):
+    """Float array of a column. Empty cells, left by fields recorded with a
+    downsampling policy, are NaN or with dense the last value before them."""
+    import numpy as np
+
+    if "" not in values:
+        return np.array(list(map(float, values)))
+    empty = np.array([v == "" for v in values])
+    array = np.array([float(v) if v else np.nan for v in values])
+    if dense:
+        index = np.where(empty, 0, np.arange(len(array)))
+        np.maximum.accumulate(index, out=index)
+        array = array[index]  # leading empty cells stay NaN
+    return array
+
+
+class CSVRowReader(object):
+    """Reads a CSV recording row by row instead of loading it, with the
+    names and read_rows() of CSVBinaryReader. Empty cells are NaN, or with
+    dense the last value of their column."""
+
+    def __init__(self, csvfile, delimiter=" "):
+        lines = (line for line in csvfile if line.strip())  # skip empty lines
+        self.__reader = csv.reader(lines, delimiter=delimiter)
+        self.names = next(self.__reader, [])
+
+    def read_rows(self, dense=False, columns=None):
+        """Yields rows as tuples of floats. With a list of column indexes only
+        those cells are parsed, the others are None."""
+        count = len(self.names)
+        indexes = range(count) if columns is None else sorted(set(columns))
+        last = [float("nan")] * count
+        for row in self.__reader:
+            if columns is None and "" not in row:
+                values = list(map(float, row))
+            else:
+                values = [None] * count
+                for i in indexes:
+                    values[i] = float(row[i]) if row[i] else last[i]
+            if dense:
+                last = values
+            yield tuple(values)
+
+
 class CSVReader(object):
     __samples = None
     __filename = None
+    __header = None
 
     def get_header_data(self, __reader):
         header = next(__reader)
         return header
 
-    def __init__(self, csvfile, delimiter=" ", filter_running_program=False):
+    def __init__(
+        self, csvfile, delimiter=" ", filter_running_program=False, dense=False
+    ):
         self.__filename = csvfile.name
 
         csvfile = [
@@ -51,6 +97,7 @@ class CSVReader(object):
 
         reader = csv.reader(csvfile, delimiter=delimiter)
         header = self.get_header_data(reader)
+        self.__header = header
 
         # read csv file
         data = [row for row in reader]
@@ -58,6 +105,14 @@ class CSVReader(object):
         if len(data) == 0:
             _log.warn("No data read from file: " + self.__filename)
 
+        # transpose data
+        columns = list(zip(*data)) or [()] * len(header)
+
+        # create dictionary from  header elements (keys) to float arrays
+        arrays = {
+            header[i]: parse_column(columns[i], dense) for i in range(len(header))
+        }
+
         # filter data
         if filter_running_program:
             if runtime_state not in header:
@@ -65,27 +120,21 @@ class CSVReader(object):
                     "Unable to filter data since runtime_state field is missing in data set"
                 )
             else:
-                idx = header.index(runtime_state)
-                data = [row for row in data if row[idx] == runtime_state_running]
+                running = arrays[runtime_state] == float(runtime_state_running)
+                arrays = {name: array[running] for name, array in arrays.items()}
 
-        self.__samples = len(data)
+        self.__samples = len(arrays[header[0]]) if header else 0
 
         if self.__samples == 0:
             _log.warn("No data left from file: " + self.__filename + " after filtering")
 
-        # transpose data
-        data = list(zip(*data))
-
-        # create dictionary from  header elements (keys) to float arrays
-        self.__dict__.update(
-            {
-                header[i]: np.array(list(map(float, data[:][i])))
-                for i in range(len(header))
-            }
-        )
+        self.__dict__.update(arrays)
 
     def get_samples(self):
         return self.__samples
 
     def get_name(self):
         return self.__filename
+
+    def get_header(self):
+        return self.__header
@@ -28,14 +28,19 @@ import sys
 sys.path.append("..")
 
 from rtde import serialize
+from rtde.decimation import parse_policy
 
 
 class CSVWriter(object):
-    def __init__(self, csvfile, names, types, delimiter=","):
+    def __init__(self, csvfile, names, types, delimiter=",", policies=None):
         if len(names) != len(types):
             raise ValueError("List sizes are not identical.")
         self.__names = names
         self.__types = types
+        # fields with a downsampling policy write empty cells when skipped
+        self.__policies = [parse_policy(p) for p in policies or [None] * len(names)]
+        if len(self.__policies) != len(names):
+            raise ValueError("List sizes are not identical.")
         self.__header_names = []
         self.__columns = 0
         for i in range(len(self.__names)):
@@ -59,7 +64,13 @@ class CSVWriter(object):
         data = []
         for i in range(len(self.__names)):
             size = serialize.get_item_size(self.__types[i])
-            value = data_object.__dict__[self.__names[i]]
+            value = getattr(data_object, self.__names[i])
+            policy = self.__policies[i]
+            if policy is not None:
+                value = policy.update(value)
+                if value is None:
+                    data.extend([""] * size)
+                    continue
             if size > 1:
                 data.extend(value)
             else:
@@ -0,0 +1,105 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Per-field downsampling applied by CSVWriter.
+
+A policy is given as the policy attribute of a recipe field:
+
+    <field name="joint_temperatures" type="VECTOR6D" policy="every:125"/>
+    <field name="actual_main_voltage" type="DOUBLE" policy="mean:125"/>
+    <field name="actual_digital_output_bits" type="UINT64" policy="deadband:0"/>
+
+every:N keeps every Nth sample, mean:N, min:N and max:N write the
+aggregate of each window of N samples, deadband:E writes a value only when
+it moved more than E away from the last written one. Rows where a field
+is not written hold empty cells, CSVReader(dense=True) fills them in, as
+ReplayRTDE and rtde.analytics read them.
+"""
+
+
+class Every(object):
+    def __init__(self, n):
+        self.n = n
+        self.__count = 0
+
+    def update(self, value):
+        keep = self.__count == 0
+        self.__count = (self.__count + 1) % self.n
+        return value if keep else None
+
+
+class Window(object):
+    def __init__(self, kind, n):
+        self.kind = kind
+        self.n = n
+        self.__values = []
+
+    def update(self, value):
+        self.__values.append(value)
+        if len(self.__values) < self.n:
+            return None
+        values, self.__values = self.__values, []
+        if isinstance(value, list):
+            return [self.__aggregate(column) for column in zip(*values)]
+        return self.__aggregate(values)
+
+    def __aggregate(self, values):
+        if self.kind == "mean":
+            return sum(values) / float(len(values))
+        return min(values) if self.kind == "min" else max(values)
+
+
+class Deadband(object):
+    def __init__(self, epsilon):
+        self.epsilon = epsilon
+        self.__last = None
+
+    def update(self, value):
+        last = self.__last
+        if last is not None:
+            if isinstance(value, list):
+                moved = any(abs(v - l) > self.epsilon for v, l in zip(value, last))
+            else:
+                moved = abs(value - last) > self.epsilon
+            if not moved:
+                return None
+        self.__last = value
+        return value
+
+
+def parse_policy(spec):
+    """Policy object for a policy attribute such as 'mean:125', None for None"""
+    if spec is None:
+        return None
+    kind, _, param = spec.partition(":")
+    if kind not in ("every", "mean", "min", "max", "deadband"):
+        raise ValueError("Unknown policy: " + spec)
+    try:
+        if kind == "deadband":
+            return Deadband(float(param))
+        n = int(param)
+    except ValueError:
+        raise ValueError("Invalid policy: " + spec)
+    if n < 1:
+        raise ValueError("Invalid policy: " + spec)
+    return Every(n) if kind == "every" else Window(kind, n)
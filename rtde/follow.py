@@ -0,0 +1,289 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import csv
+import logging
+import os
+import select
+import struct
+import time
+
+from .csv_reader import parse_column
+from .rtde import LOGNAME
+
+_log = logging.getLogger(LOGNAME)
+
+# inotify(7) event masks
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_IGNORED = 0x8000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_DELETE_SELF | IN_MOVE_SELF
+# struct inotify_event without its name
+INOTIFY_EVENT = struct.Struct("iIII")
+
+# bytes from the start of the file compared to notice that it was rewritten
+HEAD_BYTES = 4096
+
+
+def _inotify(path):
+    """Non-blocking inotify descriptor watching path, None where inotify is
+    not available"""
+    try:
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError, TypeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(path), WATCH_MASK) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+class CSVFollower(object):
+    """Reads a CSV recording while it is being written, like tail -f.
+
+    read() parses the complete lines added since the last call into a dict
+    of column name to float array, as CSVReader has them, or returns None
+    if there are none. The byte offset is kept and a partial last line is
+    held back until it is complete, so the cost is proportional to the new
+    data. follow() yields these blocks as the file grows, waiting with
+    inotify where available and otherwise polling with a backoff from
+    poll_interval up to max_interval. With from_end only rows written
+    after opening are returned. A file that was started over is read
+    again from its header: one that shrank, whose first HEAD_BYTES changed
+    or that was replaced by another file of the same name. A replaced file
+    is read to its end before the new one is opened. Its inotify watch is
+    dropped when it is moved or deleted, the new file is polled for.
+    """
+
+    def __init__(
+        self,
+        filename,
+        delimiter=",",
+        dense=False,
+        from_end=False,
+        poll_interval=0.005,
+        max_interval=0.25,
+        inotify=True,
+    ):
+        self.filename = filename
+        self.delimiter = delimiter
+        self.dense = dense
+        self.poll_interval = poll_interval
+        self.max_interval = max_interval
+        self.header = None
+        self.rows = 0
+        self.offset = 0
+        self.__from_end = from_end
+        self.__use_inotify = inotify
+        self.__watch = None
+        self.__file = None
+        self.__partial = b""
+        self.__head = b""  # the first HEAD_BYTES read
+        self.__last = {}  # last value per column, for dense blocks
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self.__watch is not None:
+            os.close(self.__watch)
+            self.__watch = None
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def __open(self):
+        try:
+            self.__file = open(self.filename, "rb")
+        except FileNotFoundError:
+            return False
+        if self.__use_inotify:
+            self.__watch = _inotify(self.filename)
+        return True
+
+    def __restart(self, reason):
+        _log.info("%s %s, reading it from the start", self.filename, reason)
+        self.header = None
+        self.offset = 0
+        self.__partial = b""
+        self.__head = b""
+        self.__last = {}
+        self.__from_end = False
+
+    def __replaced(self, stat):
+        """True if filename is now another file than the one open"""
+        try:
+            current = os.stat(self.filename)
+        except FileNotFoundError:
+            return False  # removed, a new file may follow
+        return (current.st_dev, current.st_ino) != (stat.st_dev, stat.st_ino)
+
+    def __rewritten(self):
+        """True if the bytes read from the start of the file changed"""
+        if not self.__head:
+            return False
+        if hasattr(os, "pread"):
+            head = os.pread(self.__file.fileno(), len(self.__head), 0)
+        else:
+            self.__file.seek(0)
+            head = self.__file.read(len(self.__head))
+        return head != self.__head
+
+    def __read_lines(self):
+        """Complete new lines, None if there are none"""
+        if self.__file is None and not self.__open():
+            return None
+        stat = os.fstat(self.__file.fileno())
+        # the old file is read to its end before the new one
+        if stat.st_size <= self.offset and self.__replaced(stat):
+            self.close()
+            self.__restart("was replaced")
+            if not self.__open():
+                return None
+            stat = os.fstat(self.__file.fileno())
+        if stat.st_size == self.offset:
+            return None
+        if stat.st_size < self.offset:
+            self.__restart("was truncated")
+        elif self.__rewritten():  # only checked when it grew, as a rewrite does
+            self.__restart("was rewritten")
+        start = self.offset
+        self.__file.seek(start)
+        data = self.__file.read(stat.st_size - start)
+        self.offset += len(data)
+        if start < HEAD_BYTES:
+            self.__head += data[: HEAD_BYTES - start]
+        data = self.__partial + data
+        end = data.rfind(b"\n") + 1
+        self.__partial = data[end:]
+        if end == 0:
+            return None
+        lines = data[:end].decode("utf-8").splitlines()
+        return [line for line in lines if line.strip()] or None
+
+    def read(self):
+        lines = self.__read_lines()
+        if lines is None:
+            return None
+        if self.header is None:
+            self.header = next(csv.reader(lines[:1], delimiter=self.delimiter))
+            lines = lines[1:]
+            if self.__from_end:
+                # everything up to the last complete line has been read
+                self.__from_end = False
+                lines = []
+        if not lines:
+            return None
+        columns = list(zip(*csv.reader(lines, delimiter=self.delimiter)))
+        block = {
+            name: parse_column(column, self.dense)
+            for name, column in zip(self.header, columns)
+        }
+        if self.dense:
+            self.__fill(block)
+        self.rows += len(lines)
+        return block
+
+    def __fill(self, block):
+        """Carries the last value of the previous block into leading NaNs"""
+        import numpy as np
+
+        for name, array in block.items():
+            last = self.__last.get(name)
+            if last is not None:
+                leading = np.logical_and.accumulate(np.isnan(array))
+                array[leading] = last
+            if len(array) and not np.isnan(array[-1]):
+                self.__last[name] = array[-1]
+
+    def wait(self, timeout):
+        """Waits up to timeout seconds for the file to change, True if it
+        (probably) did"""
+        if self.__watch is None:
+            time.sleep(timeout)
+            return True
+        readable, _, _ = select.select([self.__watch], [], [], timeout)
+        if readable and self.__gone(self.__read_events()):
+            # the watch stays with the old file, poll for the new one
+            os.close(self.__watch)
+            self.__watch = None
+        return bool(readable)
+
+    def __read_events(self):
+        """Mask of all pending inotify events"""
+        mask = 0
+        try:
+            while True:
+                data = os.read(self.__watch, 4096)
+                if not data:
+                    break
+                offset = 0
+                while offset < len(data):
+                    _, event, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                    mask |= event
+                    offset += INOTIFY_EVENT.size + length
+        except BlockingIOError:
+            pass
+        return mask
+
+    def __gone(self, mask):
+        """True if the events show the file was moved or deleted"""
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+            return True
+        # unlinking an open file only changes its link count
+        return bool(mask & IN_ATTRIB) and os.fstat(self.__file.fileno()).st_nlink == 0
+
+    def follow(self, timeout=None):
+        """Yields blocks of new rows, stops after timeout seconds without any
+        (never with None)"""
+        interval = self.poll_interval
+        idle_since = time.monotonic()
+        while True:
+            block = self.read()
+            if block is not None:
+                yield block
+                interval = self.poll_interval
+                idle_since = time.monotonic()
+                continue
+            idle = time.monotonic() - idle_since
+            if timeout is not None and idle >= timeout:
+                return
+            if self.__watch is not None:
+                # an event ends the wait early, max_interval only bounds it
+                wait = self.max_interval
+            else:
+                wait = interval
+                interval = min(interval * 2, self.max_interval)
+            self.wait(wait if timeout is None else min(wait, timeout - idle))
@@ -0,0 +1,196 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import array
+import gc
+import logging
+import os
+import time
+
+from rtde.rtde import LOGNAME
+
+_log = logging.getLogger(LOGNAME)
+
+GC_MODES = ("defer", "off")
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def percentiles_us(values):
+    """PERCENTILES and max of a numpy array of seconds in microseconds, None
+    if it is empty"""
+    import numpy as np
+
+    if not values.size:
+        return None
+    result = {
+        "p" + str(p): float(v * 1e6)
+        for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))
+    }
+    result["max"] = float(values.max() * 1e6)
+    return result
+
+
+class LowJitter(object):
+    """Context manager that tunes the calling thread and the GC for capture.
+
+    On enter the heap is collected and frozen, so setup objects are never
+    scanned again, and automatic collection is disabled. With gc_mode
+    "defer" idle() runs a young generation collection every collect_every
+    calls, call it once the work for a sample is done so the pause lands in
+    the wait for the next one; with "off" nothing is collected until exit.
+    cpus pins the calling thread (os.sched_setaffinity) and fifo_priority
+    switches it to SCHED_FIFO, both are skipped with a warning where not
+    supported or permitted. Everything is restored on exit.
+    """
+
+    def __init__(
+        self, gc_mode="defer", collect_every=100, cpus=None, fifo_priority=None
+    ):
+        if gc_mode not in GC_MODES:
+            raise ValueError("Unknown GC mode: " + str(gc_mode))
+        self.gc_mode = gc_mode
+        self.collect_every = collect_every
+        self.cpus = cpus
+        self.fifo_priority = fifo_priority
+        self.collections = 0
+        self.__calls = 0
+        self.__gc_enabled = None
+        self.__affinity = None
+        self.__scheduler = None
+
+    def __enter__(self):
+        self.__gc_enabled = gc.isenabled()
+        gc.collect()
+        gc.freeze()
+        gc.disable()
+        if self.cpus:
+            try:
+                self.__affinity = os.sched_getaffinity(0)
+                os.sched_setaffinity(0, self.cpus)
+            except (AttributeError, OSError) as e:
+                self.__affinity = None
+                _log.warning("Unable to set CPU affinity: %s", e)
+        if self.fifo_priority:
+            try:
+                scheduler = os.sched_getscheduler(0), os.sched_getparam(0)
+                os.sched_setscheduler(
+                    0, os.SCHED_FIFO, os.sched_param(self.fifo_priority)
+                )
+                self.__scheduler = scheduler
+            except (AttributeError, OSError) as e:
+                _log.warning("Unable to switch to SCHED_FIFO: %s", e)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.__scheduler is not None:
+            policy, param = self.__scheduler
+            os.sched_setscheduler(0, policy, param)
+            self.__scheduler = None
+        if self.__affinity is not None:
+            os.sched_setaffinity(0, self.__affinity)
+            self.__affinity = None
+        gc.unfreeze()
+        if self.__gc_enabled:
+            gc.enable()
+
+    def idle(self):
+        """Collects the young generations every collect_every calls"""
+        if self.gc_mode != "defer":
+            return
+        self.__calls += 1
+        if self.__calls % self.collect_every == 0:
+            # every tenth collection includes the middle generation
+            self.collections += 1
+            gc.collect(1 if self.collections % 10 == 0 else 0)
+
+
+class JitterMeter(object):
+    """Loop period jitter from controller timestamps and the host clock.
+
+    add() stores the controller timestamp of a sample with time.monotonic()
+    in preallocated arrays, keeping the last capacity samples, so measuring
+    does not allocate in the loop. summary() compares the host period of
+    each sample with the controller period: period_error_us is their
+    difference, lateness_us how much later than the earliest sample (host
+    minus controller time) a sample was seen, skipped the number of
+    controller periods without a sample.
+    """
+
+    def __init__(self, frequency, capacity=1 << 20):
+        self.frequency = frequency
+        self.capacity = capacity
+        self.count = 0
+        self.__host = array.array("d", bytes(8 * capacity))
+        self.__controller = array.array("d", bytes(8 * capacity))
+
+    def add(self, timestamp):
+        i = self.count % self.capacity
+        self.__host[i] = time.monotonic()
+        self.__controller[i] = timestamp
+        self.count += 1
+
+    def __ordered(self, values):
+        import numpy as np
+
+        values = np.frombuffer(values, dtype=np.float64)
+        if self.count <= self.capacity:
+            return values[: self.count]
+        split = self.count % self.capacity
+        return np.concatenate((values[split:], values[:split]))
+
+    def summary(self):
+        import numpy as np
+
+        host = self.__ordered(self.__host)
+        controller = self.__ordered(self.__controller)
+        host_period = np.diff(host)
+        controller_period = np.diff(controller)
+        # a controller restart sets its clock back, those periods are left out
+        valid = controller_period > 0
+        error = np.abs(host_period - controller_period)[valid]
+        skipped = np.rint(controller_period[valid] * self.frequency) - 1
+
+        lateness = None
+        # after a restart the offsets of the two clocks are not comparable
+        if host.size and valid.all():
+            offset = host - controller
+            lateness = percentiles_us(offset - offset.min())
+        return {
+            "samples": min(self.count, self.capacity),
+            "skipped": int(skipped[skipped > 0].sum()),
+            "period_error_us": percentiles_us(error),
+            "lateness_us": lateness,
+        }
+
+
+def format_summary(summary):
+    """One line per measure, for logs and the console"""
+    lines = ["{} samples, {} skipped".format(summary["samples"], summary["skipped"])]
+    for key in ("period_error_us", "lateness_us"):
+        values = summary[key]
+        if values is not None:
+            lines.append(
+                "{}: ".format(key)
+                + ", ".join("{} {:.0f}".format(k, v) for k, v in values.items())
+            )
+    return lines
@@ -0,0 +1,249 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import gc
+import json
+import logging
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+
+from rtde.rtde import LOGNAME
+from rtde.write_behind import LatencyHistogram
+
+_log = logging.getLogger(LOGNAME)
+
+MODES = ("sample", "cprofile")
+MAX_DEPTH = 64
+TOP_ALLOCATIONS = 30
+
+
+class StackSampler(object):
+    """Samples the stack of one thread from a background thread.
+
+    Every interval seconds the stack of the thread is taken from
+    sys._current_frames() and counted, the overhead is one stack walk per
+    interval however busy the thread is. write() saves the counts in the
+    collapsed format flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = 0
+        self.overhead = 0.0  # seconds spent walking stacks
+        self.__stacks = {}
+        self.__labels = {}  # by code object
+        self.__stop = threading.Event()
+        self.__thread = None
+
+    def start(self):
+        self.__thread = threading.Thread(
+            target=self.__run, name="stack sampler", daemon=True
+        )
+        self.__thread.start()
+
+    def stop(self):
+        self.__stop.set()
+        self.__thread.join()
+
+    def __run(self):
+        while not self.__stop.wait(self.interval):
+            start = time.perf_counter()
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                code = frame.f_code
+                label = self.__labels.get(code)
+                if label is None:
+                    label = "{}:{}".format(
+                        os.path.basename(code.co_filename), code.co_name
+                    )
+                    self.__labels[code] = label
+                stack.append(label)
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.__stacks[key] = self.__stacks.get(key, 0) + 1
+                self.samples += 1
+            self.overhead += time.perf_counter() - start
+
+    def write(self, filename):
+        with open(filename, "w") as f:
+            for stack, count in sorted(self.__stacks.items(), key=lambda s: -s[1]):
+                f.write("{} {}\n".format(stack, count))
+
+
+class GCMonitor(object):
+    """Pause count and duration per generation, from gc.callbacks"""
+
+    def __init__(self):
+        self.pauses = [LatencyHistogram() for _ in range(3)]
+        self.collected = 0
+        self.uncollectable = 0
+        self.__start = None
+
+    def start(self):
+        gc.callbacks.append(self.__callback)
+
+    def stop(self):
+        gc.callbacks.remove(self.__callback)
+
+    def __callback(self, phase, info):
+        if phase == "start":
+            self.__start = time.perf_counter()
+        elif self.__start is not None:
+            self.pauses[info["generation"]].add(time.perf_counter() - self.__start)
+            self.collected += info["collected"]
+            self.uncollectable += info["uncollectable"]
+            self.__start = None
+
+    def summary(self):
+        return {
+            "collected": self.collected,
+            "uncollectable": self.uncollectable,
+            "generations": [p.summary() for p in self.pauses],
+        }
+
+
+class Profiler(object):
+    """Profiles the calling thread and writes the artifacts to directory.
+
+    mode "sample" takes stacks every interval seconds (stacks.txt), it is
+    cheap enough to leave on; "cprofile" traces every call (profile.pstats
+    and profile.txt) and slows a busy loop down noticeably. tracemalloc
+    adds to every allocation and is off by default, with trace_frames > 0
+    it keeps that many frames per allocation and snapshots are dumped at
+    start and stop, tracemalloc_diff.txt lists what grew. GC pauses are
+    always counted. run.json holds metadata (recipes,
+    frequency, ...) together with the GC, memory and sampler summaries.
+    """
+
+    def __init__(
+        self, directory, metadata=None, mode="sample", interval=0.005, trace_frames=0
+    ):
+        if mode not in MODES:
+            raise ValueError("Unknown profile mode: " + str(mode))
+        self.directory = directory
+        self.metadata = dict(metadata or {})
+        self.mode = mode
+        self.interval = interval
+        self.trace_frames = trace_frames
+        self.gc = GCMonitor()
+        self.__sampler = None
+        self.__profile = None
+        self.__snapshot = None
+        self.__owns_tracemalloc = False
+        self.__start = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def __path(self, name):
+        return os.path.join(self.directory, name)
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if self.trace_frames > 0:
+            # PYTHONTRACEMALLOC may already trace, leave it running then
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.trace_frames)
+                self.__owns_tracemalloc = True
+            self.__snapshot = tracemalloc.take_snapshot()
+            self.__snapshot.dump(self.__path("tracemalloc_start.snap"))
+        self.gc.start()
+        self.__start = time.time()
+        if self.mode == "cprofile":
+            import cProfile
+
+            self.__profile = cProfile.Profile()
+            self.__profile.enable()
+        else:
+            self.__sampler = StackSampler(threading.get_ident(), self.interval)
+            self.__sampler.start()
+
+    def stop(self):
+        end = time.time()
+        run = dict(self.metadata)
+        run.update(
+            start=self.__start,
+            end=end,
+            duration_s=end - self.__start,
+            python=platform.python_version(),
+            mode=self.mode,
+        )
+        if self.__profile is not None:
+            self.__profile.disable()
+            self.__write_cprofile()
+        if self.__sampler is not None:
+            self.__sampler.stop()
+            self.__sampler.write(self.__path("stacks.txt"))
+            run["sampler"] = {
+                "interval_s": self.interval,
+                "samples": self.__sampler.samples,
+                "overhead_s": self.__sampler.overhead,
+            }
+        self.gc.stop()
+        run["gc"] = self.gc.summary()
+        if self.__snapshot is not None:
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            if self.__owns_tracemalloc:
+                tracemalloc.stop()
+            snapshot.dump(self.__path("tracemalloc_end.snap"))
+            self.__write_diff(snapshot)
+            run["tracemalloc"] = {
+                "frames": self.trace_frames,
+                "current_bytes": current,
+                "peak_bytes": peak,
+            }
+        with open(self.__path("run.json"), "w") as f:
+            json.dump(run, f, indent=2)
+        _log.info("Profile written to %s", self.directory)
+
+    def __write_cprofile(self):
+        import pstats
+
+        self.__profile.dump_stats(self.__path("profile.pstats"))
+        with open(self.__path("profile.txt"), "w") as f:
+            stats = pstats.Stats(self.__profile, stream=f)
+            stats.sort_stats("cumulative").print_stats(40)
+
+    def __write_diff(self, snapshot):
+        # allocations of the profiler itself are not of interest
+        ignore = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]
+        before = self.__snapshot.filter_traces(ignore)
+        after = snapshot.filter_traces(ignore)
+        with open(self.__path("tracemalloc_diff.txt"), "w") as f:
+            for stat in after.compare_to(before, "lineno")[:TOP_ALLOCATIONS]:
+                f.write(str(stat) + "\n")
@@ -0,0 +1,201 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import collections
+import json
+import struct
+import time
+
+from rtde import serialize
+from rtde.rtde import PACKAGE_HEADER, Command
+
+MAGIC = b"RTDERAW1"
+# record kind and payload length, the payload follows
+RECORD = struct.Struct("<BI")
+RECIPES = 1  # JSON: the output recipes, the stream (re)starts here
+MARK = 2  # stream offset, time.monotonic_ns() and time.time_ns()
+DATA = 3  # bytes of the RTDE stream as received
+MARK_FORMAT = struct.Struct("<QQQ")
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+
+class RawCaptureWriter(object):
+    """Appends the received RTDE byte stream verbatim to a capture file.
+
+    write() takes the bytes of every read, they are collected and written
+    as one DATA record once block_size bytes are pending. Every
+    mark_interval seconds (every read with 0) a host time mark records how
+    many stream bytes had arrived by then, a block is always preceded by a
+    mark for its end, so every package can be given the time of the first
+    mark at or after it. write_recipes() records the output recipes, call it
+    after every (re)connect since the stream starts over.
+    """
+
+    def __init__(self, file, block_size=DEFAULT_BLOCK_SIZE, mark_interval=0.01):
+        self.__file = file
+        self.block_size = block_size
+        self.mark_interval_ns = int(mark_interval * 1e9)
+        self.bytes = 0  # stream bytes written or pending
+        self.__pending = bytearray()
+        self.__marks = bytearray()
+        self.__marked = None  # stream offset of the last mark
+        self.__last_read_ns = None
+        self.__next_mark_ns = 0
+        file.write(MAGIC)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __record(self, kind, payload):
+        self.__file.write(RECORD.pack(kind, len(payload)))
+        self.__file.write(payload)
+
+    def __mark(self, read_ns):
+        self.__marks += MARK_FORMAT.pack(self.bytes, read_ns, time.time_ns())
+        self.__marked = self.bytes
+
+    def write_recipes(self, recipes):
+        """Records a list of dicts with id, names and types (and e.g. key and
+        frequency) of the output recipes"""
+        self.flush()
+        self.__record(RECIPES, json.dumps(recipes).encode("utf-8"))
+
+    def write(self, data):
+        read_ns = time.monotonic_ns()
+        self.__pending += data
+        self.bytes += len(data)
+        self.__last_read_ns = read_ns
+        if read_ns >= self.__next_mark_ns:
+            self.__mark(read_ns)
+            self.__next_mark_ns = read_ns + self.mark_interval_ns
+        if len(self.__pending) >= self.block_size:
+            self.flush()
+
+    def flush(self):
+        if not self.__pending:
+            return
+        if self.__marked != self.bytes:
+            self.__mark(self.__last_read_ns)
+        for offset in range(0, len(self.__marks), MARK_FORMAT.size):
+            self.__record(MARK, self.__marks[offset : offset + MARK_FORMAT.size])
+        self.__record(DATA, self.__pending)
+        self.__marks = bytearray()
+        self.__pending = bytearray()
+
+    def close(self):
+        self.flush()
+
+
+class RawCaptureReader(object):
+    """Reads a capture written by RawCaptureWriter.
+
+    packages() yields (recipe, payload, host_ns) for every data package,
+    recipe being a dict from the last RECIPES record with a
+    serialize.DataConfig under "config" and payload starting with the
+    recipe id. host_ns is the time.monotonic_ns() of the first mark at or
+    after the end of the package. Other packages are counted by command in
+    commands, the text messages kept in messages. keys lists the recipe
+    keys in the order they were set up, keys[0] being the first recipe.
+    """
+
+    def __init__(self, file):
+        self.__file = file
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not an RTDE raw capture")
+        self.recipes = {}
+        self.keys = []
+        self.commands = collections.Counter()
+        self.messages = []
+        self.marks = 0
+        self.restarts = 0
+
+    def records(self):
+        """Yields (kind, payload) of every record"""
+        while True:
+            header = self.__file.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return
+            kind, size = RECORD.unpack(header)
+            payload = self.__file.read(size)
+            if len(payload) < size:
+                return  # cut short, e.g. by a crash
+            yield kind, payload
+
+    def __set_recipes(self, payload):
+        self.recipes = {}
+        for recipe in json.loads(payload.decode("utf-8")):
+            config = serialize.DataConfig.unpack_recipe(
+                bytes([recipe["id"]]) + ",".join(recipe["types"]).encode("utf-8")
+            )
+            config.names = recipe["names"]
+            recipe["config"] = config
+            # recipe ids can change on reconnect, the keys do not
+            recipe.setdefault("key", "recipe" + str(recipe["id"]))
+            if recipe["key"] not in self.keys:
+                self.keys.append(recipe["key"])
+            self.recipes[recipe["id"]] = recipe
+
+    def packages(self):
+        marks = collections.deque()
+        buf = b""
+        pos = 0
+        start = 0  # stream offset of buf[0]
+        for kind, payload in self.records():
+            if kind == MARK:
+                marks.append(MARK_FORMAT.unpack(payload))
+                self.marks += 1
+                continue
+            if kind == RECIPES:
+                # a partial package before a reconnect is lost
+                self.restarts += 1 if self.recipes else 0
+                self.__set_recipes(payload)
+                start += len(buf)
+                buf, pos = b"", 0
+                continue
+            if kind != DATA:
+                continue
+            start += pos
+            buf = buf[pos:] + payload
+            pos = 0
+            while len(buf) - pos >= 3:
+                size, command = PACKAGE_HEADER.unpack_from(buf, pos)
+                if len(buf) - pos < size:
+                    break
+                end = start + pos + size
+                package = buf[pos + 3 : pos + size]
+                pos += size
+                if command != Command.RTDE_DATA_PACKAGE:
+                    self.commands[command] += 1
+                    if command == Command.RTDE_TEXT_MESSAGE:
+                        self.messages.append(package)
+                    continue
+                while marks and marks[0][0] < end:
+                    marks.popleft()
+                recipe = self.recipes.get(package[0])
+                if recipe is None:
+                    self.commands["unknown recipe"] += 1
+                    continue
+                yield recipe, package, marks[0][1] if marks else None
@@ -0,0 +1,421 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import collections
+import itertools
+import logging
+import math
+import struct
+import time
+
+from rtde import serialize
+from rtde.csv_binary_reader import is_binary_recording
+from rtde.rtde import (
+    ConnectionState,
+    LOGNAME,
+    RTDEException,
+    RTDE_PROTOCOL_VERSION_2,
+)
+
+_log = logging.getLogger(LOGNAME)
+
+TIMESTAMP = "timestamp"
+
+
+class _ReplayRecipe(object):
+    def __init__(self, config, columns, divider):
+        self.config = config
+        self.columns = columns
+        self.divider = divider
+        self.struct = struct.Struct(">" + config.fmt[2:])
+
+    def values(self, row):
+        """Flat list of values in recipe order, cast to the field types"""
+        return [cast(row[i]) for i, cast in self.columns]
+
+    def payload(self, row):
+        return struct.pack(">B", self.config.id) + self.struct.pack(*self.values(row))
+
+    def data_object(self, row):
+        obj = serialize.DataObject()
+        obj.recipe_id = self.config.id
+        values = self.values(row)
+        offset = 0
+        for name, data_type in zip(self.config.names, self.config.types):
+            size = serialize.get_item_size(data_type)
+            if data_type.startswith("VECTOR"):
+                obj.__dict__[name] = values[offset : offset + size]
+            else:
+                obj.__dict__[name] = values[offset]
+            offset += size
+        return obj
+
+
+def _caster(data_type):
+    if data_type.endswith("D") or data_type == "DOUBLE":
+        return float
+    if data_type == "BOOL":
+        return lambda v: bool(int(v))
+    return int
+
+
+class ReplayRTDE(object):
+    """Plays a recording through the public interface of rtde.RTDE.
+
+    Recordings are CSV files as written by CSVWriter (read with CSVReader)
+    or binary ones written by CSVBinaryWriter. Empty cells of fields with a
+    downsampling policy replay the last recorded value, rows before every
+    replayed field has one are skipped. speed 1.0 replays in real
+    time paced by the timestamp column, N replays N times faster and 0 as
+    fast as the caller receives. Output recipes can ask for any recorded
+    field, a lower frequency than the recording keeps every Nth row. The
+    end of the recording is reported like a lost connection, by raising
+    RTDEException, unless loop is set. Rows are read from the file as they
+    are replayed, so recordings of any length fit in memory.
+    """
+
+    def __init__(self, filename, speed=1.0, binary=None, delimiter=",", loop=False):
+        self.hostname = filename
+        self.port = None
+        self.speed = speed
+        self.loop = loop
+        self.__filename = filename
+        self.__binary = is_binary_recording(filename) if binary is None else binary
+        self.__delimiter = delimiter
+        self.__conn_state = ConnectionState.DISCONNECTED
+        self.__recipes = collections.OrderedDict()
+        self.__last_recipe_id = None
+        self.__last_receive_ns = None
+        self.__skipped_package_count = 0
+        self.__data_packages = 0
+        self.__columns = None
+        self.__types = None
+        self.__file = None
+        self.__rows = None
+        self.__frequency = None
+
+    def __open(self, columns=None):
+        """Opens the recording, returns the file and an iterator of its rows,
+        with columns a list of the column indexes to parse"""
+        if self.__binary:
+            import rtde.csv_binary_reader as csv_binary_reader
+
+            f = open(self.__filename, "rb")
+            reader = csv_binary_reader.CSVBinaryReader(f)
+            self.__types = reader.types
+        else:
+            import rtde.csv_reader as csv_reader
+
+            f = open(self.__filename)
+            reader = csv_reader.CSVRowReader(f, delimiter=self.__delimiter)
+            self.__types = None
+            self.__columns = reader.names
+            return f, reader.read_rows(dense=True, columns=columns)
+        self.__columns = reader.names
+        return f, reader.read_rows()
+
+    def __used_columns(self):
+        columns = [i for recipe in self.__recipes.values() for i, _ in recipe.columns]
+        if self.__timestamp is not None:
+            columns.append(self.__timestamp)
+        return columns
+
+    def __close(self):
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def connect(self):
+        if self.__conn_state != ConnectionState.DISCONNECTED:
+            return
+        f, rows = self.__open()
+        with f:
+            head = list(itertools.islice(rows, 101))
+        if not head:
+            raise RTDEException("No data in recording: " + self.__filename)
+        self.__timestamp = (
+            self.__columns.index(TIMESTAMP) if TIMESTAMP in self.__columns else None
+        )
+        if self.__timestamp is not None:
+            self.__first_time = head[0][self.__timestamp]
+        self.__frequency = self.__recorded_frequency(head)
+        self.__skipped_package_count = 0
+        self.__data_packages = 0
+        self.__conn_state = ConnectionState.CONNECTED
+
+    def __recorded_frequency(self, head):
+        if self.__timestamp is None or len(head) < 2:
+            return None
+        periods = sorted(
+            b[self.__timestamp] - a[self.__timestamp] for a, b in zip(head, head[1:])
+        )
+        period = periods[len(periods) // 2]
+        return 1.0 / period if period > 0 else None
+
+    def disconnect(self):
+        self.__close()
+        self.__conn_state = ConnectionState.DISCONNECTED
+
+    def is_connected(self):
+        return self.__conn_state is not ConnectionState.DISCONNECTED
+
+    def reconnect(self, attempts=None, delay=0.5, max_delay=10.0):
+        """A recording cannot be resumed once it ended"""
+        return False
+
+    def get_controller_version(self):
+        return None, None, None, None
+
+    def negotiate_protocol_version(self):
+        return RTDE_PROTOCOL_VERSION_2
+
+    def send_input_setup(self, variables, types=[]):
+        recipe_id = 1 + len(self.__recipes)
+        return serialize.DataObject.create_empty(variables, recipe_id)
+
+    def __column_types(self, name, data_type):
+        """Column indexes and casts of a field, None if it was not recorded"""
+        size = serialize.get_item_size(data_type)
+        names = [name] if size == 1 else [name + "_" + str(i) for i in range(size)]
+        if not all(n in self.__columns for n in names):
+            return None
+        indexes = [self.__columns.index(n) for n in names]
+        return [(i, _caster(data_type)) for i in indexes]
+
+    def __infer_type(self, name):
+        if name in self.__columns:
+            if self.__types is not None:
+                return self.__types[self.__columns.index(name)]
+            return "DOUBLE"
+        for size, vector_type in ((6, "VECTOR6D"), (3, "VECTOR3D")):
+            if name + "_" + str(size - 1) in self.__columns:
+                if self.__types is not None:
+                    scalar = self.__types[self.__columns.index(name + "_0")]
+                    if scalar == "INT32":
+                        return "VECTOR6INT32"
+                    if scalar == "UINT32":
+                        return "VECTOR6UINT32"
+                return vector_type
+        return "NOT_FOUND"
+
+    def send_output_setup(self, variables, types=[], frequency=125):
+        if len(types) == 0:
+            types = [self.__infer_type(name) for name in variables]
+        columns = []
+        for name, data_type in zip(variables, types):
+            field = self.__column_types(name, data_type)
+            if field is None:
+                _log.error("Field not in recording: " + name)
+                return False
+            columns.extend(field)
+        recipe_id = 1 + len(self.__recipes)
+        config = serialize.DataConfig.unpack_recipe(
+            struct.pack(">B", recipe_id) + ",".join(types).encode("utf-8")
+        )
+        config.names = variables
+        divider = 1
+        if self.__frequency and 0 < frequency < self.__frequency:
+            divider = max(1, int(round(self.__frequency / frequency)))
+        self.__recipes[recipe_id] = _ReplayRecipe(config, columns, divider)
+        return True
+
+    def send_start(self):
+        if not self.__recipes:
+            _log.error("RTDE synchronization failed to start")
+            return False
+        self.__close()
+        self.__used = self.__used_columns()
+        self.__file, self.__rows = self.__open(self.__used)
+        self.__leading = not self.__binary
+        self.__index = 0
+        self.__last_time = 0.0
+        self.__pending = collections.deque()
+        self.__time_offset = 0.0
+        self.__start = time.monotonic()
+        _log.info("RTDE synchronization started")
+        self.__conn_state = ConnectionState.STARTED
+        return True
+
+    def send_pause(self):
+        _log.info("RTDE synchronization paused")
+        self.__conn_state = ConnectionState.PAUSED
+        return True
+
+    def send(self, input_data):
+        return True
+
+    def send_values(self, recipe_id, values):
+        return True
+
+    def send_batch(self, recipe_values):
+        return True
+
+    def send_message(self, message, source="Python Client", type=None):
+        return True
+
+    def __row_time(self, row, index):
+        if self.__timestamp is not None:
+            return row[self.__timestamp] - self.__first_time
+        return index / float(self.__frequency or 125)
+
+    def __load_row(self):
+        """Queues the packages of the next row, False at the end"""
+        while True:
+            row = next(self.__rows, None)
+            if row is None:
+                if not self.loop or self.__index == 0:
+                    return False
+                period = 1.0 / (self.__frequency or 125)
+                self.__time_offset += self.__last_time + period
+                self.__close()
+                self.__file, self.__rows = self.__open(self.__used)
+                self.__leading = not self.__binary
+                self.__index = 0
+                continue
+            if self.__leading:
+                if any(math.isnan(row[i]) for i in self.__used):
+                    continue  # a field with a policy has no value yet
+                self.__leading = False
+            index = self.__index
+            self.__index += 1
+            self.__last_time = self.__row_time(row, index)
+            due = 0.0
+            if self.speed:
+                due = (
+                    self.__start + (self.__time_offset + self.__last_time) / self.speed
+                )
+            queued = False
+            for recipe in self.__recipes.values():
+                if index % recipe.divider == 0:
+                    self.__pending.append((recipe, row, due))
+                    queued = True
+            if queued:
+                return True
+
+    def __next_package(self, block, latest):
+        if self.__conn_state != ConnectionState.STARTED:
+            raise RTDEException("Cannot receive when RTDE synchronization is inactive")
+        if not self.__pending and not self.__load_row():
+            self.disconnect()
+            raise RTDEException("End of recording: " + self.__filename)
+        recipe, row, due = self.__pending[0]
+        delay = due - time.monotonic()
+        if delay > 0:
+            if not block:
+                return None
+            time.sleep(delay)
+        self.__pending.popleft()
+        self.__data_packages += 1
+        # like the controller stream, packages already due are skipped
+        while latest and self.speed:
+            if not self.__pending and not self.__load_row():
+                break
+            next_recipe, next_row, next_due = self.__pending[0]
+            if next_recipe is not recipe or next_due > time.monotonic():
+                break
+            self.__pending.popleft()
+            self.__data_packages += 1
+            self.__skipped_package_count += 1
+            row = next_row
+        return recipe, row
+
+    def __output(self, package, binary, lazy):
+        if package is None:
+            return None
+        recipe, row = package
+        self.__last_recipe_id = recipe.config.id
+        self.__last_receive_ns = time.monotonic_ns()
+        if binary:
+            return recipe.payload(row)[1:]
+        if lazy:
+            return recipe.config.view(recipe.payload(row))
+        return recipe.data_object(row)
+
+    def receive(self, binary=False, lazy=False):
+        """Receive the latest data package, see rtde.RTDE.receive"""
+        if not self.__recipes:
+            raise RTDEException("Output configuration not initialized")
+        return self.__output(self.__next_package(True, True), binary, lazy)
+
+    def receive_buffered(self, binary=False, buffer_limit=None, lazy=False):
+        """Receive the next data package, None if it is not due yet"""
+        if not self.__recipes:
+            logging.error("Output configuration not initialized")
+            return None
+        return self.__output(self.__next_package(False, False), binary, lazy)
+
+    def has_data(self, timeout=0):
+        if self.__conn_state != ConnectionState.STARTED:
+            return False
+        if not self.__pending and not self.__load_row():
+            return True  # the end of the recording is reported by receive
+        delay = self.__pending[0][2] - time.monotonic()
+        if delay > timeout:
+            return False
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    @property
+    def skipped_package_count(self):
+        """The skipped package count, resets on connect"""
+        return self.__skipped_package_count
+
+    @property
+    def controller_version(self):
+        return None
+
+    @property
+    def output_configs(self):
+        """The output recipes in the order they were set up"""
+        return [recipe.config for recipe in self.__recipes.values()]
+
+    @property
+    def last_recipe_id(self):
+        """The recipe id of the last data package returned by receive"""
+        return self.__last_recipe_id
+
+    @property
+    def last_receive_ns(self):
+        """time.monotonic_ns() when the last data package was returned"""
+        return self.__last_receive_ns
+
+    @property
+    def queue_stats(self):
+        """Same keys as rtde.RTDE.queue_stats, nothing is read ahead"""
+        return dict.fromkeys(
+            ("packets", "bytes", "peak_packets", "peak_bytes", "overflows", "dropped"),
+            0,
+        )
+
+    @property
+    def socket_stats(self):
+        """Same keys as rtde.RTDE.socket_stats, no socket calls are made"""
+        return {
+            "recv_calls": 0,
+            "send_calls": 0,
+            "poll_calls": 0,
+            "bytes_received": 0,
+            "data_packages": self.__data_packages,
+            "syscalls_per_package": None,
+        }
@@ -21,10 +21,12 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import collections
 import struct
 import socket
 import select
 import sys
+import time
 import logging
 
 if sys.version_info[0] < 3:
@@ -34,6 +36,15 @@ else:
 
 DEFAULT_TIMEOUT = 1.0
 
+# On Linux reads block in the kernel (SO_RCVTIMEO) and non-blocking reads use
+# MSG_DONTWAIT, so each read is a single system call. Elsewhere the socket
+# keeps a Python timeout, which polls before every call.
+KERNEL_TIMEOUTS = sys.platform.startswith("linux")
+SO_BUSY_POLL = getattr(socket, "SO_BUSY_POLL", 46)
+BUSY_POLL_USEC = 50
+
+PACKAGE_HEADER = struct.Struct(">HB")
+
 LOGNAME = "rtde"
 _log = logging.getLogger(LOGNAME)
 
@@ -60,6 +71,26 @@ class ConnectionState:
     PAUSED = 3
 
 
+class SocketMode:
+    LOW_LATENCY = "low_latency"  # small reads, optional busy polling
+    HIGH_THROUGHPUT = "high_throughput"  # large reads, many packages per call
+
+
+# default (recv size, SO_RCVBUF) per mode, None keeps the OS default
+SOCKET_MODE_DEFAULTS = {
+    SocketMode.LOW_LATENCY: (4096, None),
+    SocketMode.HIGH_THROUGHPUT: (262144, 4194304),
+}
+
+
+class OverflowPolicy:
+    """What receive_buffered does when its packet queue is full"""
+
+    DROP_OLDEST = "drop_oldest"  # keep reading, discard the oldest package
+    DROP_NEWEST = "drop_newest"  # keep reading, discard the new package
+    BLOCK = "block"  # stop reading, TCP flow control slows the controller
+
+
 class RTDEException(Exception):
     def __init__(self, msg):
         self.msg = msg
@@ -74,28 +105,94 @@ class RTDETimeoutException(RTDEException):
 
 
 class RTDE(object):
-    def __init__(self, hostname, port=30004):
+    def __init__(
+        self,
+        hostname,
+        port=30004,
+        mode=SocketMode.LOW_LATENCY,
+        recv_size=None,
+        rcvbuf=None,
+        busy_poll=False,
+        queue_packets=None,
+        queue_bytes=None,
+        overflow=OverflowPolicy.BLOCK,
+    ):
+        if mode not in SOCKET_MODE_DEFAULTS:
+            raise ValueError("Unknown socket mode: " + str(mode))
+        if overflow not in (
+            OverflowPolicy.DROP_OLDEST,
+            OverflowPolicy.DROP_NEWEST,
+            OverflowPolicy.BLOCK,
+        ):
+            raise ValueError("Unknown overflow policy: " + str(overflow))
+        default_recv_size, default_rcvbuf = SOCKET_MODE_DEFAULTS[mode]
         self.hostname = hostname
         self.port = port
+        self.mode = mode
+        self.recv_size = recv_size or default_recv_size
+        self.rcvbuf = rcvbuf or default_rcvbuf
+        self.busy_poll = busy_poll
+        # data packages read ahead by receive_buffered, None is unbounded
+        self.queue_packets = queue_packets
+        self.queue_bytes = queue_bytes
+        self.overflow = overflow
+        self.__queue = collections.deque()
+        self.__queue_ns = collections.deque()  # read times of the queued packages
+        self.__queue_stats = self.__new_queue_stats()
+        self.__poller = None
+        self.__stats = self.__new_stats()
         self.__conn_state = ConnectionState.DISCONNECTED
         self.__sock = None
-        self.__output_config = None
+        self.__output_config = {}
         self.__input_config = {}
+        self.__input_packers = {}
+        self.__last_recipe_id = None
+        self.__read_ns = None
+        self.__last_receive_ns = None
         self.__skipped_package_count = 0
         self.__protocolVersion = RTDE_PROTOCOL_VERSION_1
+        # what reconnect() restores: setups in call order and started state
+        self.__setups = []
+        self.__started = False
+        self.__controller_version = None
 
     def connect(self):
         if self.__sock:
             return
 
         self.__buf = b""  # buffer data in binary format
+        self.__view = memoryview(self.__buf)
+        self.__pos = 0  # start of unparsed data in the buffer
+        self.__queue.clear()
+        self.__queue_ns.clear()
+        self.__queue_stats = self.__new_queue_stats()
         try:
             self.__sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.__sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.__sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.rcvbuf:
+                self.__sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf)
+            if self.busy_poll and KERNEL_TIMEOUTS:
+                try:
+                    self.__sock.setsockopt(
+                        socket.SOL_SOCKET, SO_BUSY_POLL, BUSY_POLL_USEC
+                    )
+                except socket.error:
+                    _log.warning("SO_BUSY_POLL not permitted, polling in user space")
             self.__sock.settimeout(DEFAULT_TIMEOUT)
             self.__skipped_package_count = 0
+            self.__stats = self.__new_stats()
             self.__sock.connect((self.hostname, self.port))
+            if KERNEL_TIMEOUTS:
+                timeval = struct.pack(
+                    "ll", int(DEFAULT_TIMEOUT), int(DEFAULT_TIMEOUT % 1 * 1000000)
+                )
+                self.__sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, timeval)
+                self.__sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, timeval)
+                self.__sock.settimeout(None)
+            if hasattr(select, "poll"):
+                self.__poller = select.poll()
+                self.__poller.register(self.__sock, select.POLLIN)
             self.__conn_state = ConnectionState.CONNECTED
         except (socket.timeout, socket.error):
             self.__sock = None
@@ -107,11 +204,62 @@ class RTDE(object):
         if self.__sock:
             self.__sock.close()
             self.__sock = None
+            self.__poller = None
         self.__conn_state = ConnectionState.DISCONNECTED
 
     def is_connected(self):
         return self.__conn_state is not ConnectionState.DISCONNECTED
 
+    def reconnect(self, attempts=None, delay=0.5, max_delay=10.0):
+        """Connect again after the connection was lost and restore the session.
+        The protocol version is negotiated, the input and output recipes are
+        set up again in their original order and synchronization is restarted
+        if it was running. The cached controller version is not asked for.
+        Failed attempts are retried after delay seconds, doubling up to
+        max_delay, attempts=None retries forever.
+        Returns True once the session is restored, False if all attempts failed.
+        """
+        setups, started = list(self.__setups), self.__started
+        output_ids = list(self.__output_config)
+        input_ids = list(self.__input_config)
+        attempt = 0
+        while True:
+            attempt += 1
+            self.disconnect()
+            try:
+                self.connect()
+                restored = self.__restore(setups, started)
+            except (socket.error, RTDEException) as e:
+                _log.warning("Reconnect attempt %d failed: %s", attempt, e)
+            else:
+                if restored:
+                    break
+                _log.warning("Reconnect attempt %d failed to restore recipes", attempt)
+            if attempts is not None and attempt >= attempts:
+                self.disconnect()
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, max_delay)
+        if list(self.__output_config) != output_ids:
+            _log.warning("Output recipe ids changed on reconnect")
+        if list(self.__input_config) != input_ids:
+            _log.warning("Input recipe ids changed, set up inputs again")
+        _log.info("Reconnected after %d attempt(s)", attempt)
+        return True
+
+    def __restore(self, setups, started):
+        self.__output_config = {}
+        self.__input_config = {}
+        self.__input_packers = {}
+        self.__setups = []
+        for output, variables, types, frequency in setups:
+            if output:
+                if not self.send_output_setup(variables, types, frequency):
+                    return False
+            elif self.send_input_setup(variables, types) is None:
+                return False
+        return not started or self.send_start()
+
     def get_controller_version(self):
         cmd = Command.RTDE_GET_URCONTROL_VERSION
         version = self.__sendAndReceive(cmd)
@@ -131,7 +279,13 @@ class RTDE(object):
                     "Please upgrade your controller to minimally version 3.2.19171"
                 )
                 sys.exit()
-            return version.major, version.minor, version.bugfix, version.build
+            self.__controller_version = (
+                version.major,
+                version.minor,
+                version.bugfix,
+                version.build,
+            )
+            return self.__controller_version
         return None, None, None, None
 
     def negotiate_protocol_version(self):
@@ -146,6 +300,8 @@ class RTDE(object):
         cmd = Command.RTDE_CONTROL_PACKAGE_SETUP_INPUTS
         payload = bytearray(",".join(variables), "utf-8")
         result = self.__sendAndReceive(cmd, payload)
+        if result is None:
+            return None
         if len(types) != 0 and not self.__list_equals(result.types, types):
             _log.error(
                 "Data type inconsistency for input setup: "
@@ -156,6 +312,8 @@ class RTDE(object):
             return None
         result.names = variables
         self.__input_config[result.id] = result
+        self.__input_packers.pop(result.id, None)
+        self.__setups.append((False, variables, types, None))
         return serialize.DataObject.create_empty(variables, result.id)
 
     def send_output_setup(self, variables, types=[], frequency=125):
@@ -163,6 +321,8 @@ class RTDE(object):
         payload = struct.pack(">d", frequency)
         payload = payload + (",".join(variables).encode("utf-8"))
         result = self.__sendAndReceive(cmd, payload)
+        if result is None:
+            return False
         if len(types) != 0 and not self.__list_equals(result.types, types):
             _log.error(
                 "Data type inconsistency for output setup: "
@@ -172,7 +332,8 @@ class RTDE(object):
             )
             return False
         result.names = variables
-        self.__output_config = result
+        self.__output_config[result.id] = result
+        self.__setups.append((True, variables, types, frequency))
         return True
 
     def send_start(self):
@@ -181,6 +342,7 @@ class RTDE(object):
         if success:
             _log.info("RTDE synchronization started")
             self.__conn_state = ConnectionState.STARTED
+            self.__started = True
         else:
             _log.error("RTDE synchronization failed to start")
         return success
@@ -191,6 +353,7 @@ class RTDE(object):
         if success:
             _log.info("RTDE synchronization paused")
             self.__conn_state = ConnectionState.PAUSED
+            self.__started = False
         else:
             _log.error("RTDE synchronization failed to pause")
         return success
@@ -202,48 +365,182 @@ class RTDE(object):
         if not input_data.recipe_id in self.__input_config:
             _log.error("Input configuration id not found: " + str(input_data.recipe_id))
             return
-        config = self.__input_config[input_data.recipe_id]
-        return self.__sendall(Command.RTDE_DATA_PACKAGE, config.pack(input_data))
+        packer = self.get_input_packer(input_data.recipe_id)
+        return self.__send_packages(packer.pack_object(input_data))
+
+    def get_input_packer(self, recipe_id):
+        """Returns the precompiled packer of an input recipe."""
+        packer = self.__input_packers.get(recipe_id)
+        if packer is None:
+            packer = serialize.InputPacker(
+                self.__input_config[recipe_id], Command.RTDE_DATA_PACKAGE
+            )
+            self.__input_packers[recipe_id] = packer
+        return packer
+
+    def send_values(self, recipe_id, values):
+        """Send an input package from a flat sequence or NumPy array of values.
+        Vector fields are expanded in place, in the order of the input setup.
+        """
+        if self.__conn_state != ConnectionState.STARTED:
+            _log.error("Cannot send when RTDE synchronization is inactive")
+            return
+        if not recipe_id in self.__input_config:
+            _log.error("Input configuration id not found: " + str(recipe_id))
+            return
+        return self.__send_packages(self.get_input_packer(recipe_id).pack(values))
 
-    def receive(self, binary=False):
+    def send_batch(self, recipe_values):
+        """Send several input packages with a single system call.
+        recipe_values is a sequence of (recipe_id, values) pairs, each recipe
+        can appear only once per batch since its package buffer is reused.
+        """
+        if self.__conn_state != ConnectionState.STARTED:
+            _log.error("Cannot send when RTDE synchronization is inactive")
+            return
+        buffers = []
+        for recipe_id, values in recipe_values:
+            if not recipe_id in self.__input_config:
+                _log.error("Input configuration id not found: " + str(recipe_id))
+                return
+            packer = self.get_input_packer(recipe_id)
+            if any(b is packer.buffer for b in buffers):
+                raise ValueError("Input recipe repeated in batch: " + str(recipe_id))
+            buffers.append(packer.pack(values))
+        return self.__send_packages(*buffers)
+
+    def receive(self, binary=False, lazy=False):
         """Recieve the latest data package.
         If muliple packages has been received, older ones are discarded
         and only the newest one will be returned. Will block untill a package
-        is received or the connection is lost
+        is received or the connection is lost.
+        With lazy=True a serialize.DataView is returned, which decodes fields
+        only when they are accessed.
         """
-        if self.__output_config is None:
+        if not self.__output_config:
             raise RTDEException("Output configuration not initialized")
         if self.__conn_state != ConnectionState.STARTED:
             raise RTDEException("Cannot receive when RTDE synchronization is inactive")
-        return self.__recv(Command.RTDE_DATA_PACKAGE, binary)
+        return self.__recv_latest(binary, lazy)
 
-    def receive_buffered(self, binary=False, buffer_limit=None):
+    def receive_buffered(self, binary=False, buffer_limit=None, lazy=False):
         """Recieve the next data package.
-        If muliple packages has been received they are buffered and will
+        If muliple packages has been received they are queued and will
         be returned on subsequent calls to this function.
         Returns None if no data is available.
+        The queue is bounded by queue_packets and queue_bytes, when it is full
+        the overflow policy applies. buffer_limit additionally stops reading
+        once that many bytes are queued.
+        With lazy=True a serialize.DataView is returned, see receive().
         """
 
-        if self._RTDE__output_config is None:
+        if not self._RTDE__output_config:
             logging.error("Output configuration not initialized")
             return None
 
         try:
+            blocked = self.__fill_queue()
             while (
                 self.is_connected()
-                and (buffer_limit == None or len(self.__buf) < buffer_limit)
+                and not blocked
+                and (buffer_limit is None or self.__queue_stats["bytes"] < buffer_limit)
                 and self.__recv_to_buffer(0)
             ):
-                pass
+                blocked = self.__fill_queue()
         except RTDEException as e:
-            data = self.__recv_from_buffer(Command.RTDE_DATA_PACKAGE, binary)
-            if data == None:
+            self.__fill_queue()
+            if not self.__queue:
                 raise e
-        else:
-            data = self.__recv_from_buffer(Command.RTDE_DATA_PACKAGE, binary)
 
+        if not self.__queue:
+            return None
+        payload = self.__queue.popleft()
+        self.__last_receive_ns = self.__queue_ns.popleft()
+        self.__queue_stats["bytes"] -= len(payload)
+        self.__last_recipe_id = payload[0]
+        if binary:
+            return payload[1:]
+        return self.__unpack_data_package(payload, lazy)
+
+    def read_raw(self, timeout=DEFAULT_TIMEOUT):
+        """Return the bytes received from the controller as they are, package
+        headers included, without parsing them. Data left in the receive
+        buffer is returned first. Returns b"" when nothing arrived within
+        timeout. Packages already moved to the receive_buffered queue are
+        not returned, do not mix the two.
+        """
+        if self.__conn_state != ConnectionState.STARTED:
+            raise RTDEException("Cannot receive when RTDE synchronization is inactive")
+        if self.__pos < len(self.__buf):
+            data = bytes(self.__view[self.__pos :])
+            self.__buf = b""
+            self.__view = memoryview(self.__buf)
+            self.__pos = 0
+            return data
+        try:
+            busy = self.busy_poll and KERNEL_TIMEOUTS
+            if timeout and timeout != DEFAULT_TIMEOUT and not busy:
+                # the socket itself waits DEFAULT_TIMEOUT, wait for timeout here
+                if not self.__readable(timeout):
+                    return b""
+                timeout = 0
+            data = self.__read(timeout)
+        except (socket.timeout, BlockingIOError):
+            return b""
+        self.__read_ns = time.monotonic_ns()
+        if len(data) == 0:
+            _log.error(
+                "received 0 bytes from Controller, probable cause: Controller has stopped"
+            )
+            self.__trigger_disconnected()
+            raise RTDEException("received 0 bytes from Controller")
+        self.__stats["bytes_received"] += len(data)
         return data
 
+    def __queue_full(self, size=1):
+        """True if a package of size bytes does not fit in the queue"""
+        if self.queue_packets is not None and len(self.__queue) >= self.queue_packets:
+            return True
+        if self.queue_bytes is not None:
+            return self.__queue_stats["bytes"] + size > self.queue_bytes
+        return False
+
+    def __fill_queue(self):
+        """Move complete data packages from the receive buffer to the queue,
+        other packages are handled on the way. Returns True when the queue is
+        full and the overflow policy is to block."""
+        stats = self.__queue_stats
+        while True:
+            pos = self.__pos
+            packet = self.__next_packet()
+            if packet is None:
+                break
+            command, payload = packet
+            if command != Command.RTDE_DATA_PACKAGE:
+                self.__on_packet(command, payload)
+                continue
+            if self.__queue_full(len(payload)):
+                stats["overflows"] += 1
+                if self.overflow == OverflowPolicy.BLOCK and self.__queue:
+                    # leave it in the receive buffer until there is room
+                    self.__pos = pos
+                    self.__stats["data_packages"] -= 1
+                    return True
+                if self.overflow == OverflowPolicy.DROP_NEWEST:
+                    stats["dropped"] += 1
+                    continue
+                while self.__queue and self.__queue_full(len(payload)):
+                    stats["bytes"] -= len(self.__queue.popleft())
+                    self.__queue_ns.popleft()
+                    stats["dropped"] += 1
+            self.__queue.append(bytes(payload))
+            # everything in the receive buffer arrived with the last read
+            self.__queue_ns.append(self.__read_ns)
+            stats["bytes"] += len(payload)
+            stats["peak_packets"] = max(stats["peak_packets"], len(self.__queue))
+            stats["peak_bytes"] = max(stats["peak_bytes"], stats["bytes"])
+        return False
+
     def send_message(
         self, message, source="Python Client", type=serialize.Message.INFO_MESSAGE
     ):
@@ -268,7 +565,7 @@ class RTDE(object):
         elif cmd == Command.RTDE_CONTROL_PACKAGE_PAUSE:
             return self.__unpack_pause_package(payload)
         elif cmd == Command.RTDE_DATA_PACKAGE:
-            return self.__unpack_data_package(payload, self.__output_config)
+            return self.__unpack_data_package(payload)
         else:
             _log.error("Unknown package command: " + str(cmd))
 
@@ -283,20 +580,37 @@ class RTDE(object):
         size = struct.calcsize(fmt) + len(payload)
         buf = struct.pack(fmt, size, command) + payload
 
+        return self.__send_packages(buf)
+
+    def __send_packages(self, *buffers):
         if self.__sock is None:
             _log.error("Unable to send: not connected to Robot")
             return False
-
-        _, writable, _ = select.select([], [self.__sock], [], DEFAULT_TIMEOUT)
-        if len(writable):
-            self.__sock.sendall(buf)
-            return True
-        else:
+        self.__stats["send_calls"] += 1
+        try:
+            if len(buffers) == 1:
+                self.__sock.sendall(buffers[0])
+            elif hasattr(self.__sock, "sendmsg"):
+                sent = self.__sock.sendmsg(buffers)
+                total = sum(len(b) for b in buffers)
+                if sent < total:
+                    self.__sock.sendall(b"".join(buffers)[sent:])
+            else:
+                self.__sock.sendall(b"".join(buffers))
+        except (socket.timeout, BlockingIOError):
             self.__trigger_disconnected()
             return False
+        return True
+
+    def has_data(self, timeout=0):
+        if self.__queue:
+            return True
+        return self.__readable(timeout)
 
-    def has_data(self):
-        timeout = 0
+    def __readable(self, timeout):
+        self.__stats["poll_calls"] += 1
+        if self.__poller is not None:
+            return len(self.__poller.poll(timeout * 1000)) != 0
         readable, _, _ = select.select([self.__sock], [], [], timeout)
         return len(readable) != 0
 
@@ -307,78 +621,190 @@ class RTDE(object):
             except RTDETimeoutException:
                 return None
 
-            # unpack_from requires a buffer of at least 3 bytes
-            while len(self.__buf) >= 3:
-                # Attempts to extract a packet
-                packet_header = serialize.ControlHeader.unpack(self.__buf)
-
-                if len(self.__buf) >= packet_header.size:
-                    packet, self.__buf = (
-                        self.__buf[3 : packet_header.size],
-                        self.__buf[packet_header.size :],
-                    )
-                    data = self.__on_packet(packet_header.command, packet)
-                    if len(self.__buf) >= 3 and command == Command.RTDE_DATA_PACKAGE:
-                        next_packet_header = serialize.ControlHeader.unpack(self.__buf)
-                        if next_packet_header.command == command:
-                            _log.debug("skipping package(1)")
-                            self.__skipped_package_count += 1
-                            continue
-                    if packet_header.command == command:
-                        if binary:
-                            return packet[1:]
-
-                        return data
-                    else:
-                        _log.debug("skipping package(2)")
-                else:
-                    break
-        raise RTDEException(" _recv() Connection lost ")
-
-    def __recv_to_buffer(self, timeout):
-        readable, _, xlist = select.select([self.__sock], [], [self.__sock], timeout)
-        if len(readable):
-            more = self.__sock.recv(4096)
-            # When the controller stops while the script is running
-            if len(more) == 0:
-                _log.error(
-                    "received 0 bytes from Controller, probable cause: Controller has stopped"
-                )
-                self.__trigger_disconnected()
-                raise RTDEException("received 0 bytes from Controller")
-
-            self.__buf = self.__buf + more
-            return True
-
-        if (
-            len(xlist) or len(readable) == 0
-        ) and timeout != 0:  # Effectively a timeout of timeout seconds
-            _log.warning("no data received in last %d seconds ", timeout)
-            raise RTDETimeoutException("no data received within timeout")
-
-        return False
-
-    def __recv_from_buffer(self, command, binary=False):
-        # unpack_from requires a buffer of at least 3 bytes
-        while len(self.__buf) >= 3:
-            # Attempts to extract a packet
-            packet_header = serialize.ControlHeader.unpack(self.__buf)
-
-            if len(self.__buf) >= packet_header.size:
-                packet, self.__buf = (
-                    self.__buf[3 : packet_header.size],
-                    self.__buf[packet_header.size :],
-                )
-                data = self.__on_packet(packet_header.command, packet)
-                if packet_header.command == command:
+            packet = self.__next_packet()
+            while packet is not None:
+                packet_command, payload = packet
+                data = self.__on_packet(packet_command, payload)
+                if packet_command == command:
                     if binary:
-                        return packet[1:]
+                        return payload[1:]
 
                     return data
                 else:
                     _log.debug("skipping package(2)")
+                packet = self.__next_packet()
+        raise RTDEException(" _recv() Connection lost ")
+
+    def __recv_latest(self, binary=False, lazy=False):
+        # packages queued by receive_buffered, then those left behind at a
+        # recipe boundary are returned first
+        if self.__queue:
+            latest = self.__pop_latest_queued()
+            if self.__queue:
+                complete = False
             else:
+                latest, complete = self.__scan_latest(latest)
+        else:
+            latest, complete = self.__scan_latest(None)
+        # newer packages may wait in the socket, read them without blocking
+        latest, complete = self.__drain_latest(latest, complete)
+        while latest is None and self.is_connected():
+            try:
+                size = self.__recv_to_buffer(DEFAULT_TIMEOUT)
+            except RTDETimeoutException:
                 return None
+            latest, complete = self.__scan_latest(latest)
+            # A full read means more may be waiting, catch up before decoding
+            while complete and size >= self.recv_size:
+                size = self.__recv_to_buffer(0)
+                latest, complete = self.__scan_latest(latest)
+        if latest is None:
+            raise RTDEException(" _recv() Connection lost ")
+
+        self.__last_recipe_id = latest[0]
+        if binary:
+            return bytes(latest[1:])
+        return self.__unpack_data_package(latest, lazy)
+
+    def __drain_latest(self, latest, complete):
+        """Scan what the socket holds until a read would block. A lost
+        connection is raised once no package is left to return."""
+        try:
+            while complete and self.__recv_to_buffer(0):
+                latest, complete = self.__scan_latest(latest)
+        except RTDEException:
+            if latest is None:
+                raise
+        return latest, complete
+
+    def __pop_latest_queued(self):
+        """Pop the newest of the leading queued packages of one recipe"""
+        latest = self.__queue.popleft()
+        self.__last_receive_ns = self.__queue_ns.popleft()
+        self.__queue_stats["bytes"] -= len(latest)
+        while self.__queue and self.__queue[0][0] == latest[0]:
+            self.__skipped_package_count += 1
+            latest = self.__queue.popleft()
+            self.__last_receive_ns = self.__queue_ns.popleft()
+            self.__queue_stats["bytes"] -= len(latest)
+        return latest
+
+    def __scan_latest(self, latest):
+        """Skip buffered data packages by their header, keeping only the payload
+        of the newest one. Other packages are handled in order.
+        Returns (latest, complete), complete is False when a data package of
+        another recipe was reached, which is left in the buffer.
+        """
+        buf, pos = self.__buf, self.__pos
+        end = len(buf)
+        latest_recipe_id = latest[0] if latest is not None else None
+        latest_pos = latest_size = None
+        complete = True
+        # unpack_from requires a buffer of at least 3 bytes
+        while end - pos >= 3:
+            size, command = PACKAGE_HEADER.unpack_from(buf, pos)
+            if end - pos < size:
+                break
+            if command == Command.RTDE_DATA_PACKAGE:
+                recipe_id = buf[pos + 3]
+                if latest_recipe_id is not None:
+                    if recipe_id != latest_recipe_id:
+                        complete = False
+                        break
+                    _log.debug("skipping package(1)")
+                    self.__skipped_package_count += 1
+                latest_recipe_id = recipe_id
+                latest_pos, latest_size = pos, size
+                self.__stats["data_packages"] += 1
+            else:
+                self.__on_packet(command, buf[pos + 3 : pos + size])
+            pos += size
+        self.__pos = pos
+        if latest_pos is not None:
+            latest = self.__view[latest_pos + 3 : latest_pos + latest_size]
+            self.__last_receive_ns = self.__read_ns
+        return latest, complete
+
+    def __next_packet(self):
+        """Extract the next complete packet from the buffer as (command, payload)"""
+        buf, pos = self.__buf, self.__pos
+        # unpack_from requires a buffer of at least 3 bytes
+        if len(buf) - pos < 3:
+            return None
+        size, command = PACKAGE_HEADER.unpack_from(buf, pos)
+        if len(buf) - pos < size:
+            return None
+        self.__pos = pos + size
+        if command == Command.RTDE_DATA_PACKAGE:
+            # data packages are returned as a view into the buffer, not a copy
+            self.__stats["data_packages"] += 1
+            return command, self.__view[pos + 3 : pos + size]
+        return command, buf[pos + 3 : pos + size]
+
+    def __read(self, timeout):
+        """One read from the socket, raises BlockingIOError or socket.timeout
+        when no data arrives within timeout"""
+        stats = self.__stats
+        if timeout == 0 or (self.busy_poll and KERNEL_TIMEOUTS):
+            deadline = time.monotonic() + timeout
+            while True:
+                stats["recv_calls"] += 1
+                if KERNEL_TIMEOUTS:
+                    try:
+                        return self.__sock.recv(self.recv_size, socket.MSG_DONTWAIT)
+                    except BlockingIOError:
+                        if time.monotonic() >= deadline:
+                            raise
+                        continue
+                stats["poll_calls"] += 1
+                readable, _, _ = select.select([self.__sock], [], [], 0)
+                if readable:
+                    return self.__sock.recv(self.recv_size)
+                raise BlockingIOError()
+        stats["recv_calls"] += 1
+        if not KERNEL_TIMEOUTS:
+            stats["poll_calls"] += 1  # done by the socket module
+        return self.__sock.recv(self.recv_size)
+
+    def __recv_to_buffer(self, timeout):
+        try:
+            more = self.__read(timeout)
+        except (socket.timeout, BlockingIOError):
+            if timeout != 0:  # Effectively a timeout of timeout seconds
+                _log.warning("no data received in last %d seconds ", timeout)
+                raise RTDETimeoutException("no data received within timeout")
+            return False
+        self.__read_ns = time.monotonic_ns()
+
+        # When the controller stops while the script is running
+        if len(more) == 0:
+            _log.error(
+                "received 0 bytes from Controller, probable cause: Controller has stopped"
+            )
+            self.__trigger_disconnected()
+            raise RTDEException("received 0 bytes from Controller")
+
+        self.__stats["bytes_received"] += len(more)
+        self.__buf = self.__buf[self.__pos :] + more
+        self.__view = memoryview(self.__buf)
+        self.__pos = 0
+        return len(more)
+
+    def __recv_from_buffer(self, command, binary=False, lazy=False):
+        packet = self.__next_packet()
+        while packet is not None:
+            packet_command, payload = packet
+            if packet_command == command:
+                self.__last_recipe_id = payload[0]
+                if binary:
+                    return bytes(payload[1:])
+
+                return self.__unpack_data_package(payload, lazy)
+            else:
+                self.__on_packet(packet_command, payload)
+                _log.debug("skipping package(2)")
+            packet = self.__next_packet()
+        return None
 
     def __trigger_disconnected(self):
         _log.info("RTDE disconnected")
@@ -445,10 +871,13 @@ class RTDE(object):
         result = serialize.ReturnValue.unpack(payload)
         return result.success
 
-    def __unpack_data_package(self, payload, output_config):
+    def __unpack_data_package(self, payload, lazy=False):
+        output_config = self.__output_config.get(payload[0]) if payload else None
         if output_config is None:
             _log.error("RTDE_DATA_PACKAGE: Missing output configuration")
             return None
+        if lazy:
+            return output_config.view(payload)
         output = output_config.unpack(payload)
         return output
 
@@ -464,3 +893,61 @@ class RTDE(object):
     def skipped_package_count(self):
         """The skipped package count, resets on connect"""
         return self.__skipped_package_count
+
+    @staticmethod
+    def __new_stats():
+        return dict.fromkeys(
+            (
+                "recv_calls",
+                "send_calls",
+                "poll_calls",
+                "bytes_received",
+                "data_packages",
+            ),
+            0,
+        )
+
+    @property
+    def socket_stats(self):
+        """Socket call counters since connect, resets on connect"""
+        stats = dict(self.__stats)
+        calls = stats["recv_calls"] + stats["send_calls"] + stats["poll_calls"]
+        stats["syscalls_per_package"] = (
+            calls / float(stats["data_packages"]) if stats["data_packages"] else None
+        )
+        return stats
+
+    @staticmethod
+    def __new_queue_stats():
+        return dict.fromkeys(
+            ("bytes", "peak_packets", "peak_bytes", "overflows", "dropped"), 0
+        )
+
+    @property
+    def queue_stats(self):
+        """Occupancy and overflow counters of the receive_buffered queue,
+        resets on connect"""
+        stats = dict(self.__queue_stats)
+        stats["packets"] = len(self.__queue)
+        return stats
+
+    @property
+    def controller_version(self):
+        """The version returned by the last get_controller_version call"""
+        return self.__controller_version
+
+    @property
+    def output_configs(self):
+        """The output recipes in the order they were set up"""
+        return list(self.__output_config.values())
+
+    @property
+    def last_recipe_id(self):
+        """The recipe id of the last data package returned by receive"""
+        return self.__last_recipe_id
+
+    @property
+    def last_receive_ns(self):
+        """time.monotonic_ns() taken at the socket read that delivered the
+        last data package returned by receive"""
+        return self.__last_receive_ns
@@ -21,23 +21,26 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-import xml.etree.ElementTree as ET
-
 
 class Recipe(object):
-    __slots__ = ["key", "names", "types"]
+    __slots__ = ["key", "names", "types", "frequency", "policies"]
 
     @staticmethod
     def parse(recipe_node):
         rmd = Recipe()
         rmd.key = recipe_node.get("key")
+        frequency = recipe_node.get("frequency")
+        rmd.frequency = float(frequency) if frequency is not None else None
         rmd.names = [f.get("name") for f in recipe_node.findall("field")]
         rmd.types = [f.get("type") for f in recipe_node.findall("field")]
+        rmd.policies = [f.get("policy") for f in recipe_node.findall("field")]
         return rmd
 
 
 class ConfigFile(object):
     def __init__(self, filename):
+        import xml.etree.ElementTree as ET
+
         self.__filename = filename
         tree = ET.parse(self.__filename)
         root = tree.getroot()
@@ -49,3 +52,25 @@ class ConfigFile(object):
     def get_recipe(self, key):
         r = self.__dictionary[key]
         return r.names, r.types
+
+    def get_recipe_keys(self, prefix=""):
+        """Returns the recipe keys equal to prefix or starting with prefix
+        and an underscore ("out", "out_slow"), in file order. All keys
+        without a prefix."""
+        if not prefix:
+            return list(self.__dictionary)
+        return [
+            key
+            for key in self.__dictionary
+            if key == prefix or key.startswith(prefix + "_")
+        ]
+
+    def get_recipe_frequency(self, key, default=None):
+        """Returns the frequency attribute of a recipe, or default if unset."""
+        frequency = self.__dictionary[key].frequency
+        return default if frequency is None else frequency
+
+    def get_recipe_policies(self, key):
+        """Returns the policy attribute of each field of a recipe, None where
+        unset. See rtde.decimation."""
+        return self.__dictionary[key].policies
@@ -31,9 +31,9 @@ class ControlHeader(object):
     ]
 
     @staticmethod
-    def unpack(buf):
+    def unpack(buf, offset=0):
         rmd = ControlHeader()
-        (rmd.size, rmd.command) = struct.unpack_from(">HB", buf)
+        (rmd.size, rmd.command) = struct.unpack_from(">HB", buf, offset)
         return rmd
 
 
@@ -95,6 +95,21 @@ class Message(object):
         return rmd
 
 
+# struct format of each field type, recipe payloads are big endian
+TYPE_FORMATS = {
+    "INT32": "i",
+    "UINT32": "I",
+    "VECTOR6D": "d" * 6,
+    "VECTOR3D": "d" * 3,
+    "VECTOR6INT32": "i" * 6,
+    "VECTOR6UINT32": "I" * 6,
+    "DOUBLE": "d",
+    "UINT64": "Q",
+    "UINT8": "B",
+    "BOOL": "?",
+}
+
+
 def get_item_size(data_type):
     if data_type.startswith("VECTOR6"):
         return 6
@@ -103,6 +118,27 @@ def get_item_size(data_type):
     return 1
 
 
+def flat_columns(names, types):
+    """(column, scalar struct format) pairs, vector fields split into name_0,
+    name_1, ... as CSVWriter writes its header. A recipe may list a field
+    twice, the repeated columns get a __2, __3, ... suffix."""
+    columns = []
+    seen = {}
+    for name, data_type in zip(names, types):
+        formats = TYPE_FORMATS[data_type]
+        flat = (
+            [name]
+            if len(formats) == 1
+            else [name + "_" + str(j) for j in range(len(formats))]
+        )
+        for column, fmt in zip(flat, formats):
+            seen[column] = seen.get(column, 0) + 1
+            if seen[column] > 1:
+                column += "__" + str(seen[column])
+            columns.append((column, fmt))
+    return columns
+
+
 def unpack_field(data, offset, data_type):
     size = get_item_size(data_type)
     if data_type == "VECTOR6D" or data_type == "VECTOR3D":
@@ -162,7 +198,7 @@ class DataObject(object):
 
 
 class DataConfig(object):
-    __slots__ = ["id", "names", "types", "fmt"]
+    __slots__ = ["id", "names", "types", "fmt", "fields"]
 
     @staticmethod
     def unpack_recipe(buf):
@@ -170,27 +206,10 @@ class DataConfig(object):
         rmd.id = struct.unpack_from(">B", buf)[0]
         rmd.types = buf.decode("utf-8")[1:].split(",")
         rmd.fmt = ">B"
+        rmd.fields = None
         for i in rmd.types:
-            if i == "INT32":
-                rmd.fmt += "i"
-            elif i == "UINT32":
-                rmd.fmt += "I"
-            elif i == "VECTOR6D":
-                rmd.fmt += "d" * 6
-            elif i == "VECTOR3D":
-                rmd.fmt += "d" * 3
-            elif i == "VECTOR6INT32":
-                rmd.fmt += "i" * 6
-            elif i == "VECTOR6UINT32":
-                rmd.fmt += "I" * 6
-            elif i == "DOUBLE":
-                rmd.fmt += "d"
-            elif i == "UINT64":
-                rmd.fmt += "Q"
-            elif i == "UINT8":
-                rmd.fmt += "B"
-            elif i == "BOOL":
-                rmd.fmt += "?"
+            if i in TYPE_FORMATS:
+                rmd.fmt += TYPE_FORMATS[i]
             elif i == "IN_USE":
                 raise ValueError("An input parameter is already in use.")
             else:
@@ -204,3 +223,100 @@ class DataConfig(object):
     def unpack(self, data):
         li = struct.unpack_from(self.fmt, data)
         return DataObject.unpack(li, self.names, self.types)
+
+    def get_fields(self):
+        """Returns a dict of field name to (offset, struct, is_vector) in the
+        payload, computed on first use."""
+        if self.fields is None:
+            fields = {}
+            offset = 1  # recipe id
+            for name, data_type in zip(self.names, self.types):
+                unpacker = struct.Struct(">" + TYPE_FORMATS[data_type])
+                fields[name] = (offset, unpacker, data_type.startswith("VECTOR"))
+                offset += unpacker.size
+            self.fields = fields
+        return self.fields
+
+    def view(self, data, cache=True):
+        return DataView(data, self.get_fields(), cache)
+
+
+class DataView(object):
+    """Read-only view of a data package payload, attribute compatible with
+    DataObject. A field is decoded only when it is accessed and, with cache
+    enabled, stored so later reads are plain attribute lookups.
+    """
+
+    def __init__(self, data, fields, cache=True):
+        self._data = data
+        self._fields = fields
+        self._cache = cache
+        self.recipe_id = data[0]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            offset, unpacker, vector = self._fields[name]
+        except KeyError:
+            raise AttributeError(name)
+        values = unpacker.unpack_from(self._data, offset)
+        value = list(values) if vector else values[0]
+        if self._cache:
+            self.__dict__[name] = value
+        return value
+
+
+class InputPacker(object):
+    """Packs data packages of one input recipe into a reusable buffer.
+
+    The package header and recipe id are written once, every call to pack
+    only writes the values in place, so nothing is allocated per package.
+    """
+
+    __slots__ = ["recipe_id", "names", "vectors", "struct", "casts", "buffer"]
+
+    def __init__(self, config, command):
+        self.recipe_id = config.id
+        self.names = config.names
+        self.vectors = [t.startswith("VECTOR") for t in config.types]
+        # config.fmt is ">B..." where B is the recipe id
+        self.struct = struct.Struct(">" + config.fmt[2:])
+        # the value type of each format, NumPy arrays convert to one type
+        formats = config.fmt[2:]
+        self.casts = None
+        if formats.strip("d"):
+            self.casts = [
+                float if f == "d" else bool if f == "?" else int for f in formats
+            ]
+        size = 4 + self.struct.size
+        self.buffer = bytearray(size)
+        struct.pack_into(">HBB", self.buffer, 0, size, command, config.id)
+
+    def pack(self, values):
+        """Packs a flat sequence (or NumPy array) of values, vectors expanded.
+        The values of an array are converted to the types of their fields."""
+        if hasattr(values, "tolist"):
+            values = values.tolist()
+            if self.casts is not None:
+                if len(values) != len(self.casts):
+                    raise struct.error(
+                        "expected {} values, got {}".format(len(self.casts), len(values))
+                    )
+                values = [cast(v) for cast, v in zip(self.casts, values)]
+        self.struct.pack_into(self.buffer, 4, *values)
+        return self.buffer
+
+    def pack_object(self, state):
+        """Packs a DataObject created by RTDE.send_input_setup."""
+        l = []
+        for name, vector in zip(self.names, self.vectors):
+            value = state.__dict__[name]
+            if value is None:
+                raise ValueError("Uninitialized parameter: " + name)
+            if vector:
+                l.extend(value)
+            else:
+                l.append(value)
+        self.struct.pack_into(self.buffer, 4, *l)
+        return self.buffer
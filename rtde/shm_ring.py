@@ -0,0 +1,232 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Shared-memory ring of data packages for fanning one RTDE stream out to
+several local processes.
+
+The segment starts with a header (magic, record size, slot count, write
+sequence, recipe) followed by fixed-size slots. Each slot holds a sequence
+number followed by the data package payload, recipe id included, so a
+serialize.DataView can be put directly on top of it. The writer marks a slot
+odd while it copies a payload in and stores the even sequence when done;
+readers compare the slot sequence before and after reading (seqlock), which
+detects records overwritten by a writer that lapped them.
+"""
+
+import struct
+import time
+
+from multiprocessing import resource_tracker, shared_memory
+
+from rtde import serialize
+from rtde.rtde import RTDEException
+
+MAGIC = b"RTDESHM1"
+# magic, record size, slots, recipe length, write sequence
+HEADER = struct.Struct("<8sIII4xQ")
+WRITE_SEQ_OFFSET = 24
+SEQ = struct.Struct("<Q")
+
+
+class RingOverrunException(RTDEException):
+    def __init__(self, msg):
+        super(RingOverrunException, self).__init__(msg)
+
+
+def _align(size):
+    return (size + 7) & ~7
+
+
+def _recipe_config(recipe_id, names, types):
+    config = serialize.DataConfig.unpack_recipe(
+        struct.pack(">B", recipe_id) + ",".join(types).encode("utf-8")
+    )
+    config.names = names
+    return config
+
+
+def _attach(name):
+    """Attaches to a segment without registering it with the resource
+    tracker, which would unlink it when this process exits."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # track was added in Python 3.13
+        pass
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class _Layout(object):
+    def __init__(self, record_size, slots, recipe_len):
+        self.record_size = record_size
+        self.slots = slots
+        self.recipe_offset = HEADER.size
+        self.slots_offset = _align(HEADER.size + recipe_len)
+        self.slot_size = _align(SEQ.size + record_size)
+        self.size = self.slots_offset + self.slot_size * slots
+
+    def slot(self, seq):
+        return self.slots_offset + (seq % self.slots) * self.slot_size
+
+
+class ShmRingWriter(object):
+    """Creates the ring and appends data package payloads to it."""
+
+    def __init__(self, name, names, types, slots=4096, recipe_id=1):
+        self.config = _recipe_config(recipe_id, names, types)
+        recipe = (",".join(names) + ";" + ",".join(types)).encode("utf-8")
+        record_size = struct.calcsize(self.config.fmt)
+        self.__layout = _Layout(record_size, slots, len(recipe))
+        self.__shm = shared_memory.SharedMemory(
+            name=name, create=True, size=self.__layout.size
+        )
+        self.__buf = self.__shm.buf
+        HEADER.pack_into(self.__buf, 0, MAGIC, record_size, slots, len(recipe), 0)
+        self.__buf[HEADER.size : HEADER.size + len(recipe)] = recipe
+        for i in range(slots):
+            offset = self.__layout.slot(i)
+            # no record yet, a sequence number that is never valid
+            SEQ.pack_into(self.__buf, offset, 1)
+            self.__buf[offset + SEQ.size] = recipe_id
+        self.__seq = 0
+        self.name = self.__shm.name
+
+    def write(self, payload):
+        """Appends one payload as returned by RTDE.receive(binary=True),
+        i.e. without the recipe id. Returns its sequence number."""
+        seq = self.__seq
+        offset = self.__layout.slot(seq)
+        start = offset + SEQ.size + 1
+        SEQ.pack_into(self.__buf, offset, (seq << 1) | 1)
+        self.__buf[start : start + len(payload)] = payload
+        SEQ.pack_into(self.__buf, offset, seq << 1)
+        self.__seq = seq + 1
+        SEQ.pack_into(self.__buf, WRITE_SEQ_OFFSET, self.__seq)
+        return seq
+
+    @property
+    def write_seq(self):
+        """Sequence number of the next record"""
+        return self.__seq
+
+    def close(self, unlink=True):
+        self.__buf = None
+        self.__shm.close()
+        if unlink:
+            self.__shm.unlink()
+
+
+class ShmRingReader(object):
+    """Attaches to a ring created by ShmRingWriter.
+
+    view() returns a DataView on the shared memory without copying, check
+    it with valid() after reading fields; read() copies the record and is
+    always consistent.
+    """
+
+    def __init__(self, name):
+        self.__shm = _attach(name)
+        self.__buf = self.__shm.buf
+        magic, record_size, slots, recipe_len, _ = HEADER.unpack_from(self.__buf)
+        if magic != MAGIC:
+            raise RTDEException("Not an RTDE shared memory ring: " + name)
+        self.__layout = _Layout(record_size, slots, recipe_len)
+        recipe = bytes(self.__buf[HEADER.size : HEADER.size + recipe_len])
+        names, types = recipe.decode("utf-8").split(";")
+        self.names = names.split(",")
+        self.types = types.split(",")
+        recipe_id = self.__buf[self.__layout.slot(0) + SEQ.size]
+        self.config = _recipe_config(recipe_id, self.names, self.types)
+        self.__fields = self.config.get_fields()
+
+    @property
+    def write_seq(self):
+        """Sequence number of the next record the writer will append"""
+        return SEQ.unpack_from(self.__buf, WRITE_SEQ_OFFSET)[0]
+
+    def oldest(self):
+        """Oldest sequence number that has not been overwritten yet"""
+        return max(0, self.write_seq - self.__layout.slots + 1)
+
+    def __record(self, seq):
+        offset = self.__layout.slot(seq) + SEQ.size
+        return self.__buf[offset : offset + self.__layout.record_size]
+
+    def __check(self, seq):
+        if seq >= self.write_seq:
+            return False
+        slot_seq = SEQ.unpack_from(self.__buf, self.__layout.slot(seq))[0]
+        if slot_seq != seq << 1:
+            raise RingOverrunException("record %d was overwritten" % seq)
+        return True
+
+    def view(self, seq, cache=False):
+        """Zero-copy DataView of a record, None if it is not written yet.
+        Call valid(seq) after reading its fields."""
+        if not self.__check(seq):
+            return None
+        return serialize.DataView(self.__record(seq), self.__fields, cache)
+
+    def valid(self, seq):
+        """True if the record has not been overwritten since view(seq)"""
+        return SEQ.unpack_from(self.__buf, self.__layout.slot(seq))[0] == seq << 1
+
+    def read(self, seq):
+        """Copied DataView of a record, None if it is not written yet."""
+        if not self.__check(seq):
+            return None
+        data = bytes(self.__record(seq))
+        if not self.valid(seq):
+            raise RingOverrunException("record %d was overwritten" % seq)
+        return serialize.DataView(data, self.__fields)
+
+    def latest(self):
+        """Returns (seq, DataView) of the newest record, or (None, None)."""
+        while True:
+            seq = self.write_seq - 1
+            if seq < 0:
+                return None, None
+            try:
+                return seq, self.read(seq)
+            except RingOverrunException:
+                continue  # lapped while copying, take the newer one
+
+    def wait(self, seq, timeout=None, interval=0.0):
+        """Waits until record seq is written, spinning when interval is 0.
+        Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.write_seq <= seq:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            if interval:
+                time.sleep(interval)
+        return True
+
+    def close(self):
+        """Detaches, views returned by view() must be released first."""
+        self.__buf = None
+        self.__shm.close()
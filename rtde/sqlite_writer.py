@@ -0,0 +1,199 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import itertools
+import os
+import sqlite3
+import struct
+import threading
+
+from rtde import serialize
+from rtde.write_behind import FlushTimer
+
+# columns indexed when the table has them
+INDEXED_COLUMNS = ("timestamp", "robot_mode", "safety_status", "runtime_state")
+DEFAULT_BATCH_ROWS = 10000
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SQLiteWriter(object):
+    """Writes samples to a table of an SQLite database.
+
+    writerow() takes data objects like CSVWriter or binary payloads like
+    CSVBinaryWriter, writerows() rows of column values (numbers or their
+    text, the column types convert). Rows are inserted with executemany,
+    batch_rows to a transaction, and with flush_interval at most that many
+    seconds after they were written, also when no further rows come, so
+    readers see them while recording. The database is in WAL mode, readers
+    do not block the writer. Indexes on the INDEXED_COLUMNS present are
+    created with the table, or on close with defer_indexes, which is faster
+    for a bulk export. With replace an existing database is removed first,
+    otherwise rows are appended to the table if it exists.
+    """
+
+    def __init__(
+        self,
+        filename,
+        names,
+        types,
+        table="samples",
+        batch_rows=DEFAULT_BATCH_ROWS,
+        flush_interval=None,
+        defer_indexes=False,
+        replace=False,
+    ):
+        if len(names) != len(types):
+            raise ValueError("List sizes are not identical.")
+        self.name = filename
+        self.table = table
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.defer_indexes = defer_indexes
+        self.rows = 0
+        self.__created = False
+        self.__names = names
+        self.__types = types
+        # columns named as in CSV files, typed REAL or INTEGER
+        self.__columns = [
+            (column, "REAL" if fmt == "d" else "INTEGER")
+            for column, fmt in serialize.flat_columns(names, types)
+        ]
+        self.__payload = struct.Struct(
+            ">" + "".join(serialize.TYPE_FORMATS[t] for t in types)
+        )
+        self.__pending = []
+        self.__insert = "INSERT INTO {} VALUES ({})".format(
+            _quote(table), ",".join("?" * len(self.__columns))
+        )
+        if replace:
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(filename + suffix)
+                except FileNotFoundError:
+                    pass
+        # the flush timer commits from its thread, the lock serializes them
+        self.__db = sqlite3.connect(filename, check_same_thread=False)
+        self.__db.execute("PRAGMA journal_mode=WAL")
+        self.__db.execute("PRAGMA synchronous=NORMAL")
+        self.__lock = threading.Lock()
+        self.__timer = None
+        if flush_interval is not None:
+            self.__timer = FlushTimer(
+                self.__lock, self.__flush, flush_interval, filename
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def writeheader(self):
+        """Creates the table, and its indexes unless deferred"""
+        self.__db.execute(
+            "CREATE TABLE IF NOT EXISTS {} ({})".format(
+                _quote(self.table),
+                ", ".join(_quote(c) + " " + t for c, t in self.__columns),
+            )
+        )
+        self.__db.commit()
+        self.__created = True
+        if not self.defer_indexes:
+            self.create_indexes()
+
+    def create_indexes(self):
+        columns = [c for c, _ in self.__columns]
+        for column in INDEXED_COLUMNS:
+            if column in columns:
+                self.__db.execute(
+                    "CREATE INDEX IF NOT EXISTS {} ON {} ({})".format(
+                        _quote(self.table + "_" + column),
+                        _quote(self.table),
+                        _quote(column),
+                    )
+                )
+        self.__db.commit()
+
+    def writerow(self, data_object):
+        if isinstance(data_object, (bytes, bytearray, memoryview)):
+            row = self.__payload.unpack(data_object)
+        else:
+            row = []
+            for name, data_type in zip(self.__names, self.__types):
+                value = getattr(data_object, name)
+                if serialize.get_item_size(data_type) > 1:
+                    row.extend(value)
+                else:
+                    row.append(value)
+        with self.__lock:
+            if self.__timer is not None:
+                if self.__timer.error is not None:
+                    raise self.__timer.error
+                self.__timer.start()
+            self.__pending.append(row)
+            if len(self.__pending) >= self.batch_rows:
+                self.__flush()
+
+    def writerows(self, rows):
+        """Inserts rows of column values in batches"""
+        self.flush()
+        rows = iter(rows)
+        while True:
+            batch = list(itertools.islice(rows, self.batch_rows))
+            if not batch:
+                return
+            with self.__lock, self.__db:
+                self.__db.executemany(self.__insert, batch)
+            self.rows += len(batch)
+
+    def flush(self):
+        with self.__lock:
+            self.__flush()
+
+    def __flush(self):
+        """Inserts the pending rows, called with the lock held"""
+        if self.__timer is not None:
+            self.__timer.stop()
+        if not self.__pending:
+            return
+        with self.__db:  # one transaction
+            self.__db.executemany(self.__insert, self.__pending)
+        self.rows += len(self.__pending)
+        self.__pending = []
+
+    def close(self):
+        if self.__db is None:
+            return
+        try:
+            self.flush()
+            if self.defer_indexes and self.__created:
+                self.create_indexes()
+        finally:
+            if self.__timer is not None:
+                self.__timer.close()
+                self.__timer = None
+            self.__db.close()
+            self.__db = None
@@ -0,0 +1,161 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import numpy as np
+
+from rtde import serialize
+
+# log2 histogram buckets: bucket e counts 2**(e-1) <= |x| < 2**e, values
+# below 2**MIN_EXP (and zero) land in MIN_EXP, values above in MAX_EXP
+MIN_EXP = -20
+MAX_EXP = 20
+BUCKETS = MAX_EXP - MIN_EXP + 1
+
+
+class StreamingStats(object):
+    """Running count, mean, variance, min, max and log2 histogram per column.
+
+    Samples are queued and folded in blocks of block_size with numpy, the
+    per-block results merged with the parallel form of Welford's algorithm,
+    so the per-sample cost is an append. add() takes data objects (or
+    views), add_payload() the binary payload returned by receive(binary=True),
+    which is cheaper. Vector fields are split into name_0, name_1, ...
+    columns like CSVWriter does. fields selects a subset of the recipe.
+    """
+
+    def __init__(self, names, types, fields=None, block_size=256):
+        if len(names) != len(types):
+            raise ValueError("List sizes are not identical.")
+        self.block_size = block_size
+        # fields by position, a recipe may list a name twice
+        self.__dtype = np.dtype(
+            [
+                (
+                    "f" + str(i),
+                    ">" + serialize.TYPE_FORMATS[t][0],
+                    (serialize.get_item_size(t),),
+                )
+                for i, t in enumerate(types)
+            ]
+        )
+        self.__fields = []
+        self.columns = []
+        for i, (name, t) in enumerate(zip(names, types)):
+            if fields is not None and name not in fields:
+                continue
+            if any(name == n for _, n, _ in self.__fields):
+                continue
+            size = serialize.get_item_size(t)
+            self.__fields.append(("f" + str(i), name, size > 1))
+            if size > 1:
+                self.columns.extend(name + "_" + str(j) for j in range(size))
+            else:
+                self.columns.append(name)
+        self.__rows = []
+        self.__payloads = []
+        self.reset()
+
+    def reset(self):
+        """Drops all accumulated statistics"""
+        width = len(self.columns)
+        self.count = 0
+        self.__mean = np.zeros(width)
+        self.__m2 = np.zeros(width)
+        self.__min = np.full(width, np.inf)
+        self.__max = np.full(width, -np.inf)
+        self.__hist = np.zeros((width, BUCKETS), dtype=np.int64)
+        del self.__rows[:]
+        del self.__payloads[:]
+
+    def add(self, state):
+        row = []
+        for _, name, vector in self.__fields:
+            value = getattr(state, name)
+            if vector:
+                row.extend(value)
+            else:
+                row.append(value)
+        self.__rows.append(row)
+        if len(self.__rows) >= self.block_size:
+            self.flush()
+
+    def add_payload(self, payload):
+        self.__payloads.append(payload)
+        if len(self.__payloads) >= self.block_size:
+            self.flush()
+
+    def flush(self):
+        """Folds the queued samples into the statistics"""
+        if self.__rows:
+            self.__merge(np.array(self.__rows, dtype=np.float64))
+            del self.__rows[:]
+        if self.__payloads:
+            data = np.frombuffer(b"".join(self.__payloads), dtype=self.__dtype)
+            block = np.empty((len(data), len(self.columns)))
+            column = 0
+            for key, _, _ in self.__fields:
+                values = data[key]
+                block[:, column : column + values.shape[1]] = values
+                column += values.shape[1]
+            self.__merge(block)
+            del self.__payloads[:]
+
+    def __merge(self, block):
+        n = len(block)
+        mean = block.mean(axis=0)
+        m2 = np.square(block - mean).sum(axis=0)
+        total = self.count + n
+        delta = mean - self.__mean
+        self.__mean += delta * (n / total)
+        self.__m2 += m2 + np.square(delta) * (self.count * n / total)
+        self.count = total
+        np.minimum(self.__min, block.min(axis=0), out=self.__min)
+        np.maximum(self.__max, block.max(axis=0), out=self.__max)
+
+        _, exps = np.frexp(np.abs(block))
+        exps = np.where(block == 0, MIN_EXP, exps).clip(MIN_EXP, MAX_EXP)
+        index = (exps - MIN_EXP) + np.arange(len(self.columns)) * BUCKETS
+        self.__hist += np.bincount(
+            index.ravel(), minlength=len(self.columns) * BUCKETS
+        ).reshape(-1, BUCKETS)
+
+    def summary(self):
+        """Dict of column name to its statistics, variance is the sample
+        variance. The histogram lists the non-empty buckets by exponent."""
+        self.flush()
+        variance = self.__m2 / max(self.count - 1, 1)
+        result = {}
+        for i, name in enumerate(self.columns):
+            if self.count == 0:
+                result[name] = {"count": 0}
+                continue
+            buckets = np.flatnonzero(self.__hist[i])
+            result[name] = {
+                "count": self.count,
+                "mean": float(self.__mean[i]),
+                "var": float(variance[i]),
+                "min": float(self.__min[i]),
+                "max": float(self.__max[i]),
+                "hist": {str(b + MIN_EXP): int(self.__hist[i, b]) for b in buckets},
+            }
+        return result
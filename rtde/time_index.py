@@ -0,0 +1,215 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Time range queries on recordings without parsing the whole file.
+
+For CSV recordings a sparse index of (timestamp, byte offset) every
+stride rows is kept in a sidecar file next to the recording
+(robot_data.csv.idx). It is built on first use and extended when the
+recording has grown since, e.g. while record.py is still writing it.
+The index records the inode, size and modification time of the file and
+checksums of its header and of the indexed rows, a recording that was
+rewritten under the same name is indexed again. Binary recordings have
+fixed-size rows and are searched directly.
+"""
+
+import bisect
+import csv
+import logging
+import os
+import struct
+import zlib
+
+from rtde.csv_binary_reader import CSVBinaryReader, is_binary_recording
+from rtde.csv_reader import parse_column
+from rtde.rtde import LOGNAME
+
+_log = logging.getLogger(LOGNAME)
+
+TIMESTAMP = "timestamp"
+DEFAULT_STRIDE = 1024
+INDEX_SUFFIX = ".idx"
+
+# magic, stride, rows indexed, byte offset after the last indexed row, file
+# size, inode and mtime when indexed, checksums of the header and indexed rows
+INDEX_HEADER = struct.Struct("<8sIQQQQqII")
+INDEX_MAGIC = b"RTDEIDX2"
+INDEX_ENTRY = struct.Struct("<dQ")
+# bytes at the start and the end of the indexed rows the checksum covers
+CHECKSUM_BLOCK = 4096
+
+
+def _checksum(f, start, end):
+    """Checksum of the first and last CHECKSUM_BLOCK bytes of [start, end)"""
+    f.seek(start)
+    value = zlib.crc32(f.read(min(CHECKSUM_BLOCK, end - start)))
+    if end - start > CHECKSUM_BLOCK:
+        tail = max(start + CHECKSUM_BLOCK, end - CHECKSUM_BLOCK)
+        f.seek(tail)
+        value = zlib.crc32(f.read(end - tail), value)
+    return value
+
+
+class TimeIndex(object):
+    """Sparse timestamp index of a CSV recording"""
+
+    def __init__(self, filename, delimiter=",", stride=DEFAULT_STRIDE, save=True):
+        self.filename = filename
+        self.index_filename = filename + INDEX_SUFFIX
+        self.delimiter = delimiter
+        self.stride = stride
+        self.timestamps = []
+        self.offsets = []
+        self.__rows = 0
+        self.__end = 0
+        with open(filename, "rb") as f:
+            header = f.readline()
+            self.header = header.decode("utf-8").rstrip("\r\n").split(delimiter)
+            self.data_offset = f.tell()
+            self.__header_checksum = zlib.crc32(header)
+            self.__stat = os.fstat(f.fileno())
+            if TIMESTAMP not in self.header:
+                raise ValueError("No timestamp column in " + filename)
+            self.__column = self.header.index(TIMESTAMP)
+
+            self.__load(f)
+        if self.__stat.st_size > self.__end:
+            self.__scan()
+            if save:
+                self.__save()
+
+    def __load(self, f):
+        try:
+            with open(self.index_filename, "rb") as index:
+                data = index.read()
+        except IOError:
+            return
+        if len(data) < INDEX_HEADER.size:
+            return
+        (
+            magic,
+            stride,
+            rows,
+            end,
+            size,
+            inode,
+            mtime,
+            header_checksum,
+            checksum,
+        ) = INDEX_HEADER.unpack_from(data)
+        stat = self.__stat
+        if (
+            magic != INDEX_MAGIC
+            or stride != self.stride
+            or inode != stat.st_ino
+            or header_checksum != self.__header_checksum
+            or end > stat.st_size
+            or (
+                (size, mtime) != (stat.st_size, stat.st_mtime_ns)
+                and checksum != _checksum(f, self.data_offset, end)
+            )
+        ):
+            _log.info("Rebuilding index " + self.index_filename)
+            return
+        for timestamp, offset in INDEX_ENTRY.iter_unpack(data[INDEX_HEADER.size :]):
+            self.timestamps.append(timestamp)
+            self.offsets.append(offset)
+        self.__rows = rows
+        self.__end = end
+
+    def __scan(self):
+        """Indexes the complete rows after the last indexed one"""
+        rows = self.__rows
+        with open(self.filename, "rb") as f:
+            offset = max(self.__end, self.data_offset)
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # still being written
+                if rows % self.stride == 0 and line.strip():
+                    value = line.split(self.delimiter.encode("utf-8"))[self.__column]
+                    self.timestamps.append(float(value))
+                    self.offsets.append(offset)
+                offset += len(line)
+                rows += 1
+        self.__rows = rows
+        self.__end = offset
+
+    def __save(self):
+        with open(self.filename, "rb") as f:
+            checksum = _checksum(f, self.data_offset, self.__end)
+        stat = self.__stat
+        tmp = self.index_filename + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(
+                INDEX_HEADER.pack(
+                    INDEX_MAGIC,
+                    self.stride,
+                    self.__rows,
+                    self.__end,
+                    stat.st_size,
+                    stat.st_ino,
+                    stat.st_mtime_ns,
+                    self.__header_checksum,
+                    checksum,
+                )
+            )
+            for entry in zip(self.timestamps, self.offsets):
+                f.write(INDEX_ENTRY.pack(*entry))
+        os.replace(tmp, self.index_filename)
+
+    def span(self, start, end):
+        """Byte range holding every row with start <= timestamp <= end"""
+        lo = max(bisect.bisect_left(self.timestamps, start) - 1, 0)
+        hi = bisect.bisect_right(self.timestamps, end)
+        begin = self.offsets[lo] if self.offsets else self.data_offset
+        stop = self.offsets[hi] if hi < len(self.offsets) else self.__end
+        return begin, stop
+
+
+def read_range(filename, start, end, delimiter=",", dense=False):
+    """Columns of the rows with start <= timestamp <= end as a dict of column
+    name to numpy array, reading only that part of the recording. Empty
+    cells are NaN or with dense the last value before them in the range,
+    see csv_reader.parse_column."""
+    import numpy as np
+
+    if is_binary_recording(filename):
+        with open(filename, "rb") as f:
+            reader = CSVBinaryReader(f)
+            first = reader.find_row(start)
+            last = reader.find_row(np.nextafter(end, np.inf))
+            return reader.read_columns(first, last - first)
+
+    index = TimeIndex(filename, delimiter)
+    begin, stop = index.span(start, end)
+    with open(filename, "rb") as f:
+        f.seek(begin)
+        lines = f.read(stop - begin).decode("utf-8").splitlines()
+    rows = [row for row in csv.reader(lines, delimiter=delimiter) if row]
+    column = index.header.index(TIMESTAMP)
+    rows = [row for row in rows if start <= float(row[column]) <= end]
+    columns = list(zip(*rows)) or [()] * len(index.header)
+    return {
+        name: parse_column(values, dense) for name, values in zip(index.header, columns)
+    }
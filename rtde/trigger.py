@@ -0,0 +1,238 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import ast
+import collections
+import logging
+import math
+
+from rtde.rtde import LOGNAME
+
+_log = logging.getLogger(LOGNAME)
+
+
+def norm(vector):
+    """Euclidean length, e.g. norm(actual_TCP_force[:3])"""
+    return math.sqrt(sum(v * v for v in vector))
+
+
+def bit(value, index):
+    """State of one bit of an integer field such as safety_status_bits"""
+    return (int(value) >> index) & 1
+
+
+FUNCTIONS = {
+    "abs": abs,
+    "all": all,
+    "any": any,
+    "bit": bit,
+    "len": len,
+    "max": max,
+    "min": min,
+    "norm": norm,
+    "round": round,
+    "sum": sum,
+}
+
+ALLOWED_NODES = (
+    ast.Expression,
+    ast.BoolOp,
+    ast.And,
+    ast.Or,
+    ast.UnaryOp,
+    ast.Not,
+    ast.USub,
+    ast.UAdd,
+    ast.BinOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+    ast.Pow,
+    ast.BitAnd,
+    ast.BitOr,
+    ast.BitXor,
+    ast.LShift,
+    ast.RShift,
+    ast.Compare,
+    ast.Eq,
+    ast.NotEq,
+    ast.Lt,
+    ast.LtE,
+    ast.Gt,
+    ast.GtE,
+    ast.In,
+    ast.NotIn,
+    ast.IfExp,
+    ast.Call,
+    ast.Name,
+    ast.Attribute,
+    ast.Subscript,
+    ast.Slice,
+    ast.Tuple,
+    ast.List,
+    ast.Constant,
+    ast.Load,
+)
+
+
+class _Sample(object):
+    """Name lookup of a trigger expression: fields of the sample and prev"""
+
+    __slots__ = ["state", "prev"]
+
+    def __getitem__(self, name):
+        if name == "prev":
+            return self.prev
+        try:
+            return getattr(self.state, name)
+        except AttributeError:
+            raise KeyError(name)
+
+
+class Trigger(object):
+    """A condition over the fields of a recipe, e.g.
+
+        safety_status != prev.safety_status
+        robot_mode != prev.robot_mode
+        norm(actual_TCP_force[:3]) > 50
+
+    prev is the previous sample. Only comparisons, arithmetic, field names,
+    prev.<field> and the functions in FUNCTIONS are accepted, anything else
+    raises ValueError when the trigger is created.
+    """
+
+    def __init__(self, expression, names):
+        self.expression = expression
+        try:
+            tree = ast.parse(expression, mode="eval")
+        except SyntaxError as e:
+            raise ValueError("Invalid trigger '{}': {}".format(expression, e.msg))
+        names = set(names)
+        for node in ast.walk(tree):
+            if not isinstance(node, ALLOWED_NODES):
+                raise ValueError(
+                    "Invalid trigger '{}': {} not allowed".format(
+                        expression, type(node).__name__
+                    )
+                )
+            if isinstance(node, ast.Name):
+                if node.id not in names and node.id not in FUNCTIONS:
+                    if node.id != "prev":
+                        raise ValueError(
+                            "Invalid trigger '{}': unknown field {}".format(
+                                expression, node.id
+                            )
+                        )
+            elif isinstance(node, ast.Attribute):
+                if not (isinstance(node.value, ast.Name) and node.value.id == "prev"):
+                    raise ValueError(
+                        "Invalid trigger '{}': only prev.<field> is allowed".format(
+                            expression
+                        )
+                    )
+                if node.attr not in names:
+                    raise ValueError(
+                        "Invalid trigger '{}': unknown field {}".format(
+                            expression, node.attr
+                        )
+                    )
+            elif isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+                    raise ValueError(
+                        "Invalid trigger '{}': only {} can be called".format(
+                            expression, ", ".join(sorted(FUNCTIONS))
+                        )
+                    )
+        self.__code = compile(tree, "<trigger>", "eval")
+        self.__globals = dict(FUNCTIONS, __builtins__={})
+
+    def __call__(self, sample):
+        return bool(eval(self.__code, self.__globals, sample))
+
+
+class TriggerRecorder(object):
+    """Writes only the samples around trigger events.
+
+    The last pre_samples samples are kept in a ring in memory. When any
+    trigger fires, open_event(index, trigger) returns a (file, writer) pair,
+    the ring and the following post_samples samples are written to the
+    writer and the file is closed. A trigger firing again within the post
+    window extends it, so overlapping events share one file.
+    """
+
+    def __init__(self, triggers, pre_samples, post_samples, open_event):
+        self.triggers = triggers
+        self.post_samples = post_samples
+        self.events = 0
+        self.__open_event = open_event
+        self.__ring = collections.deque(maxlen=max(pre_samples, 1))
+        self.__pre_samples = pre_samples
+        self.__sample = _Sample()
+        self.__sample.prev = None
+        self.__file = None
+        self.__writer = None
+        self.__remaining = 0
+
+    def feed(self, data, state):
+        """data is what gets written, state what the triggers look at"""
+        sample = self.__sample
+        sample.state = state
+        fired = None
+        if sample.prev is not None:
+            for trigger in self.triggers:
+                if trigger(sample):
+                    fired = trigger
+                    break
+        sample.prev = state
+
+        if self.__writer is not None:
+            self.__writer.writerow(data)
+            if fired is not None:
+                self.__remaining = self.post_samples
+            else:
+                self.__remaining -= 1
+                if self.__remaining <= 0:
+                    self.close()
+        elif fired is not None:
+            self.events += 1
+            _log.info("Trigger %d: %s", self.events, fired.expression)
+            self.__file, self.__writer = self.__open_event(self.events, fired)
+            for pending in self.__ring:
+                self.__writer.writerow(pending)
+            self.__ring.clear()
+            self.__writer.writerow(data)
+            self.__remaining = self.post_samples
+            if self.__remaining <= 0:
+                self.close()
+        elif self.__pre_samples > 0:
+            self.__ring.append(data)
+
+    def close(self):
+        """Ends the current event early, e.g. when recording stops"""
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+            self.__writer = None
@@ -0,0 +1,287 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import logging
+import os
+import threading
+import time
+
+from rtde.rtde import LOGNAME
+
+_log = logging.getLogger(LOGNAME)
+
+DEFAULT_BUFFER_SIZE = 4 * 1024 * 1024
+
+
+class LatencyHistogram(object):
+    """Count, total, max and log2 buckets of durations in microseconds"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {}
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        bucket = max(int(seconds * 1e6), 1).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def summary(self):
+        """Dict with the bucket counts keyed by their upper bound, e.g. '<1024us'"""
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count * 1e6 if self.count else 0.0,
+            "max_us": self.max * 1e6,
+            "buckets": {
+                "<{}us".format(1 << b): self.buckets[b] for b in sorted(self.buckets)
+            },
+        }
+
+
+class FlushTimer(object):
+    """Thread calling flush() interval seconds after rows were buffered, for
+    writers that otherwise only flush when the next row comes.
+
+    The writer buffers and flushes with lock held, calls start() when it
+    buffers a row and stop() when it flushes. flush is called with lock
+    held, an exception it raises ends the thread and is kept in error.
+    """
+
+    def __init__(self, lock, flush, interval, name):
+        self.interval = interval
+        self.error = None
+        self.__condition = threading.Condition(lock)
+        self.__flush = flush
+        self.__due = None
+        self.__closing = False
+        self.__thread = threading.Thread(
+            target=self.__run, name="flush timer " + name, daemon=True
+        )
+        self.__thread.start()
+
+    def start(self):
+        """Starts the timer unless it runs, called with the lock held"""
+        if self.__due is None:
+            self.__due = time.monotonic() + self.interval
+            self.__condition.notify()
+
+    def stop(self):
+        """Stops the timer, called with the lock held"""
+        self.__due = None
+
+    def __run(self):
+        with self.__condition:
+            while not self.__closing:
+                timeout = None
+                if self.__due is not None:
+                    timeout = self.__due - time.monotonic()
+                if timeout is None or timeout > 0:
+                    self.__condition.wait(timeout)
+                    continue
+                self.__due = None
+                try:
+                    self.__flush()
+                except Exception as e:
+                    _log.error("Timed flush failed: %s", e)
+                    self.error = e
+                    return
+
+    def close(self):
+        with self.__condition:
+            self.__closing = True
+            self.__condition.notify()
+        self.__thread.join()
+
+
+class WriteBehindFile(object):
+    """File object for CSVWriter and CSVBinaryWriter that writes behind.
+
+    Writes are appended to an in-memory buffer. When a flush is due the
+    buffer is swapped with a second one that a background thread writes to
+    file, so a slow disk only blocks the writer when both buffers are full.
+    Flushes are due when the buffer holds buffer_size bytes, flush_rows
+    writes (one per row for both writers) or its oldest row is
+    flush_interval seconds old. With fsync_interval rows are flushed and
+    fsynced at most that many seconds after they were written, bounding
+    what a crash loses. The thread keeps both intervals on a timer, also
+    when no rows arrive.
+
+    stall_latency records how long writes waited for the background thread,
+    flush_latency how long the thread took per buffer.
+    """
+
+    def __init__(
+        self,
+        file,
+        buffer_size=DEFAULT_BUFFER_SIZE,
+        flush_rows=None,
+        flush_interval=None,
+        fsync_interval=None,
+    ):
+        self.__file = file
+        self.name = file.name
+        self.buffer_size = buffer_size
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        intervals = [i for i in (flush_interval, fsync_interval) if i is not None]
+        self.__flush_after = min(intervals) if intervals else None
+        self.stall_latency = LatencyHistogram()
+        self.flush_latency = LatencyHistogram()
+        self.__front = bytearray()
+        self.__back = bytearray()
+        self.__rows = 0
+        self.__buffered_since = None  # when the oldest buffered row came
+        self.__last_fsync = time.monotonic()
+        self.__unsynced = False  # written but not fsynced yet
+        self.__pending = False  # the back buffer is waiting to be written
+        self.__closing = False
+        self.__error = None
+        self.__lock = threading.Lock()
+        self.__condition = threading.Condition(self.__lock)
+        self.__thread = threading.Thread(
+            target=self.__run, name="write-behind " + self.name, daemon=True
+        )
+        self.__thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        with self.__lock:  # the condition's lock, entered without its overhead
+            self.__front += data
+            self.__rows += 1
+            if len(self.__front) >= self.buffer_size:
+                self.__swap()
+            elif self.flush_rows is not None and self.__rows >= self.flush_rows:
+                self.__swap()
+            elif self.__rows == 1:
+                self.__buffered_since = time.monotonic()
+                if self.__flush_after is not None:
+                    self.__condition.notify_all()  # starts the flush timer
+        return len(data)
+
+    def __swap(self):
+        """Hands the front buffer to the thread, called with the lock held"""
+        if self.__pending:
+            start = time.monotonic()
+            while self.__pending and self.__error is None:
+                self.__condition.wait()
+            self.stall_latency.add(time.monotonic() - start)
+        if self.__error is not None:
+            raise self.__error
+        self.__front, self.__back = self.__back, self.__front
+        self.__pending = True
+        self.__rows = 0
+        self.__buffered_since = None
+        self.__condition.notify_all()
+
+    def __timeout(self, now):
+        """Seconds until a timed flush or fsync is due, None for no timer"""
+        deadlines = []
+        if self.__flush_after is not None and self.__buffered_since is not None:
+            deadlines.append(self.__buffered_since + self.__flush_after)
+        if self.fsync_interval is not None and self.__unsynced:
+            deadlines.append(self.__last_fsync + self.fsync_interval)
+        return max(min(deadlines) - now, 0.0) if deadlines else None
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                while not self.__pending and not self.__closing:
+                    now = time.monotonic()
+                    timeout = self.__timeout(now)
+                    if timeout == 0.0:
+                        if self.__front and self.__flush_after is not None:
+                            if now - self.__buffered_since >= self.__flush_after:
+                                self.__swap()
+                        break
+                    self.__condition.wait(timeout)
+                pending = self.__pending
+                if not pending and self.__closing:
+                    return
+            start = time.monotonic()
+            try:
+                if pending:
+                    self.__file.write(self.__back)
+                    self.__file.flush()
+                    self.__unsynced = True
+                if self.fsync_interval is not None and self.__unsynced:
+                    if start - self.__last_fsync >= self.fsync_interval:
+                        os.fsync(self.__file.fileno())
+                        self.__last_fsync = start
+                        self.__unsynced = False
+            except Exception as e:
+                _log.error("Write behind to %s failed: %s", self.name, e)
+                with self.__condition:
+                    self.__error = e
+                    self.__pending = False
+                    self.__condition.notify_all()
+                return
+            if not pending:
+                continue
+            self.flush_latency.add(time.monotonic() - start)
+            del self.__back[:]
+            with self.__condition:
+                self.__pending = False
+                self.__condition.notify_all()
+
+    def flush(self):
+        """Hands the buffered data to the background thread and waits until
+        it is written"""
+        with self.__condition:
+            if self.__front:
+                self.__swap()
+            while self.__pending and self.__error is None:
+                self.__condition.wait()
+            if self.__error is not None:
+                raise self.__error
+
+    def close(self):
+        if self.__thread is None:
+            return
+        try:
+            self.flush()
+            if self.fsync_interval is not None:
+                os.fsync(self.__file.fileno())
+        finally:
+            with self.__condition:
+                self.__closing = True
+                self.__condition.notify_all()
+            self.__thread.join()
+            self.__thread = None
+            self.__file.close()
+
+    def stats(self):
+        return {
+            "stall": self.stall_latency.summary(),
+            "flush": self.flush_latency.summary(),
+        }
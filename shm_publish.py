@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# Copyright (c) 2020-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.append("..")
+import rtde.rtde as rtde
+import rtde.rtde_config as rtde_config
+from rtde.shm_ring import ShmRingWriter
+
+# parameters
+parser = argparse.ArgumentParser(
+    description="Publish one RTDE output recipe to a shared memory ring that "
+    "local processes read with rtde.shm_ring.ShmRingReader"
+)
+parser.add_argument(
+    "--host", default="192.168.56.101", help="name of host to connect to (localhost)"
+)
+parser.add_argument("--port", type=int, default=30004, help="port number (30004)")
+parser.add_argument(
+    "--frequency", type=int, default=125, help="the sampling frequency in Herz"
+)
+parser.add_argument(
+    "--config",
+    default="record_configuration.xml",
+    help="data configuration file to use (record_configuration.xml)",
+)
+parser.add_argument("--name", default="rtde", help="shared memory segment name (rtde)")
+parser.add_argument(
+    "--slots", type=int, default=4096, help="records kept in the ring (4096)"
+)
+parser.add_argument("--verbose", help="increase output verbosity", action="store_true")
+args = parser.parse_args()
+
+if args.verbose:
+    logging.basicConfig(level=logging.INFO)
+
+if not os.path.exists(args.config):
+    print(f"Error: Configuration file '{args.config}' not found.")
+    sys.exit(1)
+
+conf = rtde_config.ConfigFile(args.config)
+output_names, output_types = conf.get_recipe("out")
+
+con = rtde.RTDE(args.host, args.port)
+con.connect()
+
+# get controller version
+con.get_controller_version()
+
+# setup recipes
+if not con.send_output_setup(output_names, output_types, frequency=args.frequency):
+    logging.error("Unable to configure output")
+    sys.exit()
+
+ring = ShmRingWriter(
+    args.name,
+    output_names,
+    output_types,
+    slots=args.slots,
+    recipe_id=con.output_configs[0].id,
+)
+
+# start data synchronization
+if not con.send_start():
+    logging.error("Unable to start synchronization")
+    ring.close()
+    sys.exit()
+
+sys.stdout.write("Publishing to shared memory '{}'\n".format(ring.name))
+try:
+    while True:
+        payload = con.receive_buffered(binary=True)
+        if payload is None:
+            con.has_data(rtde.DEFAULT_TIMEOUT)
+            continue
+        ring.write(payload)
+except KeyboardInterrupt:
+    pass
+except rtde.RTDEException:
+    con.disconnect()
+    ring.close()
+    sys.exit()
+
+sys.stdout.write("\rPublished {} samples\n".format(ring.write_seq))
+
+con.send_pause()
+con.disconnect()
+ring.close()
@@ -0,0 +1,195 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+# the tests import rtde and the scripts' modules from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from rtde import rtde, serialize
+from rtde.csv_writer import CSVWriter
+from rtde.rtde import PACKAGE_HEADER, Command
+
+# the recording write_csv writes by default
+NAMES = ["timestamp", "actual_q", "robot_mode"]
+TYPES = ["DOUBLE", "VECTOR6D", "INT32"]
+
+
+def sample(i):
+    return types.SimpleNamespace(
+        timestamp=i * 0.002, actual_q=[i + j * 0.1 for j in range(6)], robot_mode=i % 7
+    )
+
+
+def write_csv(path, rows, policies=None, names=NAMES, types=TYPES, sample=sample):
+    """Writes rows samples with CSVWriter, sample(i) is row i. Returns the
+    path as a string."""
+    with open(path, "w", newline="") as f:
+        writer = CSVWriter(f, names, types, policies=policies)
+        writer.writeheader()
+        for i in range(rows):
+            writer.writerow(sample(i))
+    return str(path)
+
+
+# field types the scripted controller knows
+FIELD_TYPES = {
+    "timestamp": "DOUBLE",
+    "actual_q": "VECTOR6D",
+    "robot_mode": "INT32",
+    "input_int_register_0": "INT32",
+    "input_double_register_0": "DOUBLE",
+    "input_bit_register_64": "BOOL",
+    "standard_digital_output": "UINT8",
+    "speed_slider_mask": "UINT32",
+}
+
+
+def package(command, payload=b""):
+    return PACKAGE_HEADER.pack(PACKAGE_HEADER.size + len(payload), command) + payload
+
+
+class ScriptedController(object):
+    """Server end of one rtde.RTDE connection on a local port. A thread
+    answers the version requests, recipe setups, start and pause and keeps
+    the payloads of the data packages the client sends in inputs. The test
+    sends data packages with send(), byte for byte as it wants them, and
+    with start_data in the write of the reply to start, as a controller
+    that streams at once. A new one on the port of a closed one is the
+    same controller restarted."""
+
+    def __init__(self, field_types=FIELD_TYPES, port=0):
+        self.field_types = field_types
+        self.outputs = {}  # recipe id to types
+        self.inputs = []
+        self.start_data = b""
+        self.started = threading.Event()
+        self.sock = None
+        self.__input_recipes = 0
+        self.__lock = threading.Lock()
+        self.__server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.__server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.__server.bind(("127.0.0.1", port))
+        self.__server.listen(1)
+        self.port = self.__server.getsockname()[1]
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def client(self, names=("timestamp",), frequency=500, **kwargs):
+        """A started rtde.RTDE with one output recipe of names"""
+        con = rtde.RTDE("127.0.0.1", self.port, **kwargs)
+        con.connect()
+        assert con.send_output_setup(list(names), frequency=frequency)
+        assert con.send_start()
+        return con
+
+    def data(self, recipe_id, *values):
+        """A data package of an output recipe, vectors expanded in values"""
+        types = self.outputs[recipe_id]
+        fmt = ">B" + "".join(serialize.TYPE_FORMATS[t] for t in types)
+        return package(Command.RTDE_DATA_PACKAGE, struct.pack(fmt, recipe_id, *values))
+
+    def send(self, data):
+        with self.__lock:
+            self.sock.sendall(data)
+
+    def wait_inputs(self, count, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while len(self.inputs) < count and time.monotonic() < deadline:
+            time.sleep(0.001)
+        return self.inputs
+
+    def close(self):
+        self.__server.close()
+        if self.sock is not None:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.sock.close()
+
+    def __run(self):
+        try:
+            self.sock, _ = self.__server.accept()
+        except OSError:
+            return
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        buf = b""
+        while True:
+            try:
+                more = self.sock.recv(65536)
+            except OSError:
+                return
+            if not more:
+                return
+            buf += more
+            while len(buf) >= PACKAGE_HEADER.size:
+                size, command = PACKAGE_HEADER.unpack_from(buf)
+                if len(buf) < size:
+                    break
+                self.__on_package(command, buf[PACKAGE_HEADER.size : size])
+                buf = buf[size:]
+
+    def __reply(self, command, payload):
+        self.send(package(command, payload))
+
+    def __setup(self, recipe_id, names):
+        types = [self.field_types.get(n, "NOT_FOUND") for n in names]
+        return struct.pack(">B", recipe_id) + ",".join(types).encode("utf-8")
+
+    def __on_package(self, command, payload):
+        if command == Command.RTDE_REQUEST_PROTOCOL_VERSION:
+            self.__reply(command, b"\x01")
+        elif command == Command.RTDE_GET_URCONTROL_VERSION:
+            self.__reply(command, struct.pack(">IIII", 5, 11, 0, 0))
+        elif command == Command.RTDE_CONTROL_PACKAGE_SETUP_OUTPUTS:
+            names = payload[8:].decode("utf-8").split(",")
+            recipe_id = len(self.outputs) + 1
+            self.outputs[recipe_id] = [self.field_types[n] for n in names]
+            self.__reply(command, self.__setup(recipe_id, names))
+        elif command == Command.RTDE_CONTROL_PACKAGE_SETUP_INPUTS:
+            self.__input_recipes += 1
+            names = payload.decode("utf-8").split(",")
+            self.__reply(command, self.__setup(self.__input_recipes, names))
+        elif command == Command.RTDE_CONTROL_PACKAGE_START:
+            self.send(package(command, b"\x01") + self.start_data)
+            self.started.set()
+        elif command == Command.RTDE_CONTROL_PACKAGE_PAUSE:
+            self.__reply(command, b"\x01")
+        elif command == Command.RTDE_DATA_PACKAGE:
+            self.inputs.append(payload)
+
+
+@pytest.fixture
+def controller():
+    controller = ScriptedController()
+    yield controller
+    controller.close()
@@ -0,0 +1,74 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import functools
+import types
+
+import pytest
+
+from rtde import analytics
+import conftest
+
+NAMES = ["timestamp", "actual_current", "joint_temperatures", "robot_mode"]
+TYPES = ["DOUBLE", "VECTOR6D", "VECTOR6D", "INT32"]
+
+
+def sample(i):
+    return types.SimpleNamespace(
+        timestamp=i * 0.01,
+        actual_current=[float(i % 9)] * 6,
+        joint_temperatures=[30.0 + (i % 13)] * 6,
+        robot_mode=7 if i < 50 else 5,
+    )
+
+
+write_csv = functools.partial(
+    conftest.write_csv, names=NAMES, types=TYPES, sample=sample
+)
+
+
+def test_sparse_recording_aggregates(tmp_path):
+    dense = analytics.analyze_file(write_csv(tmp_path / "dense.csv", 100))
+    sparse = analytics.analyze_file(
+        write_csv(tmp_path / "sparse.csv", 100, [None, "max:4", "every:5", "every:10"])
+    )
+    assert sparse["samples"] == 100
+    assert sparse["duration"] == pytest.approx(dense["duration"])
+    # the temperature is sampled at rows 0, 5, ..., 95, whose peak is row 90
+    assert sparse["temperature_max"] == [30.0 + 90 % 13] * 6
+    assert sparse["robot_mode"] == pytest.approx(dense["robot_mode"])
+    # the first max is written with the 4th row
+    assert sparse["current"]["count"] == 97
+    assert sparse["current"]["max"] == [8.0] * 6
+
+
+def test_summary_row_of_merged_results(tmp_path):
+    results = analytics.analyze(
+        [write_csv(tmp_path / "a.csv", 30), write_csv(tmp_path / "b.csv", 20)], jobs=1
+    )
+    total = analytics.merge(result for _, result in results)
+    row = analytics.summary_row("total", total)
+    assert row["files"] == 2
+    assert row["samples"] == 50
+    assert row["current_max_0"] == 8.0
+    assert row["robot_mode_7_s"] == pytest.approx(0.5)
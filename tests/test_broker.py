@@ -0,0 +1,156 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import socket
+import struct
+import threading
+import time
+
+import rtde.rtde as rtde
+from rtde import serialize
+from rtde.broker import RTDEBroker
+from rtde.rtde import PACKAGE_HEADER, Command
+
+NAMES = ["timestamp"] + ["vector_" + str(i) for i in range(20)]
+TYPES = ["DOUBLE"] + ["VECTOR6D"] * 20
+
+
+class Upstream(object):
+    """Stands in for a connected rtde.RTDE with one output recipe, a sample
+    is due every period seconds"""
+
+    def __init__(self, period=0.0005):
+        config = serialize.DataConfig.unpack_recipe(
+            struct.pack(">B", 1) + ",".join(TYPES).encode("utf-8")
+        )
+        config.names = NAMES
+        self.output_configs = [config]
+        self.period = period
+        self.samples = 0
+        self.max_gap = 0.0
+        self.__struct = struct.Struct(">" + config.fmt[2:])
+        self.__last = None
+
+    def get_controller_version(self):
+        return 5, 11, 0, 0
+
+    def send_start(self):
+        return True
+
+    def send_pause(self):
+        return True
+
+    def is_connected(self):
+        return True
+
+    def has_data(self, timeout=0):
+        return True
+
+    def receive_buffered(self, binary=False):
+        now = time.monotonic()
+        if self.__last is not None:
+            # time spent dispatching the previous sample
+            self.max_gap = max(self.max_gap, now - self.__last)
+        time.sleep(self.period)
+        self.samples += 1
+        self.__last = time.monotonic()
+        return self.__struct.pack(*[float(self.samples)] * (1 + 20 * 6))
+
+
+def start_broker(upstream, queue_size):
+    broker = RTDEBroker(upstream, NAMES, TYPES, 500, queue_size=queue_size)
+    host, port = broker.listen_tcp("127.0.0.1", 0)
+    thread = threading.Thread(target=broker.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return broker, thread, port
+
+
+def stalled_client(port):
+    """Sets up and starts an output recipe, then never reads"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.connect(("127.0.0.1", port))
+    payload = struct.pack(">d", 500) + ",".join(NAMES).encode("utf-8")
+    for command, payload in (
+        (Command.RTDE_CONTROL_PACKAGE_SETUP_OUTPUTS, payload),
+        (Command.RTDE_CONTROL_PACKAGE_START, b""),
+    ):
+        sock.sendall(PACKAGE_HEADER.pack(PACKAGE_HEADER.size + len(payload), command))
+        sock.sendall(payload)
+    return sock
+
+
+def test_stalled_client_does_not_block_others():
+    upstream = Upstream()
+    broker, thread, port = start_broker(upstream, queue_size=100)
+    try:
+        con = rtde.RTDE("127.0.0.1", port)
+        con.connect()
+        assert con.send_output_setup(["timestamp"], frequency=500)
+        assert con.send_start()
+        slow = stalled_client(port)
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and not (
+            len(broker.clients) == 2 and all(c.started for c in broker.clients)
+        ):
+            con.receive_buffered(binary=True)
+        while len(broker.clients) > 1 and time.monotonic() < deadline:
+            con.receive_buffered(binary=True)
+        # the stalled client is dropped once its queue is full ...
+        assert len(broker.clients) == 1
+        # ... and the upstream loop never waited on it
+        assert upstream.max_gap < 0.2
+        received = 0
+        start = upstream.samples
+        while upstream.samples < start + 200:
+            if con.receive_buffered(binary=True) is not None:
+                received += 1
+        assert received > 100
+        con.disconnect()
+        slow.close()
+    finally:
+        broker.stop()
+        thread.join(2)
+
+
+def test_client_receives_field_subsets_at_divided_frequency():
+    upstream = Upstream()
+    broker, thread, port = start_broker(upstream, queue_size=100)
+    try:
+        con = rtde.RTDE("127.0.0.1", port)
+        con.connect()
+        assert con.send_output_setup(["timestamp", "vector_3"], frequency=250)
+        assert con.send_start()
+        timestamps = []
+        while len(timestamps) < 20:
+            state = con.receive_buffered()
+            if state is not None:
+                timestamps.append(state.timestamp)
+                assert state.vector_3 == [state.timestamp] * 6
+        steps = set(b - a for a, b in zip(timestamps, timestamps[1:]))
+        assert steps == {2.0}
+        con.disconnect()
+    finally:
+        broker.stop()
+        thread.join(2)
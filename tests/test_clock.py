@@ -0,0 +1,104 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import time
+
+import numpy as np
+import pytest
+
+from rtde.clock import ClockEstimator
+
+OFFSET = 1234.5
+DRIFT = 50e-6  # host clock gains 50us per controller second
+
+
+def synthetic(seconds, seed=5):
+    """Controller timestamps at 500 Hz and the host times they are read at,
+    with a random delay that is zero for every hundredth sample"""
+    rng = np.random.default_rng(seed)
+    timestamps = np.arange(int(seconds * 500)) * 0.002
+    delay = rng.uniform(0, 500e-6, timestamps.size)
+    delay[::100] = 0.0
+    return timestamps, OFFSET + timestamps * (1 + DRIFT) + delay, delay
+
+
+def test_offset_and_drift_from_the_least_delayed_samples():
+    timestamps, host, delay = synthetic(30)
+    clock = ClockEstimator(window=1.0)
+    latency = np.array([clock.add(t, h) for t, h in zip(timestamps, host)])
+    assert clock.drift == pytest.approx(DRIFT, rel=1e-6)
+    for t in (0.0, 10.0, 29.0):
+        assert clock.offset(t) == pytest.approx(OFFSET + DRIFT * t, abs=1e-9)
+        assert clock.to_host(t) == pytest.approx(OFFSET + t * (1 + DRIFT), abs=1e-9)
+    # once a line is fitted the latency is the delay
+    fitted = timestamps >= 2.0
+    assert latency[fitted] == pytest.approx(delay[fitted], abs=1e-9)
+    summary = clock.summary()
+    assert summary["samples"] == timestamps.size
+    assert summary["windows"] == 29
+    assert summary["drift_ppm"] == pytest.approx(50.0, rel=1e-6)
+    assert summary["latency_us"]["p50"] == pytest.approx(np.median(latency) * 1e6)
+    assert summary["latency_us"]["max"] == pytest.approx(latency.max() * 1e6)
+
+
+def test_nothing_is_estimated_before_a_window():
+    clock = ClockEstimator(window=1.0)
+    assert clock.add(0.0, 10.002) == 0.0
+    assert clock.add(0.002, 10.005) == pytest.approx(0.001)
+    assert clock.offset(0.002) is None
+    assert clock.to_host(0.002) is None
+    assert clock.drift == 0.0
+    assert clock.summary()["offset_s"] is None
+
+
+def test_restart_starts_over():
+    timestamps, host, _ = synthetic(5)
+    clock = ClockEstimator(window=1.0)
+    for t, h in zip(timestamps, host):
+        clock.add(t, h)
+    assert clock.offset(0.0) is not None
+    clock.add(0.0, host[-1] + 1.0)
+    assert clock.restarts == 1
+    assert clock.offset(0.0) is None
+    assert clock.summary()["windows"] == 0
+    assert clock.summary()["samples"] == timestamps.size + 1
+
+
+def test_last_receive_ns_is_the_read_time(controller):
+    con = controller.client()
+    try:
+        before = time.monotonic_ns()
+        controller.send(controller.data(1, 0.0) + controller.data(1, 0.002))
+        time.sleep(0.05)
+        assert con.receive_buffered().timestamp == 0.0
+        read = con.last_receive_ns
+        assert before <= read <= time.monotonic_ns()
+        time.sleep(0.05)
+        # queued by the same read, returned later
+        assert con.receive_buffered().timestamp == 0.002
+        assert con.last_receive_ns == read
+        before = time.monotonic_ns()
+        controller.send(controller.data(1, 0.004))
+        assert con.receive().timestamp == 0.004
+        assert before <= con.last_receive_ns <= time.monotonic_ns()
+    finally:
+        con.disconnect()
@@ -0,0 +1,66 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import time
+import types
+
+from rtde import columnar
+
+NAMES = ["timestamp", "actual_q", "timestamp"]
+TYPES = ["DOUBLE", "VECTOR3D", "DOUBLE"]
+
+
+def sample(i):
+    return types.SimpleNamespace(timestamp=i * 0.002, actual_q=[i, i + 0.5, -i])
+
+
+def test_repeated_fields_round_trip(tmp_path):
+    directory = str(tmp_path / "rec")
+    with columnar.ColumnarWriter(directory, NAMES, TYPES, chunk_rows=4) as writer:
+        writer.writeheader()
+        for i in range(10):
+            writer.writerow(sample(i))
+    assert columnar.read_manifest(directory)["complete"]
+    columns = columnar.open_columns(directory)
+    assert sorted(columns) == [
+        "actual_q_0",
+        "actual_q_1",
+        "actual_q_2",
+        "timestamp",
+        "timestamp__2",
+    ]
+    assert columns["timestamp__2"].tolist() == [i * 0.002 for i in range(10)]
+    assert columns["actual_q_2"].tolist() == [-i for i in range(10)]
+
+
+def test_rows_are_flushed_on_the_timer_without_further_rows(tmp_path):
+    directory = str(tmp_path / "rec")
+    with columnar.ColumnarWriter(directory, NAMES, TYPES, flush_interval=0.1) as w:
+        w.writeheader()
+        w.writerow(sample(0))
+        w.writerow(sample(1))
+        deadline = time.monotonic() + 5.0
+        while time.monotonic() < deadline:
+            if columnar.read_manifest(directory)["rows"] == 2:
+                break
+            time.sleep(0.05)
+        assert columnar.open_columns(directory)["actual_q_1"].tolist() == [0.5, 1.5]
@@ -0,0 +1,76 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import math
+
+import pytest
+
+from rtde import convert
+from rtde.csv_binary_reader import CSVBinaryReader
+from conftest import NAMES, TYPES, write_csv
+
+
+def columns_of(path):
+    with open(path) as f:
+        return f.readline().rstrip("\r\n").split(",")
+
+
+def read_binary(path):
+    with open(path, "rb") as f:
+        reader = CSVBinaryReader(f)
+        return reader.types, reader.read_columns()
+
+
+def test_round_trip(tmp_path):
+    source = write_csv(tmp_path / "rec.csv", 100)
+    column_types = convert.column_types(columns_of(source), NAMES, TYPES)
+    assert column_types == ["DOUBLE"] * 7 + ["INT32"]
+    convert.csv_to_binary(source, str(tmp_path / "rec.bin"), column_types, jobs=1)
+    _, columns = read_binary(tmp_path / "rec.bin")
+    assert columns["robot_mode"].tolist() == [i % 7 for i in range(100)]
+    convert.binary_to_csv(str(tmp_path / "rec.bin"), str(tmp_path / "back.csv"), jobs=1)
+    with open(source) as a, open(tmp_path / "back.csv") as b:
+        rows_a = [[float(v) for v in line.split(",")] for line in a.readlines()[1:]]
+        rows_b = [[float(v) for v in line.split(",")] for line in b.readlines()[1:]]
+    assert rows_a == rows_b
+
+
+def test_sparse_integer_column_is_not_filled_in(tmp_path):
+    source = write_csv(tmp_path / "rec.csv", 30, policies=[None, None, "every:10"])
+    column_types = convert.column_types(columns_of(source), NAMES, TYPES)
+    with pytest.raises(ValueError, match="robot_mode"):
+        convert.csv_to_binary(source, str(tmp_path / "rec.bin"), column_types, jobs=1)
+
+
+def test_sparse_integer_field_with_policy_is_double(tmp_path):
+    policies = [None, "mean:4", "every:10"]
+    source = write_csv(tmp_path / "rec.csv", 30, policies=policies)
+    column_types = convert.column_types(columns_of(source), NAMES, TYPES, policies)
+    assert column_types == ["DOUBLE"] * 8
+    convert.csv_to_binary(source, str(tmp_path / "rec.bin"), column_types, jobs=1)
+    _, columns = read_binary(tmp_path / "rec.bin")
+    modes = columns["robot_mode"].tolist()
+    assert modes[::10] == [0.0, 3.0, 6.0]
+    assert all(math.isnan(m) for i, m in enumerate(modes) if i % 10)
+    assert math.isnan(columns["actual_q_0"][0])
+    assert columns["actual_q_0"][3] == pytest.approx(1.5)
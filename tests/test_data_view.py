@@ -0,0 +1,88 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import struct
+
+import pytest
+
+from rtde import serialize
+
+NAMES = ["timestamp", "actual_q", "robot_mode"]
+TYPES = ["DOUBLE", "VECTOR6D", "INT32"]
+
+
+def config():
+    config = serialize.DataConfig.unpack_recipe(
+        struct.pack(">B", 1) + ",".join(TYPES).encode("utf-8")
+    )
+    config.names = NAMES
+    return config
+
+
+def values(i):
+    return [i * 0.002] + [i + j * 0.5 for j in range(6)] + [i % 7]
+
+
+def fields(state):
+    return [getattr(state, name) for name in NAMES]
+
+
+def test_view_fields_equal_unpack():
+    recipe = config()
+    payload = struct.pack(recipe.fmt, 1, *values(3))
+    view = recipe.view(memoryview(payload))
+    assert fields(view) == fields(recipe.unpack(payload))
+    assert view.recipe_id == 1
+    assert isinstance(view.actual_q, list) and isinstance(view.robot_mode, int)
+    # cached on first access
+    assert "actual_q" in view.__dict__
+    with pytest.raises(AttributeError):
+        view.actual_qd
+
+
+def test_view_without_cache_decodes_every_access():
+    recipe = config()
+    view = recipe.view(struct.pack(recipe.fmt, 1, *values(1)), cache=False)
+    assert view.timestamp == 0.002
+    assert "timestamp" not in view.__dict__
+
+
+def test_lazy_receive_view_outlives_the_next_receive(controller):
+    con = controller.client(NAMES)
+    try:
+        controller.send(controller.data(1, *values(1)))
+        first = con.receive(lazy=True)
+        controller.send(controller.data(1, *values(2)))
+        second = con.receive(lazy=True)
+        controller.send(controller.data(1, *values(3)))
+        buffered = con.receive_buffered(lazy=True)
+        while buffered is None:
+            con.has_data(1.0)
+            buffered = con.receive_buffered(lazy=True)
+    finally:
+        con.disconnect()
+    # the first view is read only after the buffer it points into was replaced
+    recipe = config()
+    for i, view in enumerate([first, second, buffered], 1):
+        assert isinstance(view, serialize.DataView)
+        expected = recipe.unpack(struct.pack(recipe.fmt, 1, *values(i)))
+        assert fields(view) == fields(expected)
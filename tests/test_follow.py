@@ -0,0 +1,122 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import threading
+import time
+
+import pytest
+
+from rtde import follow
+
+
+def write(path, text, mode="w"):
+    with open(path, mode) as f:
+        f.write(text)
+
+
+def values(block):
+    return {name: array.tolist() for name, array in block.items()}
+
+
+def test_partial_lines_are_held_back(tmp_path):
+    path = str(tmp_path / "rec.csv")
+    write(path, "x,y\n1,2\n3,")
+    with follow.CSVFollower(path, inotify=False) as follower:
+        assert values(follower.read()) == {"x": [1.0], "y": [2.0]}
+        assert follower.read() is None
+        write(path, "4\n", "a")
+        assert values(follower.read()) == {"x": [3.0], "y": [4.0]}
+
+
+def test_truncated_file_is_read_from_its_header(tmp_path):
+    path = str(tmp_path / "rec.csv")
+    write(path, "x,y\n1,2\n3,4\n")
+    with follow.CSVFollower(path, inotify=False) as follower:
+        follower.read()
+        write(path, "z\n5\n")
+        assert values(follower.read()) == {"z": [5.0]}
+
+
+def test_rewrite_past_the_offset_is_read_from_its_header(tmp_path):
+    path = str(tmp_path / "rec.csv")
+    write(path, "x,y\n1,2\n")
+    with follow.CSVFollower(path, inotify=False) as follower:
+        follower.read()
+        # larger than what was read before the follower looks again
+        write(path, "x,y\n200,2\n300,3\n500,5\n")
+        assert values(follower.read()) == {
+            "x": [200.0, 300.0, 500.0],
+            "y": [2.0, 3.0, 5.0],
+        }
+
+
+def test_replaced_file_is_read_to_its_end_first(tmp_path):
+    path = str(tmp_path / "rec.csv")
+    write(path, "x\n1\n")
+    with follow.CSVFollower(path, inotify=False) as follower:
+        follower.read()
+        write(path, "2\n", "a")
+        write(str(tmp_path / "new.csv"), "x,y\n7,8\n9,10\n")
+        os.replace(str(tmp_path / "new.csv"), path)
+        assert values(follower.read()) == {"x": [2.0]}
+        assert values(follower.read()) == {"x": [7.0, 9.0], "y": [8.0, 10.0]}
+
+
+def test_replaced_file_is_followed_without_the_old_watch(tmp_path):
+    path = str(tmp_path / "rec.csv")
+    write(path, "x\n1\n")
+    watch = follow._inotify(path)
+    if watch is None:
+        pytest.skip("inotify is not available")
+    os.close(watch)
+    with follow.CSVFollower(path, max_interval=5.0) as follower:
+        follower.read()
+        write(str(tmp_path / "new.csv"), "x\n2\n")
+        os.replace(str(tmp_path / "new.csv"), path)
+        assert follower.wait(5.0)
+        assert values(follower.read()) == {"x": [2.0]}
+        # the new file's events end the wait, not max_interval
+        threading.Timer(0.2, write, (path, "3\n", "a")).start()
+        start = time.monotonic()
+        block = next(follower.follow(timeout=5.0))
+        assert values(block) == {"x": [3.0]}
+        assert time.monotonic() - start < 2.0
+
+
+def test_moved_file_is_polled_for(tmp_path):
+    path = str(tmp_path / "rec.csv")
+    write(path, "x\n1\n")
+    watch = follow._inotify(path)
+    if watch is None:
+        pytest.skip("inotify is not available")
+    os.close(watch)
+    with follow.CSVFollower(path, max_interval=5.0) as follower:
+        follower.read()
+        os.rename(path, str(tmp_path / "old.csv"))
+        assert follower.wait(5.0)
+        # no event comes for the new file, it is found by polling
+        threading.Timer(0.2, write, (path, "x\n2\n")).start()
+        start = time.monotonic()
+        block = next(follower.follow(timeout=5.0))
+        assert values(block) == {"x": [2.0]}
+        assert time.monotonic() - start < 2.0
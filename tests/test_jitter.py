@@ -0,0 +1,130 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import gc
+import logging
+import os
+
+import numpy as np
+import pytest
+
+import rtde.jitter as jitter
+
+
+def meter(monkeypatch, timestamps, host, **kwargs):
+    """A JitterMeter fed timestamps, seen at the host times"""
+    clock = iter(host)
+    monkeypatch.setattr(jitter.time, "monotonic", lambda: next(clock))
+    result = jitter.JitterMeter(500, **kwargs)
+    for timestamp in timestamps:
+        result.add(timestamp)
+    return result
+
+
+def us(values):
+    return [v * 1e6 for v in np.percentile(values, jitter.PERCENTILES)] + [
+        values.max() * 1e6
+    ]
+
+
+def test_percentiles_of_synthetic_delays(monkeypatch):
+    rng = np.random.default_rng(3)
+    # three samples never arrive, each is one skipped period
+    index = np.array([i for i in range(1000) if i not in (100, 101, 500)])
+    timestamps = index * 0.002
+    delay = rng.uniform(0, 200e-6, index.size)
+    host = 1000.0 + timestamps + delay
+    summary = meter(monkeypatch, timestamps, host).summary()
+    assert summary["samples"] == index.size
+    assert summary["skipped"] == 3
+    error = np.abs(np.diff(delay))
+    assert list(summary["period_error_us"].values()) == pytest.approx(us(error))
+    late = delay - delay.min()
+    assert list(summary["lateness_us"].values()) == pytest.approx(us(late))
+    assert list(summary["lateness_us"]) == ["p50", "p90", "p99", "p99.9", "max"]
+
+
+def test_keeps_the_last_capacity_samples(monkeypatch):
+    timestamps = np.arange(250) * 0.002
+    # only the first 150 samples are late, they are overwritten
+    delay = np.where(np.arange(250) < 150, 0.01, 0.0)
+    summary = meter(monkeypatch, timestamps, timestamps + delay, capacity=100)
+    summary = summary.summary()
+    assert summary["samples"] == 100
+    assert summary["period_error_us"]["max"] == pytest.approx(0.0, abs=1e-6)
+    assert summary["lateness_us"]["max"] == pytest.approx(0.0, abs=1e-6)
+
+
+def test_restart_leaves_out_the_step_back(monkeypatch):
+    timestamps = [0.0, 0.002, 0.004, 0.0, 0.002]
+    host = [0.0, 0.002, 0.004, 1.0, 1.002]
+    summary = meter(monkeypatch, timestamps, host).summary()
+    assert summary["skipped"] == 0
+    assert summary["period_error_us"]["max"] == pytest.approx(0.0, abs=1e-6)
+    assert summary["lateness_us"] is None
+
+
+def test_low_jitter_defers_collection_and_restores_gc():
+    assert gc.isenabled()
+    with jitter.LowJitter("defer", collect_every=10) as low:
+        assert not gc.isenabled()
+        for _ in range(25):
+            low.idle()
+        assert low.collections == 2
+    assert gc.isenabled()
+    assert gc.get_freeze_count() == 0
+    with jitter.LowJitter("off", collect_every=1) as low:
+        low.idle()
+        assert low.collections == 0
+    assert gc.isenabled()
+    with pytest.raises(ValueError):
+        jitter.LowJitter("sometimes")
+
+
+def test_low_jitter_degrades_without_permissions(monkeypatch, caplog):
+    calls = []
+
+    def denied(*args):
+        calls.append(args)
+        raise PermissionError("Operation not permitted")
+
+    monkeypatch.setattr(os, "sched_setaffinity", denied)
+    monkeypatch.setattr(os, "sched_setscheduler", denied)
+    with caplog.at_level(logging.WARNING):
+        with jitter.LowJitter(cpus={0}, fifo_priority=50) as low:
+            low.idle()
+    # one attempt each on enter, nothing was changed so nothing is restored
+    assert len(calls) == 2
+    messages = [r.getMessage() for r in caplog.records]
+    assert any("CPU affinity" in m for m in messages)
+    assert any("SCHED_FIFO" in m for m in messages)
+    assert gc.isenabled()
+
+
+def test_low_jitter_without_scheduler_support(monkeypatch, caplog):
+    monkeypatch.delattr(os, "sched_getaffinity", raising=False)
+    monkeypatch.delattr(os, "sched_getscheduler", raising=False)
+    with caplog.at_level(logging.WARNING):
+        with jitter.LowJitter(cpus={0}, fifo_priority=50):
+            pass
+    assert len(caplog.records) == 2
+    assert gc.isenabled()
@@ -0,0 +1,46 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+import tracemalloc
+
+from rtde.profiling import Profiler
+
+
+def test_sampling_without_tracemalloc_by_default(tmp_path):
+    with Profiler(str(tmp_path), {"recipe": "out"}):
+        assert not tracemalloc.is_tracing()
+        sum(i * i for i in range(100000))
+    assert sorted(os.listdir(tmp_path)) == ["run.json", "stacks.txt"]
+    with open(tmp_path / "run.json") as f:
+        run = json.load(f)
+    assert run["recipe"] == "out"
+    assert "tracemalloc" not in run
+
+
+def test_tracemalloc_is_opt_in(tmp_path):
+    with Profiler(str(tmp_path), trace_frames=1):
+        assert tracemalloc.is_tracing()
+    assert not tracemalloc.is_tracing()
+    assert "tracemalloc_diff.txt" in os.listdir(tmp_path)
@@ -0,0 +1,137 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import struct
+import subprocess
+import sys
+
+import numpy as np
+
+from rtde.raw_capture import RawCaptureReader, RawCaptureWriter
+from rtde.rtde import PACKAGE_HEADER, Command
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+RECIPES = [
+    {
+        "id": 1,
+        "key": "out",
+        "names": ["timestamp", "robot_mode"],
+        "types": ["DOUBLE", "INT32"],
+    },
+    {"id": 2, "key": "out_slow", "names": ["actual_q"], "types": ["VECTOR6D"]},
+]
+
+
+def package(recipe_id, fmt, *values):
+    payload = struct.pack(">B" + fmt, recipe_id, *values)
+    return (
+        PACKAGE_HEADER.pack(
+            PACKAGE_HEADER.size + len(payload), Command.RTDE_DATA_PACKAGE
+        )
+        + payload
+    )
+
+
+def write_capture(path, rows):
+    with open(path, "wb") as f:
+        writer = RawCaptureWriter(f, block_size=1000)
+        writer.write_recipes(RECIPES)
+        # the slow recipe's package arrives first
+        writer.write(package(2, "6d", *[-1.0] * 6))
+        for i in range(rows):
+            data = package(1, "di", i * 0.002, i % 7)
+            if i % 10 == 9:
+                data += package(2, "6d", *[float(i)] * 6)
+            # packages split across reads
+            writer.write(data[:5])
+            writer.write(data[5:])
+        writer.close()
+    return str(path)
+
+
+def decode(capture, output, fmt):
+    subprocess.run(
+        [sys.executable, "decode_raw.py", capture, output, "--format", fmt],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+    )
+
+
+def test_reader_yields_packages_and_keys_in_capture_order(tmp_path):
+    with open(write_capture(tmp_path / "cap.raw", 20), "rb") as f:
+        reader = RawCaptureReader(f)
+        packages = list(reader.packages())
+    assert reader.keys == ["out", "out_slow"]
+    assert [recipe["key"] for recipe, _, _ in packages[:2]] == ["out_slow", "out"]
+    assert len(packages) == 1 + 20 + 2
+    assert all(host_ns is not None for _, _, host_ns in packages)
+
+
+def test_decode_names_outputs_by_recipe_order(tmp_path):
+    capture = write_capture(tmp_path / "cap.raw", 100)
+    decode(capture, str(tmp_path / "rec.csv"), "csv")
+    with open(tmp_path / "rec.csv") as f:
+        assert f.readline().strip() == "timestamp,robot_mode"
+        assert len(f.readlines()) == 100
+    with open(tmp_path / "rec_out_slow.csv") as f:
+        assert f.readline().startswith("actual_q_0,")
+        assert len(f.readlines()) == 11
+
+
+def test_decode_npy_in_chunks(tmp_path, monkeypatch):
+    import decode_raw
+
+    capture = write_capture(tmp_path / "cap.raw", 1000)
+    output = str(tmp_path / "rec.npy")
+    monkeypatch.setattr(decode_raw, "NPY_CHUNK_ROWS", 64)
+    monkeypatch.setattr(
+        sys, "argv", ["decode_raw.py", capture, output, "--format", "npy"]
+    )
+    decode_raw.main()
+    data = np.load(output)
+    assert data.dtype.names == ("timestamp", "robot_mode")
+    assert data["robot_mode"].tolist() == [i % 7 for i in range(1000)]
+    assert data["timestamp"][-1] == 999 * 0.002
+    slow = np.load(tmp_path / "rec_out_slow.npy")
+    assert slow["actual_q_5"].tolist() == [-1.0] + [
+        float(i) for i in range(9, 1000, 10)
+    ]
+
+
+def test_decode_npy_with_a_repeated_field(tmp_path):
+    capture = str(tmp_path / "cap.raw")
+    with open(capture, "wb") as f:
+        writer = RawCaptureWriter(f)
+        writer.write_recipes(
+            [{"id": 1, "names": ["timestamp"] * 2, "types": ["DOUBLE"] * 2}]
+        )
+        for i in range(5):
+            writer.write(package(1, "dd", i * 0.002, i * 0.002))
+        writer.close()
+    decode(capture, str(tmp_path / "rec.npy"), "npy")
+    data = np.load(tmp_path / "rec.npy")
+    assert data.dtype.names == ("timestamp", "timestamp__2")
+    assert data["timestamp__2"].tolist() == [i * 0.002 for i in range(5)]
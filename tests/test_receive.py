@@ -0,0 +1,113 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import struct
+import time
+
+import pytest
+
+from rtde.rtde import Command, OverflowPolicy
+from conftest import package
+
+
+def test_receive_returns_the_newest_package(controller):
+    # the first package is read with the reply to start, the rest wait in
+    # the socket when receive() is called
+    controller.start_data = package(
+        Command.RTDE_DATA_PACKAGE, struct.pack(">Bd", 1, 0.0)
+    )
+    con = controller.client()
+    try:
+        controller.send(b"".join(controller.data(1, i * 0.002) for i in range(1, 20)))
+        time.sleep(0.1)
+        skipped = con.skipped_package_count
+        assert con.receive().timestamp == 19 * 0.002
+        assert con.skipped_package_count - skipped == 19
+        controller.send(controller.data(1, 1.0))
+        assert con.receive().timestamp == 1.0
+    finally:
+        con.disconnect()
+
+
+def queued(controller, count, **kwargs):
+    """A client with count packages (timestamps 0, 1, ...) waiting in its
+    socket, all read by the first receive_buffered call"""
+    con = controller.client(**kwargs)
+    controller.send(b"".join(controller.data(1, float(i)) for i in range(count)))
+    time.sleep(0.1)
+    return con
+
+
+def drain(con):
+    timestamps = []
+    state = con.receive_buffered()
+    while state is not None:
+        timestamps.append(state.timestamp)
+        state = con.receive_buffered()
+    return timestamps
+
+
+# a timestamp package has a 9 byte payload, 27 bytes are three packages
+@pytest.mark.parametrize("bound", [{"queue_packets": 3}, {"queue_bytes": 27}])
+def test_drop_oldest_keeps_the_newest(controller, bound):
+    con = queued(controller, 10, overflow=OverflowPolicy.DROP_OLDEST, **bound)
+    try:
+        assert drain(con) == [7.0, 8.0, 9.0]
+        stats = con.queue_stats
+        assert stats["overflows"] == 7
+        assert stats["dropped"] == 7
+        assert stats["peak_packets"] == 3
+        assert stats["peak_bytes"] == 27
+        assert stats["packets"] == 0
+        assert stats["bytes"] == 0
+    finally:
+        con.disconnect()
+
+
+@pytest.mark.parametrize("bound", [{"queue_packets": 3}, {"queue_bytes": 27}])
+def test_drop_newest_keeps_the_oldest(controller, bound):
+    con = queued(controller, 10, overflow=OverflowPolicy.DROP_NEWEST, **bound)
+    try:
+        assert drain(con) == [0.0, 1.0, 2.0]
+        stats = con.queue_stats
+        assert stats["overflows"] == 7
+        assert stats["dropped"] == 7
+        assert stats["peak_packets"] == 3
+    finally:
+        con.disconnect()
+
+
+def test_block_keeps_everything_in_order(controller):
+    con = queued(controller, 10, overflow=OverflowPolicy.BLOCK, queue_packets=3)
+    try:
+        # the packages that do not fit wait in the receive buffer
+        assert con.receive_buffered().timestamp == 0.0
+        stats = con.queue_stats
+        assert stats["packets"] == 2
+        assert stats["overflows"] == 1
+        assert drain(con) == [float(i) for i in range(1, 10)]
+        stats = con.queue_stats
+        assert stats["dropped"] == 0
+        assert stats["peak_packets"] == 3
+        assert con.socket_stats["data_packages"] == 10
+    finally:
+        con.disconnect()
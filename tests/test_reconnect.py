@@ -0,0 +1,154 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import csv
+import json
+import os
+import socket
+import struct
+import subprocess
+import sys
+import time
+
+import pytest
+
+import rtde.rtde as rtde
+from rtde.rtde import Command
+from conftest import ScriptedController, package
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONFIG = """<?xml version="1.0"?>
+<rtde_config>
+    <recipe key="out">
+        <field name="timestamp" type="DOUBLE"/>
+    </recipe>
+</rtde_config>
+"""
+
+
+def samples(first, count):
+    """Timestamp packages of recipe 1, 500 Hz from sample first on"""
+    return b"".join(
+        package(Command.RTDE_DATA_PACKAGE, struct.pack(">Bd", 1, i * 0.002))
+        for i in range(first, first + count)
+    )
+
+
+def free_port():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def test_reconnect_restores_recipes_and_start():
+    first = ScriptedController()
+    first.start_data = package(
+        Command.RTDE_DATA_PACKAGE, struct.pack(">Bdi", 1, 0.0, 7)
+    )
+    con = first.client(names=("timestamp", "robot_mode"))
+    restarted = None
+    try:
+        assert con.receive().timestamp == 0.0
+        first.close()
+        with pytest.raises(rtde.RTDEException):
+            while True:
+                con.receive()
+        restarted = ScriptedController(port=first.port)
+        restarted.start_data = package(
+            Command.RTDE_DATA_PACKAGE, struct.pack(">Bdi", 1, 1.0, 3)
+        )
+        assert con.reconnect(attempts=5, delay=0.01)
+        assert restarted.outputs == {1: ["DOUBLE", "INT32"]}
+        assert restarted.started.is_set()
+        state = con.receive()
+        assert (state.timestamp, state.robot_mode) == (1.0, 3)
+    finally:
+        con.disconnect()
+        if restarted is not None:
+            restarted.close()
+
+
+def test_reconnect_backs_off_and_gives_up(monkeypatch):
+    con = rtde.RTDE("127.0.0.1", free_port())
+    delays = []
+    monkeypatch.setattr(rtde.time, "sleep", delays.append)
+    assert not con.reconnect(attempts=5, delay=0.5, max_delay=1.5)
+    # a sleep after each failed attempt but the last
+    assert delays == [0.5, 1.0, 1.5, 1.5]
+    assert not con.is_connected()
+
+
+def test_record_resumes_and_writes_the_gap(tmp_path):
+    (tmp_path / "config.xml").write_text(CONFIG)
+    first = ScriptedController()
+    first.start_data = samples(0, 10)
+    recorder = subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(ROOT, "record.py"),
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(first.port),
+            "--config",
+            "config.xml",
+            "--frequency",
+            "500",
+            "--samples",
+            "20",
+            "--output",
+            "out.csv",
+            "--reconnect",
+            "--buffered",
+        ],
+        cwd=str(tmp_path),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    restarted = None
+    try:
+        assert first.started.wait(10)
+        first.close()
+        # 10 samples are lost while the controller restarts
+        restarted = ScriptedController(port=first.port)
+        restarted.start_data = samples(20, 10)
+        _, stderr = recorder.communicate(timeout=30)
+        assert recorder.returncode == 0, stderr.decode()
+    finally:
+        if recorder.poll() is None:
+            recorder.kill()
+        if restarted is not None:
+            restarted.close()
+
+    with open(tmp_path / "out.csv") as f:
+        timestamps = [float(row["timestamp"]) for row in csv.DictReader(f)]
+    assert timestamps == [i * 0.002 for i in list(range(10)) + list(range(20, 30))]
+    with open(tmp_path / "out.csv.gaps") as f:
+        gaps = [json.loads(line) for line in f]
+    assert len(gaps) == 1
+    assert gaps[0]["last_timestamp"] == 9 * 0.002
+    assert gaps[0]["next_timestamp"] == 20 * 0.002
+    assert gaps[0]["lost_samples"] == 10
+    assert gaps[0]["resumed_at"] >= gaps[0]["lost_at"]
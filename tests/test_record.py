@@ -0,0 +1,84 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONFIG = """<?xml version="1.0"?>
+<rtde_config>
+    <recipe key="out" frequency="500">
+        <field name="timestamp" type="DOUBLE"/>
+    </recipe>
+    <recipe key="out_slow" frequency="50">
+        <field name="robot_mode" type="INT32"/>
+    </recipe>
+</rtde_config>
+"""
+
+
+def record(tmp_path, *options):
+    """Runs record.py on a replayed 500 Hz recording, returns its output, in
+    text mode the \\r ending progress lines reads as a newline"""
+    with open(tmp_path / "rec.csv", "w") as f:
+        f.write("timestamp,robot_mode\n")
+        for i in range(1000):
+            f.write("{!r},{}\n".format(i * 0.002, i % 7))
+    (tmp_path / "config.xml").write_text(CONFIG)
+    return subprocess.run(
+        [
+            sys.executable,
+            os.path.join(ROOT, "record.py"),
+            "--replay",
+            "rec.csv",
+            "--replay-speed",
+            "0",
+            "--config",
+            "config.xml",
+        ]
+        + list(options),
+        cwd=str(tmp_path),
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+def test_progress_counts_samples_of_the_first_recipe(tmp_path):
+    output = record(tmp_path, "--frequency", "9")
+    lines = [line for line in output.splitlines() if line.endswith("samples.")]
+    assert lines == ["{:3d} samples.".format(i) for i in range(9, 1000, 9)]
+    with open(tmp_path / "robot_data_out_slow.csv") as f:
+        assert len(f.readlines()) == 1 + 100
+
+
+def test_raw_cannot_replay(tmp_path):
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "record.py"), "--replay", "x.csv", "--raw"],
+        cwd=str(tmp_path),
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 2
+    assert "--raw captures the controller stream" in result.stderr
@@ -0,0 +1,106 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import struct
+
+import pytest
+
+from rtde.csv_binary_writer import CSVBinaryWriter
+from rtde.csv_reader import CSVRowReader
+from rtde.replay import ReplayRTDE
+from rtde.rtde import RTDEException
+from conftest import NAMES, TYPES, sample, write_csv
+
+
+def replay_all(con):
+    samples = []
+    with pytest.raises(RTDEException):
+        while True:
+            samples.append(con.receive_buffered())
+    return samples
+
+
+def test_csv_replay_in_order_until_the_end(tmp_path):
+    con = ReplayRTDE(write_csv(tmp_path / "rec.csv", 50), speed=0)
+    con.connect()
+    assert con.send_output_setup(NAMES, TYPES, frequency=500)
+    assert con.send_start()
+    samples = replay_all(con)
+    assert len(samples) == 50
+    for i, state in enumerate(samples):
+        expected = sample(i)
+        assert state.timestamp == pytest.approx(expected.timestamp)
+        assert state.actual_q == pytest.approx(expected.actual_q)
+        assert state.robot_mode == expected.robot_mode
+        assert isinstance(state.robot_mode, int)
+    assert not con.is_connected()
+
+
+def test_csv_replay_divides_frequency_and_loops(tmp_path):
+    con = ReplayRTDE(write_csv(tmp_path / "rec.csv", 10), speed=0, loop=True)
+    con.connect()
+    assert con.send_output_setup(["robot_mode"], frequency=100)
+    assert con.send_start()
+    modes = [con.receive_buffered().robot_mode for _ in range(6)]
+    # every 5th row of the 500 Hz recording, again from its start
+    assert modes == [0, 5, 0, 5, 0, 5]
+
+
+def test_binary_replay(tmp_path):
+    path = str(tmp_path / "rec.bin")
+    row = struct.Struct(">di")
+    with open(path, "wb") as f:
+        writer = CSVBinaryWriter(f, ["timestamp", "robot_mode"], ["DOUBLE", "INT32"])
+        writer.writeheader()
+        for i in range(20):
+            writer.writerow(row.pack(i * 0.002, i))
+    con = ReplayRTDE(path, speed=0)
+    con.connect()
+    assert con.send_output_setup(["robot_mode"])
+    assert con.send_start()
+    assert [state.robot_mode for state in replay_all(con)] == list(range(0, 20, 4))
+
+
+def test_row_reader_parses_only_requested_columns(tmp_path):
+    with open(write_csv(tmp_path / "rec.csv", 3)) as f:
+        reader = CSVRowReader(f, delimiter=",")
+        rows = list(reader.read_rows(columns=[0, 7]))
+    assert reader.names[7] == "robot_mode"
+    assert [row[7] for row in rows] == [0.0, 1.0, 2.0]
+    assert rows[0][1] is None
+
+
+def test_sparse_policies_replay_the_last_recorded_value(tmp_path):
+    path = write_csv(tmp_path / "rec.csv", 40, policies=[None, "mean:4", "every:10"])
+    con = ReplayRTDE(path, speed=0)
+    con.connect()
+    assert con.send_output_setup(NAMES, TYPES, frequency=500)
+    assert con.send_start()
+    samples = replay_all(con)
+    # the first mean is written with the 4th row, rows before it are skipped
+    assert len(samples) == 37
+    for i, state in enumerate(samples, 3):
+        assert state.timestamp == pytest.approx(i * 0.002)
+        assert state.robot_mode == (i - i % 10) % 7
+        window = range(i - (i + 1) % 4 - 3, i - (i + 1) % 4 + 1)
+        assert state.actual_q[0] == pytest.approx(sum(window) / 4.0)
@@ -0,0 +1,67 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from rtde.rtde_config import ConfigFile
+
+CONFIG = """<?xml version="1.0"?>
+<rtde_config>
+    <recipe key="out">
+        <field name="timestamp" type="DOUBLE"/>
+    </recipe>
+    <recipe key="output_extra">
+        <field name="actual_q" type="VECTOR6D"/>
+    </recipe>
+    <recipe key="out_slow" frequency="10">
+        <field name="robot_mode" type="INT32" policy="every:10"/>
+    </recipe>
+    <recipe key="in">
+        <field name="input_int_register_0" type="INT32"/>
+    </recipe>
+</rtde_config>
+"""
+
+
+def config(tmp_path):
+    filename = tmp_path / "config.xml"
+    filename.write_text(CONFIG)
+    return ConfigFile(str(filename))
+
+
+def test_recipe_keys_match_prefix_and_underscore(tmp_path):
+    assert config(tmp_path).get_recipe_keys("out") == ["out", "out_slow"]
+
+
+def test_recipe_keys_without_prefix(tmp_path):
+    assert config(tmp_path).get_recipe_keys() == [
+        "out",
+        "output_extra",
+        "out_slow",
+        "in",
+    ]
+
+
+def test_recipe_frequency_and_policies(tmp_path):
+    conf = config(tmp_path)
+    assert conf.get_recipe_frequency("out", 125) == 125
+    assert conf.get_recipe_frequency("out_slow") == 10
+    assert conf.get_recipe_policies("out_slow") == ["every:10"]
@@ -0,0 +1,135 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import time
+
+import pytest
+
+from rtde import rtde
+
+
+def receive_all(con, count, timeout=5.0):
+    """count samples from receive_buffered, in order"""
+    samples = []
+    deadline = time.monotonic() + timeout
+    while len(samples) < count and time.monotonic() < deadline:
+        state = con.receive_buffered()
+        if state is None:
+            con.has_data(0.1)
+        else:
+            samples.append(state)
+    return samples
+
+
+def test_mode_defaults_and_overrides():
+    con = rtde.RTDE("127.0.0.1")
+    assert (con.recv_size, con.rcvbuf) == (4096, None)
+    con = rtde.RTDE("127.0.0.1", mode=rtde.SocketMode.HIGH_THROUGHPUT)
+    assert (con.recv_size, con.rcvbuf) == (262144, 4194304)
+    con = rtde.RTDE("127.0.0.1", mode=rtde.SocketMode.HIGH_THROUGHPUT, recv_size=64)
+    assert (con.recv_size, con.rcvbuf) == (64, 4194304)
+    with pytest.raises(ValueError):
+        rtde.RTDE("127.0.0.1", mode="fast")
+
+
+def test_partial_headers_and_packages_split_across_reads(controller):
+    # 12 byte packages read 5 bytes at a time split headers and payloads
+    con = controller.client(recv_size=5)
+    try:
+        controller.send(b"".join(controller.data(1, i * 0.002) for i in range(10)))
+        samples = receive_all(con, 10)
+        stats = con.socket_stats
+    finally:
+        con.disconnect()
+    assert [s.timestamp for s in samples] == [i * 0.002 for i in range(10)]
+    assert stats["data_packages"] == 10
+    assert stats["bytes_received"] >= 10 * 12
+    assert stats["recv_calls"] >= 10 * 12 // 5
+
+
+def test_package_sent_a_byte_at_a_time(controller):
+    con = controller.client()
+    try:
+        data = controller.data(1, 1.5)
+        for i in range(len(data)):
+            controller.send(data[i : i + 1])
+            time.sleep(0.002)
+        state = con.receive()
+    finally:
+        con.disconnect()
+    assert state.timestamp == 1.5
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"mode": rtde.SocketMode.HIGH_THROUGHPUT},
+        {"busy_poll": True},
+    ],
+)
+def test_modes_receive_the_same_samples(controller, options):
+    con = controller.client(**options)
+    try:
+        controller.send(b"".join(controller.data(1, i * 0.002) for i in range(50)))
+        samples = receive_all(con, 50)
+    finally:
+        con.disconnect()
+    assert [s.timestamp for s in samples] == [i * 0.002 for i in range(50)]
+
+
+def test_zero_byte_read_disconnects(controller):
+    con = controller.client()
+    controller.send(controller.data(1, 0.5))
+    assert con.receive().timestamp == 0.5
+    controller.close()
+    with pytest.raises(rtde.RTDEException):
+        con.receive()
+    assert not con.is_connected()
+
+
+def test_socket_stats_count_calls_per_package(controller):
+    con = controller.client(mode=rtde.SocketMode.HIGH_THROUGHPUT)
+    setup = con.socket_stats  # the replies to the setup are counted too
+    try:
+        controller.send(b"".join(controller.data(1, i * 0.002) for i in range(100)))
+        assert len(receive_all(con, 100)) == 100
+        stats = con.socket_stats
+    finally:
+        con.disconnect()
+    assert stats["data_packages"] == 100
+    assert stats["bytes_received"] - setup["bytes_received"] == 100 * 12
+    calls = stats["recv_calls"] + stats["send_calls"] + stats["poll_calls"]
+    assert stats["syscalls_per_package"] == calls / 100.0
+
+
+@pytest.mark.parametrize("timeout", [0.05, 0.3])
+def test_read_raw_waits_for_its_timeout(controller, timeout):
+    con = controller.client()
+    try:
+        start = time.monotonic()
+        assert con.read_raw(timeout) == b""
+        assert timeout <= time.monotonic() - start < timeout + 0.2
+        data = controller.data(1, 0.5)
+        controller.send(data)
+        assert con.read_raw(timeout) == data
+    finally:
+        con.disconnect()
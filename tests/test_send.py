@@ -0,0 +1,113 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import struct
+
+import numpy as np
+import pytest
+
+from rtde import serialize
+from rtde.rtde import Command
+from conftest import package
+
+NAMES = [
+    "input_int_register_0",
+    "input_double_register_0",
+    "input_bit_register_64",
+    "standard_digital_output",
+    "speed_slider_mask",
+]
+TYPES = ["INT32", "DOUBLE", "BOOL", "UINT8", "UINT32"]
+VALUES = [-7, 2.5, True, 200, 3]
+
+
+def config(recipe_id=1, names=NAMES, types=TYPES):
+    config = serialize.DataConfig.unpack_recipe(
+        struct.pack(">B", recipe_id) + ",".join(types).encode("utf-8")
+    )
+    config.names = names
+    return config
+
+
+def state(values=VALUES, recipe_id=1):
+    state = serialize.DataObject.create_empty(NAMES, recipe_id)
+    for name, value in zip(NAMES, values):
+        setattr(state, name, value)
+    return state
+
+
+def expected(recipe_config, values=VALUES):
+    """The package as DataConfig.pack builds it for RTDE.send"""
+    return package(Command.RTDE_DATA_PACKAGE, recipe_config.pack(state(values)))
+
+
+def test_pack_object_and_pack_match_data_object_pack():
+    packer = serialize.InputPacker(config(), Command.RTDE_DATA_PACKAGE)
+    assert bytes(packer.pack_object(state())) == expected(config())
+    assert bytes(packer.pack(VALUES)) == expected(config())
+
+
+def test_pack_converts_arrays_to_the_field_types():
+    packer = serialize.InputPacker(config(), Command.RTDE_DATA_PACKAGE)
+    assert bytes(packer.pack(np.array(VALUES, dtype=float))) == expected(config())
+    assert bytes(packer.pack(np.array([1, 2, 0, 1, 2]))) == expected(
+        config(), [1, 2.0, False, 1, 2]
+    )
+    with pytest.raises(struct.error):
+        packer.pack(np.zeros(6))
+
+
+def test_pack_vectors_expanded():
+    recipe = config(2, ["input_double_register_0", "actual_q"], ["DOUBLE", "VECTOR6D"])
+    packer = serialize.InputPacker(recipe, Command.RTDE_DATA_PACKAGE)
+    values = np.arange(7) * 0.5
+    assert bytes(packer.pack(values)) == package(
+        Command.RTDE_DATA_PACKAGE, struct.pack(">B7d", 2, *values)
+    )
+
+
+def test_send_values_batch_and_objects(controller):
+    con = controller.client()
+    fields = con.send_input_setup(NAMES, TYPES)
+    registers = con.send_input_setup(["input_double_register_0"], ["DOUBLE"])
+    try:
+        assert con.send_start()
+        con.send_values(fields.recipe_id, np.array(VALUES, dtype=float))
+        for name, value in zip(NAMES, VALUES):
+            setattr(fields, name, value)
+        con.send(fields)
+        registers.input_double_register_0 = 0.25
+        con.send_batch([(fields.recipe_id, VALUES), (registers.recipe_id, [0.5])])
+        with pytest.raises(ValueError):
+            con.send_batch([(fields.recipe_id, VALUES), (fields.recipe_id, VALUES)])
+        con.send(registers)
+        inputs = controller.wait_inputs(5)
+    finally:
+        con.disconnect()
+    payload = expected(config())[3:]
+    assert inputs == [
+        payload,
+        payload,
+        payload,
+        struct.pack(">Bd", 2, 0.5),
+        struct.pack(">Bd", 2, 0.25),
+    ]
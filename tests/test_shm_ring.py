@@ -0,0 +1,142 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import struct
+import sys
+import threading
+import uuid
+
+import pytest
+
+from rtde.shm_ring import (
+    SEQ,
+    RingOverrunException,
+    ShmRingReader,
+    ShmRingWriter,
+    _attach,
+)
+
+NAMES = ["timestamp", "actual_q"]
+TYPES = ["DOUBLE", "VECTOR3D"]
+PAYLOAD = struct.Struct(">4d")
+
+
+def payload(i):
+    return PAYLOAD.pack(i, i, i, i)
+
+
+@pytest.fixture
+def ring():
+    writer = ShmRingWriter("rtde_test_" + uuid.uuid4().hex[:12], NAMES, TYPES, slots=4)
+    reader = ShmRingReader(writer.name)
+    yield writer, reader
+    reader.close()
+    writer.close()
+
+
+def test_round_trip_and_unwritten_records(ring):
+    writer, reader = ring
+    assert reader.names == NAMES and reader.types == TYPES
+    assert reader.read(0) is None
+    assert reader.latest() == (None, None)
+    assert not reader.wait(0, timeout=0.01)
+    assert writer.write(payload(0)) == 0
+    assert reader.wait(0, timeout=0.01)
+    state = reader.read(0)
+    assert state.timestamp == 0.0 and state.actual_q == [0.0, 0.0, 0.0]
+    assert reader.read(1) is None
+
+
+def test_wraparound_keeps_the_newest_slots(ring):
+    writer, reader = ring
+    for i in range(10):
+        writer.write(payload(i))
+    assert reader.write_seq == 10
+    # the oldest slot is the one the writer fills next
+    assert reader.oldest() == 7
+    assert [reader.read(seq).timestamp for seq in range(7, 10)] == [7.0, 8.0, 9.0]
+    seq, state = reader.latest()
+    assert (seq, state.timestamp) == (9, 9.0)
+    with pytest.raises(RingOverrunException):
+        reader.read(5)
+
+
+def test_reader_falling_behind_sees_the_overrun(ring):
+    writer, reader = ring
+    writer.write(payload(0))
+    view = reader.view(0)
+    assert view.timestamp == 0.0 and reader.valid(0)
+    for i in range(1, 5):
+        writer.write(payload(i))
+    # the view reads the record that replaced it, valid() tells
+    assert view.actual_q == [4.0, 4.0, 4.0]
+    assert not reader.valid(0)
+    del view
+    with pytest.raises(RingOverrunException):
+        reader.read(0)
+
+
+def test_record_being_written_is_not_read(ring):
+    writer, reader = ring
+    writer.write(payload(0))
+    shm = _attach(writer.name)
+    try:
+        offset = reader._ShmRingReader__layout.slot(0)
+        SEQ.pack_into(shm.buf, offset, 1)  # odd: the writer is copying
+        with pytest.raises(RingOverrunException):
+            reader.read(0)
+        assert not reader.valid(0)
+        SEQ.pack_into(shm.buf, offset, 0)
+        assert reader.read(0).timestamp == 0.0
+    finally:
+        shm.close()
+
+
+def test_latest_retries_torn_reads(ring):
+    writer, reader = ring
+    # switch threads often so reads overlap writes
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    stop = threading.Event()
+
+    def write():
+        i = 0
+        while not stop.is_set():
+            writer.write(payload(i))
+            i += 1
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    try:
+        reads = 0
+        while reads < 20000:
+            seq, state = reader.latest()
+            if state is None:
+                continue
+            # never a record the writer replaced while it was copied
+            assert state.timestamp == seq
+            assert state.actual_q == [seq] * 3
+            reads += 1
+    finally:
+        stop.set()
+        thread.join()
+        sys.setswitchinterval(interval)
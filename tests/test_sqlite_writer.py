@@ -0,0 +1,118 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+import types
+
+from rtde.sqlite_writer import SQLiteWriter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONFIG = """<?xml version="1.0"?>
+<rtde_config>
+    <recipe key="out">
+{}
+    </recipe>
+</rtde_config>
+"""
+FIELD = '        <field name="{}" type="{}"/>'
+
+
+def write(path, rows, replace):
+    with SQLiteWriter(str(path), ["timestamp"], ["DOUBLE"], replace=replace) as w:
+        w.writeheader()
+        for i in range(rows):
+            w.writerow(types.SimpleNamespace(timestamp=i * 0.002))
+
+
+def select(path, query="SELECT COUNT(*) FROM samples"):
+    db = sqlite3.connect(str(path))
+    try:
+        return db.execute(query).fetchall()
+    finally:
+        db.close()
+
+
+def test_replace_removes_the_previous_database(tmp_path):
+    path = tmp_path / "rec.db"
+    write(path, 3, replace=True)
+    write(path, 3, replace=True)
+    assert select(path) == [(3,)]
+
+
+def test_rows_are_appended_without_replace(tmp_path):
+    path = tmp_path / "rec.db"
+    write(path, 3, replace=False)
+    write(path, 3, replace=False)
+    assert select(path) == [(6,)]
+
+
+def test_rows_are_committed_on_the_timer_without_further_rows(tmp_path):
+    path = tmp_path / "rec.db"
+    with SQLiteWriter(str(path), ["timestamp"], ["DOUBLE"], flush_interval=0.1) as w:
+        w.writeheader()
+        w.writerow(types.SimpleNamespace(timestamp=0.0))
+        w.writerow(types.SimpleNamespace(timestamp=0.002))
+        deadline = time.monotonic() + 5.0
+        while select(path) != [(2,)] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert select(path) == [(2,)]
+        assert w.rows == 2
+
+
+def record(tmp_path, fields):
+    config = tmp_path / "config.xml"
+    config.write_text(CONFIG.format("\n".join(FIELD.format(n, t) for n, t in fields)))
+    subprocess.run(
+        [
+            sys.executable,
+            os.path.join(ROOT, "record.py"),
+            "--replay",
+            os.path.join(str(tmp_path), "rec.csv"),
+            "--replay-speed",
+            "0",
+            "--frequency",
+            "500",
+            "--config",
+            str(config),
+            "--sqlite",
+        ],
+        cwd=str(tmp_path),
+        check=True,
+        capture_output=True,
+    )
+
+
+def test_record_replaces_the_database_of_the_previous_run(tmp_path):
+    (tmp_path / "rec.csv").write_text("timestamp,robot_mode\n0.0,1\n0.002,2\n0.004,3\n")
+    record(tmp_path, [("timestamp", "DOUBLE"), ("robot_mode", "INT32")])
+    record(tmp_path, [("timestamp", "DOUBLE"), ("robot_mode", "INT32")])
+    # the default output has the database extension
+    path = tmp_path / "robot_data.db"
+    assert select(path) == [(3,)]
+    # a changed recipe gets its own table
+    record(tmp_path, [("robot_mode", "INT32")])
+    assert select(path, "SELECT * FROM samples") == [(1,), (2,), (3,)]
@@ -0,0 +1,93 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import struct
+import types
+
+import numpy as np
+import pytest
+
+from rtde.stats import StreamingStats
+
+NAMES = ["timestamp", "actual_q", "robot_mode"]
+TYPES = ["DOUBLE", "VECTOR3D", "INT32"]
+COLUMNS = ["timestamp", "actual_q_0", "actual_q_1", "actual_q_2", "robot_mode"]
+PAYLOAD = struct.Struct(">4di")
+
+
+def data(rows=1000):
+    """Rows of the columns, with a large offset that a naive sum of
+    squares would lose the variance to"""
+    rng = np.random.default_rng(7)
+    block = np.empty((rows, 5))
+    block[:, 0] = 1e6 + np.arange(rows) * 0.002
+    block[:, 1:4] = 1e6 + rng.normal(0.0, 0.5, (rows, 3))
+    block[:, 4] = rng.integers(0, 8, rows)
+    return block
+
+
+def state(row):
+    return types.SimpleNamespace(
+        timestamp=row[0], actual_q=list(row[1:4]), robot_mode=int(row[4])
+    )
+
+
+def check(summary, block):
+    assert list(summary) == COLUMNS
+    for i, column in enumerate(COLUMNS):
+        stats = summary[column]
+        assert stats["count"] == len(block)
+        assert stats["mean"] == pytest.approx(np.mean(block[:, i]), rel=1e-12)
+        assert stats["var"] == pytest.approx(np.var(block[:, i], ddof=1), rel=1e-6)
+        assert stats["min"] == block[:, i].min()
+        assert stats["max"] == block[:, i].max()
+        assert sum(stats["hist"].values()) == len(block)
+
+
+def test_objects_merged_over_uneven_blocks():
+    block = data()
+    stats = StreamingStats(NAMES, TYPES, block_size=7)
+    for i, row in enumerate(block):
+        stats.add(state(row))
+        if i in (0, 1, 100, 500):  # blocks of 1, 1, 98, ... rows
+            stats.flush()
+    check(stats.summary(), block)
+
+
+def test_payloads_match_objects():
+    block = data(300)
+    stats = StreamingStats(NAMES, TYPES, block_size=64)
+    for row in block:
+        stats.add_payload(PAYLOAD.pack(*row[:4], int(row[4])))
+    check(stats.summary(), block)
+
+
+def test_fields_subset_histogram_and_reset():
+    stats = StreamingStats(NAMES, TYPES, fields=["robot_mode"])
+    assert stats.columns == ["robot_mode"]
+    for mode in [0, 1, 3, 4, 7]:
+        stats.add(state([0.0, 0.0, 0.0, 0.0, mode]))
+    summary = stats.summary()["robot_mode"]
+    # 0 has its own bucket, 1 is in 2**0 <= x < 2**1, 3 in [2, 4) ...
+    assert summary["hist"] == {"-20": 1, "1": 1, "2": 1, "3": 2}
+    stats.reset()
+    assert stats.summary() == {"robot_mode": {"count": 0}}
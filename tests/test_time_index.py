@@ -0,0 +1,83 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+
+import pytest
+
+from rtde.time_index import TimeIndex, read_range
+
+
+def write_csv(path, rows, first=0.0, mode="w", header="timestamp,value"):
+    with open(path, mode) as f:
+        if mode == "w":
+            f.write(header + "\n")
+        for i in range(rows):
+            f.write("{!r},{}\n".format(first + i * 0.002, i))
+    return str(path)
+
+
+def test_range_from_the_index(tmp_path):
+    path = write_csv(tmp_path / "rec.csv", 5000)
+    columns = read_range(path, 2.0, 4.0)
+    assert os.path.exists(path + ".idx")
+    assert columns["value"][0] == 1000
+    assert columns["value"][-1] == 2000
+    assert read_range(path, 2.0, 4.0)["value"].tolist() == columns["value"].tolist()
+
+
+def test_rewritten_recording_is_indexed_again(tmp_path):
+    path = write_csv(tmp_path / "rec.csv", 3000, first=100.0)
+    assert len(read_range(path, 100.0, 101.0)["value"]) == 501
+    # a later, longer run written to the same file name
+    write_csv(path, 6000, first=500.0)
+    assert len(read_range(path, 100.0, 101.0)["value"]) == 0
+    columns = read_range(path, 505.0, 506.0)
+    assert columns["value"][0] == 2500
+    assert len(columns["value"]) == 501
+
+
+def test_grown_recording_extends_the_index(tmp_path):
+    path = write_csv(tmp_path / "rec.csv", 3000)
+    before = TimeIndex(path, stride=100)
+    write_csv(path, 3000, first=6.0, mode="a")
+    after = TimeIndex(path, stride=100)
+    assert after.offsets[: len(before.offsets)] == before.offsets
+    assert len(after.offsets) == 60
+    columns = read_range(path, 5.99, 6.01)
+    assert columns["value"].tolist() == [2995, 2996, 2997, 2998, 2999, 0, 1, 2, 3, 4, 5]
+
+
+def test_changed_header_is_indexed_again(tmp_path):
+    path = write_csv(tmp_path / "rec.csv", 3000)
+    TimeIndex(path, stride=100)
+    write_csv(path, 3000, header="timestamp,other")
+    columns = read_range(path, 0.0, 0.01)
+    assert "other" in columns and "value" not in columns
+
+
+def test_no_timestamp_column(tmp_path):
+    path = tmp_path / "rec.csv"
+    path.write_text("a,b\n1,2\n")
+    with pytest.raises(ValueError):
+        TimeIndex(str(path))
@@ -0,0 +1,130 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import types
+
+import pytest
+
+from rtde.trigger import Trigger, TriggerRecorder
+
+NAMES = ["timestamp", "robot_mode", "actual_TCP_force"]
+
+
+def state(mode, force=0.0):
+    return types.SimpleNamespace(
+        timestamp=0.0, robot_mode=mode, actual_TCP_force=[force, 0.0, 0.0]
+    )
+
+
+class Event(object):
+    """File and writer of one event, rows collects what was written"""
+
+    def __init__(self):
+        self.rows = []
+        self.closed = False
+
+    def writerow(self, row):
+        assert not self.closed
+        self.rows.append(row)
+
+    def close(self):
+        self.closed = True
+
+
+def recorder(expression, pre_samples, post_samples):
+    events = []
+
+    def open_event(index, trigger):
+        assert index == len(events) + 1
+        events.append(Event())
+        return events[-1], events[-1]
+
+    trigger = Trigger(expression, NAMES)
+    return TriggerRecorder([trigger], pre_samples, post_samples, open_event), events
+
+
+def test_trigger_fields_prev_and_functions():
+    rec, events = recorder("robot_mode != prev.robot_mode", 0, 0)
+    for i, mode in enumerate([7, 7, 3]):
+        rec.feed(i, state(mode))
+    assert [e.rows for e in events] == [[2]]
+    rec, events = recorder("norm(actual_TCP_force[:3]) > 5", 0, 0)
+    for i, force in enumerate([0.0, 6.0, 1.0]):
+        rec.feed(i, state(7, force))
+    assert [e.rows for e in events] == [[1]]
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "__import__('os').system('true')",
+        "robot_mode.__class__",
+        "timestamp.real > 0",
+        "prev.__class__",
+        "prev.unknown_field",
+        "open('x')",
+        "robot_mode.bit_length()",
+        "(lambda: 1)()",
+        "[x for x in actual_TCP_force]",
+        "getattr(prev, 'robot_mode')",
+        "robot_mode.timestamp",
+        "timestamp(1)",
+        "prev(1)",
+        "unknown_field > 0",
+        "robot_mode ==",
+    ],
+)
+def test_trigger_rejects_outside_allowlist(expression):
+    with pytest.raises(ValueError, match="Invalid trigger"):
+        Trigger(expression, NAMES)
+
+
+def test_recorder_pre_and_post_window():
+    rec, events = recorder("robot_mode != prev.robot_mode", 2, 3)
+    for i in range(12):
+        rec.feed(i, state(1 if i < 5 else 2))
+    assert rec.events == 1
+    assert len(events) == 1
+    assert events[0].rows == [3, 4, 5, 6, 7, 8]
+    assert events[0].closed
+
+
+def test_recorder_overlapping_events_share_a_file():
+    rec, events = recorder("robot_mode != prev.robot_mode", 2, 3)
+    modes = [1] * 5 + [2, 2, 3] + [3] * 7 + [4] * 5
+    for i, mode in enumerate(modes):
+        rec.feed(i, state(mode))
+    # 5 fires, 7 fires again inside the post window and extends it to 10;
+    # 15 opens a second event with the ring refilled after the first
+    assert rec.events == 2
+    assert events[0].rows == [3, 4, 5, 6, 7, 8, 9, 10]
+    assert events[1].rows == [13, 14, 15, 16, 17, 18]
+    assert all(e.closed for e in events)
+
+
+def test_recorder_close_ends_event_early():
+    rec, events = recorder("robot_mode != prev.robot_mode", 0, 100)
+    for i, mode in enumerate([1, 2, 2, 2]):
+        rec.feed(i, state(mode))
+    rec.close()
+    assert events[0].rows == [1, 2, 3]
+    assert events[0].closed
@@ -0,0 +1,76 @@
+# Copyright (c) 2016-2022, Universal Robots A/S,
+# All rights reserved.
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the Universal Robots A/S nor the names of its
+#      contributors may be used to endorse or promote products derived
+#      from this software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL UNIVERSAL ROBOTS A/S BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import time
+
+from rtde import write_behind
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_rows_are_written_in_order(tmp_path):
+    path = tmp_path / "out.csv"
+    with write_behind.WriteBehindFile(open(path, "wb"), buffer_size=64) as f:
+        for i in range(1000):
+            f.write("{}\n".format(i))
+    assert path.read_text().split() == [str(i) for i in range(1000)]
+
+
+def test_flush_interval_without_further_writes(tmp_path):
+    path = tmp_path / "out.csv"
+    with write_behind.WriteBehindFile(open(path, "wb"), flush_interval=0.05) as f:
+        f.write("1,2\n")
+        # no write follows, the thread flushes on its timer
+        assert wait_for(lambda: path.read_text() == "1,2\n")
+
+
+def test_fsync_interval_without_flush_policy(tmp_path, monkeypatch):
+    synced = []
+    fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: synced.append(fd) or fsync(fd))
+    path = tmp_path / "out.csv"
+    with write_behind.WriteBehindFile(open(path, "wb"), fsync_interval=0.05) as f:
+        f.write("1,2\n")
+        assert wait_for(lambda: path.read_text() == "1,2\n" and synced)
+        count = len(synced)
+        time.sleep(0.2)
+        # nothing new was written, nothing to fsync
+        assert len(synced) == count
+
+
+def test_flush_rows(tmp_path):
+    path = tmp_path / "out.csv"
+    with write_behind.WriteBehindFile(open(path, "wb"), flush_rows=2) as f:
+        f.write("1\n")
+        f.write("2\n")
+        assert wait_for(lambda: path.read_text() == "1\n2\n")
+        f.write("3\n")
+        time.sleep(0.1)
+        assert path.read_text() == "1\n2\n"
+    assert path.read_text() == "1\n2\n3\n"